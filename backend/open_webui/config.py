@@ -734,6 +734,27 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Megabytes of downloaded cloud storage objects to keep in UPLOAD_DIR
+try:
+    STORAGE_CACHE_MAX_SIZE_MB = int(os.environ.get("STORAGE_CACHE_MAX_SIZE_MB", "2048"))
+except ValueError:
+    STORAGE_CACHE_MAX_SIZE_MB = 2048
+
+# Part size and number of parts uploaded in parallel for large files
+try:
+    STORAGE_MULTIPART_CHUNK_SIZE_MB = int(
+        os.environ.get("STORAGE_MULTIPART_CHUNK_SIZE_MB", "8")
+    )
+except ValueError:
+    STORAGE_MULTIPART_CHUNK_SIZE_MB = 8
+
+try:
+    STORAGE_MULTIPART_CONCURRENCY = int(
+        os.environ.get("STORAGE_MULTIPART_CONCURRENCY", "8")
+    )
+except ValueError:
+    STORAGE_MULTIPART_CONCURRENCY = 8
+
 ####################################
 # File Upload DIR
 ####################################
@@ -318,6 +318,10 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# JSON library for database JSON columns and large API responses: "orjson"
+# (used when installed, writes NaN and infinity as null) or "json"
+JSON_SERIALIZER = os.environ.get("JSON_SERIALIZER", "orjson").lower()
+
 ####################################
 # REDIS
 ####################################
@@ -407,6 +411,36 @@ WEBSOCKET_SENTINEL_HOSTS = os.environ.get("WEBSOCKET_SENTINEL_HOSTS", "")
 
 WEBSOCKET_SENTINEL_PORT = os.environ.get("WEBSOCKET_SENTINEL_PORT", "26379")
 
+# Seconds that Redis session pool lookups are cached locally on each worker
+WEBSOCKET_SESSION_POOL_CACHE_TTL = os.environ.get(
+    "WEBSOCKET_SESSION_POOL_CACHE_TTL", "1"
+)
+
+try:
+    WEBSOCKET_SESSION_POOL_CACHE_TTL = float(WEBSOCKET_SESSION_POOL_CACHE_TTL)
+except Exception:
+    WEBSOCKET_SESSION_POOL_CACHE_TTL = 1.0
+
+####################################
+# TASKS
+####################################
+
+# Set to "redis" to share chat generation tasks across workers/replicas
+TASK_MANAGER = os.environ.get("TASK_MANAGER", "")
+
+TASK_REDIS_URL = os.environ.get("TASK_REDIS_URL", REDIS_URL)
+
+TASK_SENTINEL_HOSTS = os.environ.get("TASK_SENTINEL_HOSTS", REDIS_SENTINEL_HOSTS)
+
+TASK_SENTINEL_PORT = os.environ.get("TASK_SENTINEL_PORT", REDIS_SENTINEL_PORT)
+
+TASK_HEARTBEAT_INTERVAL = os.environ.get("TASK_HEARTBEAT_INTERVAL", "10")
+
+try:
+    TASK_HEARTBEAT_INTERVAL = int(TASK_HEARTBEAT_INTERVAL)
+except Exception:
+    TASK_HEARTBEAT_INTERVAL = 10
+
 AIOHTTP_CLIENT_TIMEOUT = os.environ.get("AIOHTTP_CLIENT_TIMEOUT", "")
 
 if AIOHTTP_CLIENT_TIMEOUT == "":
@@ -500,6 +534,211 @@ else:
     except Exception:
         SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS = None
 
+# Merge concurrent local encode/predict calls into shared batches
+SENTENCE_TRANSFORMERS_BATCHING = (
+    os.environ.get("SENTENCE_TRANSFORMERS_BATCHING", "true").lower() == "true"
+)
+
+try:
+    SENTENCE_TRANSFORMERS_MAX_BATCH_SIZE = int(
+        os.environ.get("SENTENCE_TRANSFORMERS_MAX_BATCH_SIZE", "32")
+    )
+except ValueError:
+    SENTENCE_TRANSFORMERS_MAX_BATCH_SIZE = 32
+
+try:
+    SENTENCE_TRANSFORMERS_BATCH_WAIT_MS = float(
+        os.environ.get("SENTENCE_TRANSFORMERS_BATCH_WAIT_MS", "5")
+    )
+except ValueError:
+    SENTENCE_TRANSFORMERS_BATCH_WAIT_MS = 5.0
+
+# Store ColBERT document token embeddings at ingestion instead of re-encoding
+# every candidate document at query time
+RAG_COLBERT_STORE_DOC_EMBEDDINGS = (
+    os.environ.get("RAG_COLBERT_STORE_DOC_EMBEDDINGS", "false").lower() == "true"
+)
+
+# Megabytes of stored ColBERT document embeddings to keep per model
+try:
+    RAG_COLBERT_STORE_MAX_SIZE_MB = int(
+        os.environ.get("RAG_COLBERT_STORE_MAX_SIZE_MB", "2048")
+    )
+except ValueError:
+    RAG_COLBERT_STORE_MAX_SIZE_MB = 2048
+
+# Cache of reranker scores per (model, query, chunk), 0 disables it
+try:
+    RAG_RERANK_CACHE_TTL = int(os.environ.get("RAG_RERANK_CACHE_TTL", "3600"))
+except ValueError:
+    RAG_RERANK_CACHE_TTL = 3600
+
+try:
+    RAG_RERANK_CACHE_SIZE = int(os.environ.get("RAG_RERANK_CACHE_SIZE", "10000"))
+except ValueError:
+    RAG_RERANK_CACHE_SIZE = 10000
+
+# Share the cache between workers through Redis instead of keeping it in memory
+RAG_RERANK_CACHE_REDIS_URL = os.environ.get("RAG_RERANK_CACHE_REDIS_URL", "")
+
+####################################
+# WEB SEARCH CACHE
+####################################
+
+# Seconds to cache search engine results for, 0 disables the cache
+try:
+    WEB_SEARCH_CACHE_TTL = int(os.environ.get("WEB_SEARCH_CACHE_TTL", "900"))
+except ValueError:
+    WEB_SEARCH_CACHE_TTL = 900
+
+# Per-engine overrides of the TTL, e.g. {"tavily": 86400}
+try:
+    WEB_SEARCH_CACHE_ENGINE_TTLS = json.loads(
+        os.environ.get("WEB_SEARCH_CACHE_ENGINE_TTLS", "{}")
+    )
+except json.JSONDecodeError:
+    WEB_SEARCH_CACHE_ENGINE_TTLS = {}
+
+try:
+    WEB_SEARCH_CACHE_SIZE = int(os.environ.get("WEB_SEARCH_CACHE_SIZE", "1000"))
+except ValueError:
+    WEB_SEARCH_CACHE_SIZE = 1000
+
+WEB_SEARCH_CACHE_REDIS_URL = os.environ.get("WEB_SEARCH_CACHE_REDIS_URL", "")
+
+# Seconds to keep fetched pages for revalidation, 0 disables the page cache
+try:
+    WEB_LOADER_CACHE_TTL = int(os.environ.get("WEB_LOADER_CACHE_TTL", "86400"))
+except ValueError:
+    WEB_LOADER_CACHE_TTL = 86400
+
+# Seconds a page without Cache-Control/Expires headers is considered fresh
+try:
+    WEB_LOADER_CACHE_DEFAULT_MAX_AGE = int(
+        os.environ.get("WEB_LOADER_CACHE_DEFAULT_MAX_AGE", "300")
+    )
+except ValueError:
+    WEB_LOADER_CACHE_DEFAULT_MAX_AGE = 300
+
+try:
+    WEB_LOADER_CACHE_SIZE = int(os.environ.get("WEB_LOADER_CACHE_SIZE", "500"))
+except ValueError:
+    WEB_LOADER_CACHE_SIZE = 500
+
+WEB_LOADER_CACHE_REDIS_URL = os.environ.get("WEB_LOADER_CACHE_REDIS_URL", "")
+
+####################################
+# WEB LOADER
+####################################
+
+# Seconds to wait for a single page, 0 waits indefinitely
+try:
+    WEB_LOADER_URL_TIMEOUT = float(os.environ.get("WEB_LOADER_URL_TIMEOUT", "15"))
+except ValueError:
+    WEB_LOADER_URL_TIMEOUT = 15
+
+# Seconds to cache the addresses of the hostnames of fetched URLs
+try:
+    WEB_LOADER_DNS_CACHE_TTL = int(os.environ.get("WEB_LOADER_DNS_CACHE_TTL", "60"))
+except ValueError:
+    WEB_LOADER_DNS_CACHE_TTL = 60
+
+# Seconds to spend loading and embedding the pages of a web search before
+# answering with the pages indexed so far, 0 waits for every page
+try:
+    WEB_SEARCH_LOAD_TIME_BUDGET = float(
+        os.environ.get("WEB_SEARCH_LOAD_TIME_BUDGET", "60")
+    )
+except ValueError:
+    WEB_SEARCH_LOAD_TIME_BUDGET = 60
+
+####################################
+# HTML EXTRACTION
+####################################
+
+# Worker processes that extract text from web pages and uploaded HTML files,
+# 0 extracts in a thread of the server process instead
+try:
+    HTML_EXTRACTION_WORKERS = int(
+        os.environ.get("HTML_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1)))
+    )
+except ValueError:
+    HTML_EXTRACTION_WORKERS = min(4, os.cpu_count() or 1)
+
+# Documents larger than this are truncated before extraction
+try:
+    HTML_EXTRACTION_MAX_BYTES = int(
+        os.environ.get("HTML_EXTRACTION_MAX_BYTES", str(5 * 1024 * 1024))
+    )
+except ValueError:
+    HTML_EXTRACTION_MAX_BYTES = 5 * 1024 * 1024
+
+# Seconds to spend extracting a single document, 0 waits indefinitely
+try:
+    HTML_EXTRACTION_TIMEOUT = float(os.environ.get("HTML_EXTRACTION_TIMEOUT", "10"))
+except ValueError:
+    HTML_EXTRACTION_TIMEOUT = 10
+
+####################################
+# AUDIO
+####################################
+
+# Longer recordings are split into chunks of at most this many seconds, cut at
+# pauses, which are transcribed in parallel
+try:
+    AUDIO_STT_CHUNK_SECONDS = int(os.environ.get("AUDIO_STT_CHUNK_SECONDS", "300"))
+except ValueError:
+    AUDIO_STT_CHUNK_SECONDS = 300
+
+# Chunks transcribed at once by the local whisper model, across all requests
+try:
+    AUDIO_STT_LOCAL_CONCURRENCY = int(
+        os.environ.get("AUDIO_STT_LOCAL_CONCURRENCY", "1")
+    )
+except ValueError:
+    AUDIO_STT_LOCAL_CONCURRENCY = 1
+
+# Chunks sent at once to an external STT engine, across all requests
+try:
+    AUDIO_STT_REMOTE_CONCURRENCY = int(
+        os.environ.get("AUDIO_STT_REMOTE_CONCURRENCY", "4")
+    )
+except ValueError:
+    AUDIO_STT_REMOTE_CONCURRENCY = 4
+
+# Sentences synthesized at once for a streamed speech response
+try:
+    AUDIO_TTS_STREAM_CONCURRENCY = int(
+        os.environ.get("AUDIO_TTS_STREAM_CONCURRENCY", "4")
+    )
+except ValueError:
+    AUDIO_TTS_STREAM_CONCURRENCY = 4
+
+# Megabytes of synthesized speech to keep cached
+try:
+    SPEECH_CACHE_MAX_SIZE_MB = int(os.environ.get("SPEECH_CACHE_MAX_SIZE_MB", "512"))
+except ValueError:
+    SPEECH_CACHE_MAX_SIZE_MB = 512
+
+# Megabytes of transcripts to keep cached
+try:
+    TRANSCRIPTION_CACHE_MAX_SIZE_MB = int(
+        os.environ.get("TRANSCRIPTION_CACHE_MAX_SIZE_MB", "64")
+    )
+except ValueError:
+    TRANSCRIPTION_CACHE_MAX_SIZE_MB = 64
+
+####################################
+# MODEL LIFECYCLE
+####################################
+
+# Unload local embedding/reranking/whisper models after this many idle seconds,
+# 0 keeps them loaded
+try:
+    MODEL_IDLE_UNLOAD_TTL = int(os.environ.get("MODEL_IDLE_UNLOAD_TTL", "0"))
+except ValueError:
+    MODEL_IDLE_UNLOAD_TTL = 0
+
 ####################################
 # OFFLINE_MODE
 ####################################
@@ -531,6 +770,21 @@ AUDIT_EXCLUDED_PATHS = os.getenv("AUDIT_EXCLUDED_PATHS", "/chats,/chat,/folders"
 AUDIT_EXCLUDED_PATHS = [path.strip() for path in AUDIT_EXCLUDED_PATHS]
 AUDIT_EXCLUDED_PATHS = [path.lstrip("/") for path in AUDIT_EXCLUDED_PATHS]
 
+# Audit log entries waiting to be written, further entries are dropped
+try:
+    AUDIT_LOG_QUEUE_SIZE = int(os.environ.get("AUDIT_LOG_QUEUE_SIZE", "10000"))
+except ValueError:
+    AUDIT_LOG_QUEUE_SIZE = 10000
+
+# Maximum number of audit log entries written at a time
+try:
+    AUDIT_LOG_BATCH_SIZE = int(os.environ.get("AUDIT_LOG_BATCH_SIZE", "100"))
+except ValueError:
+    AUDIT_LOG_BATCH_SIZE = 100
+
+# Also write audit log entries to stdout, e.g. for a log collector
+ENABLE_AUDIT_STDOUT = os.environ.get("ENABLE_AUDIT_STDOUT", "False").lower() == "true"
+
 
 ####################################
 # OPENTELEMETRY
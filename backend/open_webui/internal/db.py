@@ -1,9 +1,9 @@
-import json
 import logging
 from contextlib import contextmanager
 from typing import Any, Optional
 
 from open_webui.internal.wrappers import register_connection
+from open_webui.utils.serializer import dumps, loads
 from open_webui.env import (
     OPEN_WEBUI_DIR,
     DATABASE_URL,
@@ -31,21 +31,21 @@ class JSONField(types.TypeDecorator):
     cache_ok = True
 
     def process_bind_param(self, value: Optional[_T], dialect: Dialect) -> Any:
-        return json.dumps(value)
+        return dumps(value)
 
     def process_result_value(self, value: Optional[_T], dialect: Dialect) -> Any:
         if value is not None:
-            return json.loads(value)
+            return loads(value)
 
     def copy(self, **kw: Any) -> Self:
         return JSONField(self.impl.length)
 
     def db_value(self, value):
-        return json.dumps(value)
+        return dumps(value)
 
     def python_value(self, value):
         if value is not None:
-            return json.loads(value)
+            return loads(value)
 
 
 # Workaround to handle the peewee migration
@@ -76,14 +76,19 @@ handle_peewee_migration(DATABASE_URL)
 
 
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
+# For the JSON columns, e.g. Chat.chat
+JSON_SERIALIZATION_KWARGS = {"json_serializer": dumps, "json_deserializer": loads}
 if "sqlite" in SQLALCHEMY_DATABASE_URL:
     engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **JSON_SERIALIZATION_KWARGS,
     )
 else:
     if DATABASE_POOL_SIZE > 0:
         engine = create_engine(
             SQLALCHEMY_DATABASE_URL,
+            **JSON_SERIALIZATION_KWARGS,
             pool_size=DATABASE_POOL_SIZE,
             max_overflow=DATABASE_POOL_MAX_OVERFLOW,
             pool_timeout=DATABASE_POOL_TIMEOUT,
@@ -93,7 +98,10 @@ else:
         )
     else:
         engine = create_engine(
-            SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, poolclass=NullPool
+            SQLALCHEMY_DATABASE_URL,
+            **JSON_SERIALIZATION_KWARGS,
+            pool_pre_ping=True,
+            poolclass=NullPool,
         )
 
 
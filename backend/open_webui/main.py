@@ -6,11 +6,9 @@ import mimetypes
 import os
 import shutil
 import sys
-import time
 import random
 
 from contextlib import asynccontextmanager
-from urllib.parse import urlencode, parse_qs, urlparse
 from pydantic import BaseModel
 from sqlalchemy import text
 
@@ -37,19 +35,16 @@ from fastapi import (
 from fastapi.openapi.docs import get_swagger_ui_html
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
-from starlette_compress import CompressMiddleware
+from starlette_compress import CompressMiddleware, remove_compress_type
 
-from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.responses import Response, StreamingResponse
 
 
 from open_webui.utils import logger
-from open_webui.utils.audit import AuditLevel, AuditLoggingMiddleware
+from open_webui.utils.audit import AUDIT_LOG_SINK, AuditLevel, AuditLoggingMiddleware
 from open_webui.utils.logger import start_logger
 from open_webui.socket.main import (
     app as socket_app,
@@ -412,23 +407,30 @@ from open_webui.utils.chat import (
     chat_action as chat_action_handler,
 )
 from open_webui.utils.middleware import process_chat_payload, process_chat_response
+from open_webui.utils.response import ORJSONResponse
 from open_webui.utils.access_control import has_access
 
 from open_webui.utils.auth import (
     get_license_data,
-    get_http_authorization_cred,
     decode_token,
     get_admin_user,
     get_verified_user,
 )
-from open_webui.utils.plugin import install_tool_and_function_dependencies
+from open_webui.utils.plugin import (
+    PLUGIN_CACHE,
+    install_tool_and_function_dependencies,
+)
+from open_webui.retrieval.loaders.html import shutdown_extraction_pool
+from open_webui.utils.model_manager import MODEL_MANAGER, periodic_model_lifecycle
 from open_webui.utils.oauth import OAuthManager
-from open_webui.utils.security_headers import SecurityHeadersMiddleware
+from open_webui.utils.asgi import RequestMiddleware
+from open_webui.utils.static_files import PrecompressedStaticFiles
 
 from open_webui.tasks import (
     list_task_ids_by_chat_id,
     stop_task,
     list_tasks,
+    periodic_task_registry_heartbeat,
 )  # Import from tasks.py
 
 from open_webui.utils.redis import get_sentinels_from_env
@@ -443,21 +445,6 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
-class SPAStaticFiles(StaticFiles):
-    async def get_response(self, path: str, scope):
-        try:
-            return await super().get_response(path, scope)
-        except (HTTPException, StarletteHTTPException) as ex:
-            if ex.status_code == 404:
-                if path.endswith(".js"):
-                    # Return 404 for javascript files
-                    raise ex
-                else:
-                    return await super().get_response("index.html", scope)
-            else:
-                raise ex
-
-
 print(
     rf"""
  ██████╗ ██████╗ ███████╗███╗   ██╗    ██╗    ██╗███████╗██████╗ ██╗   ██╗██╗
@@ -484,19 +471,26 @@ async def lifespan(app: FastAPI):
     if LICENSE_KEY:
         get_license_data(app, LICENSE_KEY)
 
-    # This should be blocking (sync) so functions are not deactivated on first /get_models calls
-    # when the first user lands on the / route.
+    # Only missing packages are installed, in the background so that startup isn't
+    # held up; functions failing to import meanwhile are not deactivated.
     log.info("Installing external dependencies of functions and tools...")
-    install_tool_and_function_dependencies()
+    asyncio.create_task(asyncio.to_thread(install_tool_and_function_dependencies))
+    asyncio.create_task(PLUGIN_CACHE.listen())
 
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
         limiter.total_tokens = THREAD_POOL_SIZE
 
     asyncio.create_task(periodic_usage_pool_cleanup())
+    asyncio.create_task(periodic_task_registry_heartbeat())
+    # Load embedding/reranking models without holding up startup
+    asyncio.create_task(periodic_model_lifecycle())
 
     yield
 
+    shutdown_extraction_pool()
+    AUDIT_LOG_SINK.close()
+
 
 app = FastAPI(
     title="GiSa",
@@ -650,12 +644,11 @@ app.state.EXTERNAL_PWA_MANIFEST_URL = EXTERNAL_PWA_MANIFEST_URL
 
 app.state.USER_COUNT = None
 
-app.state.TOOLS = {}
+# Function modules are cached in PLUGIN_CACHE, tool modules share its dict so
+# that invalidations from other workers reach them
+app.state.TOOLS = PLUGIN_CACHE.tools
 app.state.TOOL_CONTENTS = {}
 
-app.state.FUNCTIONS = {}
-app.state.FUNCTION_CONTENTS = {}
-
 ########################################
 #
 # RETRIEVAL
@@ -797,6 +790,7 @@ try:
         app.state.config.RAG_EMBEDDING_ENGINE,
         app.state.config.RAG_EMBEDDING_MODEL,
         RAG_EMBEDDING_MODEL_AUTO_UPDATE,
+        lazy=True,
     )
 
     app.state.rf = get_rf(
@@ -805,6 +799,7 @@ try:
         app.state.config.RAG_EXTERNAL_RERANKER_URL,
         app.state.config.RAG_EXTERNAL_RERANKER_API_KEY,
         RAG_RERANKING_MODEL_AUTO_UPDATE,
+        lazy=True,
     )
 except Exception as e:
     log.error(f"Error updating models: {e}")
@@ -988,70 +983,13 @@ app.state.config.AUTOCOMPLETE_GENERATION_INPUT_MAX_LENGTH = (
 app.state.MODELS = {}
 
 
-class RedirectMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Check if the request is a GET request
-        if request.method == "GET":
-            path = request.url.path
-            query_params = dict(parse_qs(urlparse(str(request.url)).query))
-
-            # Check for the specific watch path and the presence of 'v' parameter
-            if path.endswith("/watch") and "v" in query_params:
-                # Extract the first 'v' parameter
-                video_id = query_params["v"][0]
-                encoded_video_id = urlencode({"youtube": video_id})
-                redirect_url = f"/?{encoded_video_id}"
-                return RedirectResponse(url=redirect_url)
-
-        # Proceed with the normal flow of other requests
-        response = await call_next(request)
-        return response
-
-
 # Add the middleware to the app
+# Only an allowlist of content types is compressed, which leaves out event streams
+# and media; WOFF fonts are on it but already compressed
+for content_type in ("application/font-woff", "font/x-woff"):
+    remove_compress_type(content_type)
 app.add_middleware(CompressMiddleware)
-app.add_middleware(RedirectMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
-
-
-@app.middleware("http")
-async def commit_session_after_request(request: Request, call_next):
-    response = await call_next(request)
-    # log.debug("Commit session after request")
-    Session.commit()
-    return response
-
-
-@app.middleware("http")
-async def check_url(request: Request, call_next):
-    start_time = int(time.time())
-    request.state.token = get_http_authorization_cred(
-        request.headers.get("Authorization")
-    )
-
-    request.state.enable_api_key = app.state.config.ENABLE_API_KEY
-    response = await call_next(request)
-    process_time = int(time.time()) - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
-
-
-@app.middleware("http")
-async def inspect_websocket(request: Request, call_next):
-    if (
-        "/ws/socket.io" in request.url.path
-        and request.query_params.get("transport") == "websocket"
-    ):
-        upgrade = (request.headers.get("Upgrade") or "").lower()
-        connection = (request.headers.get("Connection") or "").lower().split(",")
-        # Check that there's the correct headers for an upgrade, else reject the connection
-        # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
-        if upgrade != "websocket" or "upgrade" not in connection:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={"detail": "Invalid WebSocket upgrade request"},
-            )
-    return await call_next(request)
+app.add_middleware(RequestMiddleware)
 
 
 app.add_middleware(
@@ -1124,7 +1062,7 @@ if audit_level != AuditLevel.NONE:
 ##################################
 
 
-@app.get("/api/models")
+@app.get("/api/models", response_class=ORJSONResponse)
 async def get_models(request: Request, user=Depends(get_verified_user)):
     def get_filtered_models(models, user):
         filtered_models = []
@@ -1668,7 +1606,7 @@ async def stop_task_endpoint(task_id: str, user=Depends(get_verified_user)):
 
 @app.get("/api/tasks")
 async def list_tasks_endpoint(user=Depends(get_verified_user)):
-    return {"tasks": list_tasks()}
+    return {"tasks": await list_tasks()}
 
 
 @app.get("/api/tasks/chat/{chat_id}")
@@ -1677,7 +1615,7 @@ async def list_tasks_by_chat_id_endpoint(chat_id: str, user=Depends(get_verified
     if chat is None or chat.user_id != user.id:
         return {"task_ids": []}
 
-    task_ids = list_task_ids_by_chat_id(chat_id)
+    task_ids = await list_task_ids_by_chat_id(chat_id)
 
     print(f"Task IDs for chat {chat_id}: {task_ids}")
     return {"task_ids": task_ids}
@@ -1938,7 +1876,7 @@ async def get_opensearch_xml():
 
 @app.get("/health")
 async def healthcheck():
-    return {"status": True}
+    return {"status": True, "models": MODEL_MANAGER.get_status()}
 
 
 @app.get("/health/db")
@@ -1967,7 +1905,7 @@ if os.path.exists(FRONTEND_BUILD_DIR):
     mimetypes.add_type("text/javascript", ".js")
     app.mount(
         "/",
-        SPAStaticFiles(directory=FRONTEND_BUILD_DIR, html=True),
+        PrecompressedStaticFiles(directory=FRONTEND_BUILD_DIR, html=True, spa=True),
         name="spa-static-files",
     )
 else:
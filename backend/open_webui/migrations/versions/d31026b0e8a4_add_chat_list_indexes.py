@@ -0,0 +1,34 @@
+"""Add chat list indexes
+
+Revision ID: d31026b0e8a4
+Revises: 9f0c9cd09105
+Create Date: 2025-06-02 03:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d31026b0e8a4"
+down_revision = "9f0c9cd09105"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Composite indexes backing the sidebar/archive listings and keyset pagination
+    op.create_index(
+        "chat_user_id_archived_updated_at_idx",
+        "chat",
+        ["user_id", "archived", "updated_at"],
+    )
+    op.create_index(
+        "chat_user_id_pinned_updated_at_idx",
+        "chat",
+        ["user_id", "pinned", "updated_at"],
+    )
+
+
+def downgrade():
+    op.drop_index("chat_user_id_pinned_updated_at_idx", table_name="chat")
+    op.drop_index("chat_user_id_archived_updated_at_idx", table_name="chat")
@@ -2,14 +2,14 @@ import logging
 import json
 import time
 import uuid
-from typing import Optional
+from typing import Iterator, Optional, Union
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Boolean, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Boolean, Column, Index, String, Text, JSON
 from sqlalchemy import or_, func, select, and_, text
 from sqlalchemy.sql import exists
 
@@ -39,6 +39,14 @@ class Chat(Base):
     meta = Column(JSON, server_default="{}")
     folder_id = Column(Text, nullable=True)
 
+    __table_args__ = (
+        # Sidebar/archive listings filter on user + archived/pinned and page by updated_at
+        Index(
+            "chat_user_id_archived_updated_at_idx", "user_id", "archived", "updated_at"
+        ),
+        Index("chat_user_id_pinned_updated_at_idx", "user_id", "pinned", "updated_at"),
+    )
+
 
 class ChatModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -104,6 +112,21 @@ class ChatTitleIdResponse(BaseModel):
     created_at: int
 
 
+class ChatListItemResponse(ChatTitleIdResponse):
+    # Column projection of `Chat` for listings, without the `chat` JSON
+    pinned: Optional[bool] = False
+    folder_id: Optional[str] = None
+    tags: list[str] = []
+
+
+def decode_chat_list_cursor(cursor: str) -> tuple[int, str]:
+    # Cursors are "<updated_at>:<id>" of the last item of the previous page
+    updated_at, _, id = cursor.partition(":")
+    if not id:
+        raise ValueError("Invalid cursor")
+    return int(updated_at), id
+
+
 class ChatTable:
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
@@ -376,42 +399,93 @@ class ChatTable:
         except Exception:
             return False
 
+    def _get_chat_list_query(self, db, cursor: Optional[str] = None):
+        # Only project the columns needed for listings so the (potentially
+        # multi-MB) `chat` JSON column is never loaded.
+        query = db.query(Chat).with_entities(
+            Chat.id,
+            Chat.title,
+            Chat.updated_at,
+            Chat.created_at,
+            Chat.pinned,
+            Chat.folder_id,
+            Chat.meta,
+        )
+        return self._apply_chat_list_cursor(query, cursor)
+
+    def _apply_chat_list_cursor(self, query, cursor: Optional[str] = None):
+        if not cursor:
+            return query
+
+        # Keyset pagination on (updated_at, id), matching the default ordering
+        updated_at, id = decode_chat_list_cursor(cursor)
+        return query.filter(
+            or_(
+                Chat.updated_at < updated_at,
+                and_(Chat.updated_at == updated_at, Chat.id < id),
+            )
+        )
+
+    def _apply_chat_list_order(
+        self, query, filter: Optional[dict] = None, cursor: Optional[str] = None
+    ):
+        order_by = filter.get("order_by") if filter else None
+        direction = filter.get("direction") if filter else None
+
+        if order_by and direction and getattr(Chat, order_by):
+            if cursor:
+                raise ValueError("Cursor pagination requires the default ordering")
+
+            if direction.lower() == "asc":
+                return query.order_by(getattr(Chat, order_by).asc())
+            elif direction.lower() == "desc":
+                return query.order_by(getattr(Chat, order_by).desc())
+            else:
+                raise ValueError("Invalid direction for ordering")
+
+        return query.order_by(Chat.updated_at.desc(), Chat.id.desc())
+
+    def _to_chat_list_items(self, rows) -> list[ChatListItemResponse]:
+        return [
+            ChatListItemResponse(
+                id=row.id,
+                title=row.title,
+                updated_at=row.updated_at,
+                created_at=row.created_at,
+                pinned=row.pinned,
+                folder_id=row.folder_id,
+                tags=(row.meta or {}).get("tags", []),
+            )
+            for row in rows
+        ]
+
     def get_archived_chat_list_by_user_id(
         self,
         user_id: str,
         filter: Optional[dict] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> list[ChatModel]:
+        cursor: Optional[str] = None,
+    ) -> list[ChatListItemResponse]:
 
         with get_db() as db:
-            query = db.query(Chat).filter_by(user_id=user_id, archived=True)
+            query = self._get_chat_list_query(db, cursor).filter(
+                Chat.user_id == user_id, Chat.archived == True
+            )
 
             if filter:
                 query_key = filter.get("query")
                 if query_key:
                     query = query.filter(Chat.title.ilike(f"%{query_key}%"))
 
-                order_by = filter.get("order_by")
-                direction = filter.get("direction")
-
-                if order_by and direction and getattr(Chat, order_by):
-                    if direction.lower() == "asc":
-                        query = query.order_by(getattr(Chat, order_by).asc())
-                    elif direction.lower() == "desc":
-                        query = query.order_by(getattr(Chat, order_by).desc())
-                    else:
-                        raise ValueError("Invalid direction for ordering")
-            else:
-                query = query.order_by(Chat.updated_at.desc())
+            query = self._apply_chat_list_order(query, filter, cursor)
 
-            if skip:
+            if skip and not cursor:
                 query = query.offset(skip)
             if limit:
                 query = query.limit(limit)
 
-            all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_list_items(query.all())
 
     def get_chat_list_by_user_id(
         self,
@@ -420,37 +494,28 @@ class ChatTable:
         filter: Optional[dict] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> list[ChatModel]:
+        cursor: Optional[str] = None,
+    ) -> list[ChatListItemResponse]:
         with get_db() as db:
-            query = db.query(Chat).filter_by(user_id=user_id)
+            query = self._get_chat_list_query(db, cursor).filter(
+                Chat.user_id == user_id
+            )
             if not include_archived:
-                query = query.filter_by(archived=False)
+                query = query.filter(Chat.archived == False)
 
             if filter:
                 query_key = filter.get("query")
                 if query_key:
                     query = query.filter(Chat.title.ilike(f"%{query_key}%"))
 
-                order_by = filter.get("order_by")
-                direction = filter.get("direction")
-
-                if order_by and direction and getattr(Chat, order_by):
-                    if direction.lower() == "asc":
-                        query = query.order_by(getattr(Chat, order_by).asc())
-                    elif direction.lower() == "desc":
-                        query = query.order_by(getattr(Chat, order_by).desc())
-                    else:
-                        raise ValueError("Invalid direction for ordering")
-            else:
-                query = query.order_by(Chat.updated_at.desc())
+            query = self._apply_chat_list_order(query, filter, cursor)
 
-            if skip:
+            if skip and not cursor:
                 query = query.offset(skip)
             if limit:
                 query = query.limit(limit)
 
-            all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_list_items(query.all())
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -458,6 +523,7 @@ class ChatTable:
         include_archived: bool = False,
         skip: Optional[int] = None,
         limit: Optional[int] = None,
+        cursor: Optional[str] = None,
     ) -> list[ChatTitleIdResponse]:
         with get_db() as db:
             query = db.query(Chat).filter_by(user_id=user_id).filter_by(folder_id=None)
@@ -466,11 +532,12 @@ class ChatTable:
             if not include_archived:
                 query = query.filter_by(archived=False)
 
-            query = query.order_by(Chat.updated_at.desc()).with_entities(
-                Chat.id, Chat.title, Chat.updated_at, Chat.created_at
-            )
+            query = self._apply_chat_list_cursor(query, cursor)
+            query = query.order_by(
+                Chat.updated_at.desc(), Chat.id.desc()
+            ).with_entities(Chat.id, Chat.title, Chat.updated_at, Chat.created_at)
 
-            if skip:
+            if skip and not cursor:
                 query = query.offset(skip)
             if limit:
                 query = query.limit(limit)
@@ -542,6 +609,67 @@ class ChatTable:
             )
             return [ChatModel.model_validate(chat) for chat in all_chats]
 
+    def iter_chats(
+        self,
+        user_id: Optional[str] = None,
+        since: Optional[int] = None,
+        batch_size: int = 100,
+    ) -> Iterator[ChatModel]:
+        """
+        Lazily yield chats for exports, newest first. With `since`, only chats
+        updated at or after that timestamp are returned, oldest first, so an
+        interrupted export can be resumed.
+
+        Chats are read in pages of `batch_size` with keyset pagination on
+        (updated_at, id), each in its own session, so no connection is held
+        while the consumer (e.g. a slow download) processes a page.
+        """
+        ascending = since is not None
+        last = None
+
+        while True:
+            with get_db() as db:
+                query = db.query(Chat)
+                if user_id:
+                    query = query.filter_by(user_id=user_id)
+                if since is not None:
+                    query = query.filter(Chat.updated_at >= since)
+
+                if ascending:
+                    if last:
+                        query = query.filter(
+                            or_(
+                                Chat.updated_at > last.updated_at,
+                                and_(
+                                    Chat.updated_at == last.updated_at,
+                                    Chat.id > last.id,
+                                ),
+                            )
+                        )
+                    query = query.order_by(Chat.updated_at.asc(), Chat.id.asc())
+                else:
+                    if last:
+                        query = query.filter(
+                            or_(
+                                Chat.updated_at < last.updated_at,
+                                and_(
+                                    Chat.updated_at == last.updated_at,
+                                    Chat.id < last.id,
+                                ),
+                            )
+                        )
+                    query = query.order_by(Chat.updated_at.desc(), Chat.id.desc())
+
+                chats = [
+                    ChatModel.model_validate(chat)
+                    for chat in query.limit(batch_size).all()
+                ]
+
+            yield from chats
+            if len(chats) < batch_size:
+                return
+            last = chats[-1]
+
     def get_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
             all_chats = (
@@ -551,14 +679,18 @@ class ChatTable:
             )
             return [ChatModel.model_validate(chat) for chat in all_chats]
 
-    def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
+    def get_pinned_chats_by_user_id(self, user_id: str) -> list[ChatListItemResponse]:
         with get_db() as db:
-            all_chats = (
-                db.query(Chat)
-                .filter_by(user_id=user_id, pinned=True, archived=False)
-                .order_by(Chat.updated_at.desc())
+            query = (
+                self._get_chat_list_query(db)
+                .filter(
+                    Chat.user_id == user_id,
+                    Chat.pinned == True,
+                    Chat.archived == False,
+                )
+                .order_by(Chat.updated_at.desc(), Chat.id.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_list_items(query.all())
 
     def get_archived_chats_by_user_id(self, user_id: str) -> list[ChatModel]:
         with get_db() as db:
@@ -576,9 +708,10 @@ class ChatTable:
         include_archived: bool = False,
         skip: int = 0,
         limit: int = 60,
-    ) -> list[ChatModel]:
+    ) -> list[Union[ChatModel, ChatListItemResponse]]:
         """
         Filters chats based on a search query using Python, allowing pagination using skip and limit.
+        An empty query lists the chats without loading their content.
         """
         search_text = search_text.lower().strip()
 
@@ -1,14 +1,14 @@
 import logging
 import time
 import uuid
-from typing import Optional
+from typing import Iterator, Optional
 
 from open_webui.internal.db import Base, get_db
 from open_webui.models.chats import Chats
 
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
+from sqlalchemy import BigInteger, Column, Text, JSON, Boolean, and_, or_
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -152,6 +152,61 @@ class FeedbackTable:
                 .all()
             ]
 
+    def iter_feedbacks(
+        self, since: Optional[int] = None, batch_size: int = 500
+    ) -> Iterator[FeedbackModel]:
+        """
+        Lazily yield feedbacks for exports, newest first. With `since`, only
+        feedbacks updated at or after that timestamp are returned, oldest
+        first. Read in pages of `batch_size`, each in its own session, like
+        Chats.iter_chats.
+        """
+        ascending = since is not None
+        last = None
+
+        while True:
+            with get_db() as db:
+                query = db.query(Feedback)
+                if since is not None:
+                    query = query.filter(Feedback.updated_at >= since)
+
+                if ascending:
+                    if last:
+                        query = query.filter(
+                            or_(
+                                Feedback.updated_at > last.updated_at,
+                                and_(
+                                    Feedback.updated_at == last.updated_at,
+                                    Feedback.id > last.id,
+                                ),
+                            )
+                        )
+                    query = query.order_by(Feedback.updated_at.asc(), Feedback.id.asc())
+                else:
+                    if last:
+                        query = query.filter(
+                            or_(
+                                Feedback.updated_at < last.updated_at,
+                                and_(
+                                    Feedback.updated_at == last.updated_at,
+                                    Feedback.id < last.id,
+                                ),
+                            )
+                        )
+                    query = query.order_by(
+                        Feedback.updated_at.desc(), Feedback.id.desc()
+                    )
+
+                feedbacks = [
+                    FeedbackModel.model_validate(feedback)
+                    for feedback in query.limit(batch_size).all()
+                ]
+
+            yield from feedbacks
+            if len(feedbacks) < batch_size:
+                return
+            last = feedbacks[-1]
+
     def get_feedbacks_by_type(self, type: str) -> list[FeedbackModel]:
         with get_db() as db:
             return [
@@ -212,6 +212,10 @@ class FunctionsTable:
                 .all()
             ]
 
+    def get_function_updated_at_by_id(self, id: str) -> Optional[int]:
+        with get_db() as db:
+            return db.query(Function.updated_at).filter_by(id=id).scalar()
+
     def get_function_valves_by_id(self, id: str) -> Optional[dict]:
         with get_db() as db:
             try:
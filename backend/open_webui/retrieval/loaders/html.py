@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Optional, Union
+
+from fastapi.concurrency import run_in_threadpool
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    HTML_EXTRACTION_MAX_BYTES,
+    HTML_EXTRACTION_TIMEOUT,
+    HTML_EXTRACTION_WORKERS,
+)
+from open_webui.retrieval.loaders.html_worker import (
+    extract_html_content,
+    extract_html_content_with_time_limit,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Workers enforce the time limit themselves, this covers starting them up
+POOL_TIMEOUT_GRACE = 10
+# Replace workers every so often, as parsing leaves their memory fragmented
+MAX_TASKS_PER_WORKER = 500
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if HTML_EXTRACTION_WORKERS <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork, as the server process runs threads
+            _pool = ProcessPoolExecutor(
+                max_workers=HTML_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=MAX_TASKS_PER_WORKER,
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_extraction_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _truncate(html: Union[str, bytes], source: str) -> Union[str, bytes]:
+    # Truncated here rather than in the worker, to avoid sending it the rest
+    if HTML_EXTRACTION_MAX_BYTES and len(html) > HTML_EXTRACTION_MAX_BYTES:
+        log.info(
+            f"Truncating {source} from {len(html)} to {HTML_EXTRACTION_MAX_BYTES} bytes"
+        )
+        return html[:HTML_EXTRACTION_MAX_BYTES]
+    return html
+
+
+def _submit(pool: ProcessPoolExecutor, html: Union[str, bytes], source: str):
+    return pool.submit(
+        extract_html_content_with_time_limit,
+        html,
+        source,
+        timeout=HTML_EXTRACTION_TIMEOUT or None,
+    )
+
+
+def _get_pool_timeout() -> Optional[float]:
+    return (
+        HTML_EXTRACTION_TIMEOUT + POOL_TIMEOUT_GRACE
+        if HTML_EXTRACTION_TIMEOUT
+        else None
+    )
+
+
+def extract_html(html: Union[str, bytes], source: str) -> tuple[str, dict]:
+    """
+    Extract the readable text and metadata (title, description, language) of
+    an HTML document in a worker process, see extract_html_content. Raises
+    TimeoutError if that takes longer than HTML_EXTRACTION_TIMEOUT.
+    """
+    html = _truncate(html, source)
+    pool = get_extraction_pool()
+    if pool is None:
+        return extract_html_content(html, source)
+
+    try:
+        return _submit(pool, html, source).result(timeout=_get_pool_timeout())
+    except BrokenProcessPool:
+        # A worker died, e.g. killed for running out of memory
+        _discard_pool(pool)
+        raise
+
+
+async def aextract_html(html: Union[str, bytes], source: str) -> tuple[str, dict]:
+    """Async version of extract_html, never blocking the event loop."""
+    html = _truncate(html, source)
+    pool = get_extraction_pool()
+    if pool is None:
+        return await run_in_threadpool(extract_html_content, html, source)
+
+    try:
+        return await asyncio.wait_for(
+            asyncio.wrap_future(_submit(pool, html, source)),
+            timeout=_get_pool_timeout(),
+        )
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+class HTMLLoader(BaseLoader):
+    """Load the readable text of an HTML file, extracted by extract_html."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def lazy_load(self) -> Iterator[Document]:
+        with open(self.file_path, "rb") as f:
+            # The encoding is detected from the document itself
+            html = f.read(HTML_EXTRACTION_MAX_BYTES or -1)
+
+        text, metadata = extract_html(html, self.file_path)
+        yield Document(page_content=text, metadata=metadata)
@@ -0,0 +1,199 @@
+# HTML text extraction, run in the worker processes of the extraction pool
+# (see html.py). Worker processes import this module, so it must not import
+# open_webui.env, which loads torch.
+
+import copy
+import re
+import signal
+from typing import Optional, Union
+
+from bs4 import UnicodeDammit
+
+# Optional lxml import, falls back to BeautifulSoup's html.parser
+try:
+    import lxml.html
+    from lxml import etree
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Elements that never contain readable text
+REMOVED_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "canvas",
+    "iframe",
+    "object",
+    "embed",
+    "head",
+]
+# Page chrome, dropped when looking for the main content
+BOILERPLATE_TAGS = ["nav", "aside", "header", "footer"]
+BLOCK_TAGS = [
+    "address",
+    "article",
+    "blockquote",
+    "br",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "hr",
+    "li",
+    "main",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "tr",
+    "ul",
+]
+CELL_TAGS = ["td", "th"]
+
+# Main content shorter than this is assumed to be a false positive, e.g. an
+# empty <main> in a page that puts its content elsewhere
+MIN_MAIN_CONTENT_LENGTH = 200
+
+XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+def normalize_text(text: str) -> str:
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def decode_html(html: Union[str, bytes]) -> str:
+    if isinstance(html, bytes):
+        # Honours BOMs and <meta charset>, then guesses
+        html = UnicodeDammit(html, is_html=True).unicode_markup or ""
+    # lxml refuses str input that declares its own encoding
+    return XML_DECLARATION.sub("", html, count=1)
+
+
+def _text_content(element) -> str:
+    for block in element.iter(*BLOCK_TAGS):
+        block.text = "\n" + (block.text or "")
+        block.tail = "\n" + (block.tail or "")
+    for cell in element.iter(*CELL_TAGS):
+        cell.tail = " " + (cell.tail or "")
+    return normalize_text(element.text_content())
+
+
+def _drop(element, tags: list[str]):
+    for child in list(element.iter(*tags)):
+        if child is not element and child.getparent() is not None:
+            child.drop_tree()
+
+
+def _extract_with_lxml(html: str, source: str) -> tuple[str, dict]:
+    metadata = {"source": source}
+    try:
+        root = lxml.html.document_fromstring(html)
+    except etree.ParserError:
+        # Empty document
+        return "", metadata
+
+    if title := root.findtext(".//title"):
+        metadata["title"] = title.strip()
+    if description := root.xpath("//meta[@name='description']"):
+        metadata["description"] = description[0].get("content", "No description found.")
+    metadata["language"] = root.get("lang", "No language found.")
+
+    for child in list(root.iter(etree.Comment, etree.ProcessingInstruction)):
+        if child.getparent() is not None:
+            child.drop_tree()
+    _drop(root, REMOVED_TAGS)
+
+    body = root.find("body")
+    if body is None:
+        body = root
+
+    # Prefer the largest <main>/<article>, without navigation inside it
+    candidates = body.xpath(".//main | .//article | .//*[@role='main']")
+    if candidates:
+        main = max(candidates, key=lambda element: len(element.text_content()))
+        _drop(main, ["nav", "aside"])
+        text = _text_content(main)
+        if len(text) >= MIN_MAIN_CONTENT_LENGTH:
+            return text, metadata
+
+    # Otherwise strip the page chrome, unless that leaves next to nothing
+    content = copy.deepcopy(body)
+    _drop(content, BOILERPLATE_TAGS)
+    text = _text_content(content)
+    if len(text) < MIN_MAIN_CONTENT_LENGTH:
+        text = _text_content(body)
+    return text, metadata
+
+
+def _extract_with_bs4(html: str, source: str) -> tuple[str, dict]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    metadata = {"source": source}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text().strip()
+    if description := soup.find("meta", attrs={"name": "description"}):
+        metadata["description"] = description.get("content", "No description found.")
+    if html_tag := soup.find("html"):
+        metadata["language"] = html_tag.get("lang", "No language found.")
+
+    for element in soup(REMOVED_TAGS):
+        element.decompose()
+    return normalize_text(soup.get_text("\n")), metadata
+
+
+def extract_html_content(
+    html: Union[str, bytes], source: str, max_bytes: Optional[int] = None
+) -> tuple[str, dict]:
+    """
+    Extract the readable text of an HTML document, preferring its main content
+    over navigation and other page chrome, along with its title, description
+    and language. Documents longer than `max_bytes` are truncated first.
+    """
+    if max_bytes and len(html) > max_bytes:
+        html = html[:max_bytes]
+
+    html = decode_html(html)
+    if LXML_AVAILABLE:
+        return _extract_with_lxml(html, source)
+    return _extract_with_bs4(html, source)
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError("HTML extraction timed out")
+
+
+def extract_html_content_with_time_limit(
+    html: Union[str, bytes],
+    source: str,
+    max_bytes: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> tuple[str, dict]:
+    """
+    Run extract_html_content, raising TimeoutError after `timeout` seconds.
+    Only for the main thread of a worker process, as it relies on SIGALRM.
+    """
+    if not timeout or not hasattr(signal, "setitimer"):
+        return extract_html_content(html, source, max_bytes)
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_html_content(html, source, max_bytes)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
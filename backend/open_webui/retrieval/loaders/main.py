@@ -5,7 +5,6 @@ import sys
 
 from langchain_community.document_loaders import (
     AzureAIDocumentIntelligenceLoader,
-    BSHTMLLoader,
     CSVLoader,
     Docx2txtLoader,
     OutlookMessageLoader,
@@ -22,6 +21,7 @@ from langchain_community.document_loaders import (
 from langchain_core.documents import Document
 
 from open_webui.retrieval.loaders.external_document import ExternalDocumentLoader
+from open_webui.retrieval.loaders.html import HTMLLoader
 
 from open_webui.retrieval.loaders.mistral import MistralLoader
 from open_webui.retrieval.loaders.datalab_marker import DatalabMarkerLoader
@@ -348,7 +348,7 @@ class Loader:
             elif file_ext == "xml":
                 loader = UnstructuredXMLLoader(file_path)
             elif file_ext in ["htm", "html"]:
-                loader = BSHTMLLoader(file_path, open_encoding="unicode_escape")
+                loader = HTMLLoader(file_path)
             elif file_ext == "md":
                 loader = TextLoader(file_path, autodetect_encoding=True)
             elif file_content_type == "application/epub+zip":
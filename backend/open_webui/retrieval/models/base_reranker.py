@@ -6,3 +6,10 @@ class BaseReranker(ABC):
     @abstractmethod
     def predict(self, sentences: List[Tuple[str, str]]) -> Optional[List[float]]:
         pass
+
+    def index_documents(self, documents: List[str]) -> None:
+        """
+        Optionally precompute document-side state for `documents` at ingestion
+        time so that `predict` has less to do at query time.
+        """
+        pass
@@ -0,0 +1,248 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.utils.metrics import Histogram
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+@dataclass
+class BatchRequest:
+    items: list
+    kwargs: dict
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+# Queue priorities: requests that fit in one batch go before the slices of
+# larger ones, and the stop sentinel goes last
+INTERACTIVE, BULK, STOP = 0, 1, 2
+
+
+class MicroBatcher:
+    """
+    Runs `fn(items, **kwargs)` on a dedicated worker thread, merging the items
+    of concurrent requests that arrive within `max_wait_ms` of each other into
+    one call of up to `max_batch_size` items. Requests with different kwargs
+    (e.g. embedding prompts) are never merged. Each request gets a future that
+    resolves to the results for its own items.
+
+    Requests larger than `max_batch_size` (e.g. all the chunks of a document
+    being ingested) are split into batch-sized slices that queue behind any
+    smaller request, so queries wait for at most one bulk batch.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., list],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5,
+    ):
+        self.name = name
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+
+        # (priority, sequence, request), first in first out within a priority
+        self.queue: queue.PriorityQueue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.latencies = Histogram()
+
+        self.thread = threading.Thread(
+            target=self._run, name=f"{name}-batcher", daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, items: list, **kwargs) -> Future:
+        if len(items) <= self.max_batch_size:
+            request = BatchRequest(items=items, kwargs=kwargs)
+            self._put(INTERACTIVE, request)
+            return request.future
+
+        slices = [
+            BatchRequest(items=items[i : i + self.max_batch_size], kwargs=kwargs)
+            for i in range(0, len(items), self.max_batch_size)
+        ]
+        future = Future()
+        lock = threading.Lock()
+        remaining = [len(slices)]
+
+        def on_slice_done(slice_future: Future):
+            with lock:
+                if future.done():
+                    return
+                if slice_future.exception():
+                    future.set_exception(slice_future.exception())
+                    return
+
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    future.set_result(
+                        [
+                            result
+                            for request in slices
+                            for result in request.future.result()
+                        ]
+                    )
+
+        for request in slices:
+            request.future.add_done_callback(on_slice_done)
+            self._put(BULK, request)
+        return future
+
+    def close(self):
+        self._put(STOP, None)
+
+    def get_stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "batch_size": self.batch_sizes.snapshot(),
+            "latency_seconds": self.latencies.snapshot(),
+        }
+
+    def _put(self, priority: int, request: Optional[BatchRequest]):
+        self.queue.put((priority, next(self.sequence), request))
+
+    def _collect(self) -> Optional[list[BatchRequest]]:
+        _, _, first = self.queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        size = len(first.items)
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+
+            try:
+                entry = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            request = entry[2]
+            if request is None or size + len(request.items) > self.max_batch_size:
+                # Keeps its place in the queue for the next batch (or, for the
+                # sentinel, stops the worker after this one)
+                self.queue.put(entry)
+                break
+
+            batch.append(request)
+            size += len(request.items)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            groups: dict[tuple, list[BatchRequest]] = {}
+            for request in batch:
+                key = tuple(sorted(request.kwargs.items()))
+                groups.setdefault(key, []).append(request)
+
+            for requests in groups.values():
+                self._process(requests)
+
+    def _process(self, requests: list[BatchRequest]):
+        items = [item for request in requests for item in request.items]
+        self.batch_sizes.observe(len(items))
+
+        try:
+            results = self.fn(items, **requests[0].kwargs)
+        except Exception as e:
+            log.exception(f"{self.name} batch of {len(items)} failed: {e}")
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        offset = 0
+        now = time.perf_counter()
+        for request in requests:
+            request.future.set_result(results[offset : offset + len(request.items)])
+            offset += len(request.items)
+            self.latencies.observe(now - request.enqueued_at)
+
+
+# Active batchers by name, along with the model each one serves
+BATCHERS: dict[str, tuple[Any, MicroBatcher]] = {}
+
+
+def register_batcher(
+    name: str, model: Any, fn: Callable[..., list], **kwargs
+) -> MicroBatcher:
+    """
+    Return the batcher serving `model` under `name`, replacing (and stopping)
+    the previous one if the model changed.
+    """
+    previous = BATCHERS.get(name)
+    if previous:
+        if previous[0] is model:
+            return previous[1]
+        previous[1].close()
+
+    batcher = MicroBatcher(name, fn, **kwargs)
+    BATCHERS[name] = (model, batcher)
+    return batcher
+
+
+def get_batcher_stats() -> dict:
+    return {name: batcher.get_stats() for name, (_, batcher) in BATCHERS.items()}
+
+
+def get_batched_embedding_function(model, **kwargs) -> Callable:
+    """
+    Wrap a SentenceTransformer so that concurrent encode calls share batches.
+    """
+
+    def encode(sentences: list[str], prompt: Optional[str] = None) -> list:
+        return model.encode(
+            sentences, **({"prompt": prompt} if prompt else {})
+        ).tolist()
+
+    batcher = register_batcher("embedding", model, encode, **kwargs)
+
+    def embedding_function(query, prefix=None, user=None):
+        embeddings = batcher.submit(
+            query if isinstance(query, list) else [query], prompt=prefix
+        ).result()
+        return embeddings if isinstance(query, list) else embeddings[0]
+
+    return embedding_function
+
+
+class BatchedReranker(BaseReranker):
+    """
+    Wrap a CrossEncoder so that concurrent predict calls share batches.
+    """
+
+    def __init__(self, model: Any, **kwargs):
+        self.model = model
+        self.batcher = register_batcher(
+            "reranking",
+            model,
+            lambda sentences: model.predict(sentences).tolist(),
+            **kwargs,
+        )
+
+    def predict(self, sentences: List[Tuple[str, str]]) -> Optional[List[float]]:
+        return self.batcher.submit(list(sentences)).result()
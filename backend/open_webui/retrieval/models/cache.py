@@ -0,0 +1,89 @@
+import hashlib
+import logging
+from typing import List, Optional, Tuple
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    RAG_RERANK_CACHE_TTL,
+    RAG_RERANK_CACHE_SIZE,
+    RAG_RERANK_CACHE_REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.utils.cache import get_cache
+from open_webui.utils.redis import get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+# Keys include the model, so the cache outlives reranker reloads
+RERANK_CACHE = (
+    get_cache(
+        "rerank",
+        maxsize=RAG_RERANK_CACHE_SIZE,
+        ttl=RAG_RERANK_CACHE_TTL,
+        redis_url=RAG_RERANK_CACHE_REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+    )
+    if RAG_RERANK_CACHE_TTL > 0
+    else None
+)
+
+
+def normalize_query(query: str) -> str:
+    # Only whitespace is normalized, cased rerankers score "Foo" and "foo" differently
+    return " ".join(query.split())
+
+
+class CachedReranker(BaseReranker):
+    """
+    Wrap a reranker whose scores are independent per (query, document) pair
+    and cache them by (model, normalized query hash, chunk content hash). On a
+    partial hit, only the uncached pairs are sent to the wrapped reranker.
+    """
+
+    def __init__(self, reranker, model: str, cache=None):
+        self.reranker = reranker
+        self.model = model
+        self.cache = cache if cache is not None else RERANK_CACHE
+
+    def _get_key(self, query_hash: str, document: str) -> str:
+        document_hash = hashlib.sha256(document.encode("utf-8")).hexdigest()
+        return f"{query_hash}:{document_hash}"
+
+    def index_documents(self, documents: List[str]) -> None:
+        if isinstance(self.reranker, BaseReranker):
+            self.reranker.index_documents(documents)
+
+    def predict(self, sentences: List[Tuple[str, str]]) -> Optional[List[float]]:
+        query_hashes = {}
+        keys = []
+        for query, document in sentences:
+            if query not in query_hashes:
+                query_hashes[query] = hashlib.sha256(
+                    f"{self.model}\0{normalize_query(query)}".encode("utf-8")
+                ).hexdigest()
+            keys.append(self._get_key(query_hashes[query], document))
+
+        scores = self.cache.get_many(keys)
+
+        missing = [idx for idx, key in enumerate(keys) if key not in scores]
+        if missing:
+            log.debug(
+                f"CachedReranker: {len(sentences) - len(missing)}/{len(sentences)} cached"
+            )
+
+            results = self.reranker.predict([sentences[idx] for idx in missing])
+            if results is None:
+                return None
+            if not isinstance(results, list):
+                results = results.tolist()
+
+            computed = {keys[idx]: float(score) for idx, score in zip(missing, results)}
+            self.cache.set_many(computed)
+            scores.update(computed)
+
+        return [scores[key] for key in keys]
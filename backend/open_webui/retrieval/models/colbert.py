@@ -1,5 +1,8 @@
 import os
+import hashlib
 import logging
+from pathlib import Path
+
 import torch
 import numpy as np
 from colbert.infra import ColBERTConfig
@@ -8,6 +11,7 @@ from colbert.modeling.checkpoint import Checkpoint
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.retrieval.models.colbert_store import get_document_store
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
@@ -35,7 +39,16 @@ class ColBERT(BaseReranker):
             name,
             colbert_config=ColBERTConfig(model_name=name),
         ).to(self.device)
-        pass
+
+        # Document embeddings depend on the model, so each one gets its own store
+        cache_dir = kwargs.get("cache_dir")
+        self.store = (
+            get_document_store(
+                Path(cache_dir) / hashlib.sha256(name.encode()).hexdigest()[:16]
+            )
+            if cache_dir
+            else None
+        )
 
     def calculate_similarity_scores(self, query_embeddings, document_embeddings):
 
@@ -70,20 +83,72 @@ class ColBERT(BaseReranker):
 
         return normalized_scores.detach().cpu().numpy().astype(np.float32)
 
+    def encode_documents(self, docs: list[str]) -> list[np.ndarray]:
+        # keep_dims=False strips the padding, leaving one [tokens, dim] per doc
+        embeddings = self.ckpt.docFromText(docs, bsize=32, keep_dims=False)[0]
+        return [e.detach().cpu().numpy().astype(np.float16) for e in embeddings]
+
+    def index_documents(self, documents: list[str]) -> None:
+        if not self.store:
+            return
+
+        missing = {}
+        for doc in documents:
+            chunk_id = self.store.get_chunk_id(doc)
+            if not self.store.has(chunk_id):
+                missing[chunk_id] = doc
+
+        if missing:
+            embeddings = self.encode_documents(list(missing.values()))
+            for chunk_id, matrix in zip(missing.keys(), embeddings):
+                self.store.set(chunk_id, matrix)
+
+    def get_document_embeddings(self, docs: list[str]) -> torch.Tensor:
+        """
+        Return the padded [docs, tokens, dim] document embeddings, reading
+        stored matrices and only encoding (and storing) the missing ones.
+        """
+        if not self.store:
+            return self.ckpt.docFromText(docs, bsize=32)[0]
+
+        chunk_ids = [self.store.get_chunk_id(doc) for doc in docs]
+        matrices = [self.store.get(chunk_id) for chunk_id in chunk_ids]
+
+        missing = [idx for idx, matrix in enumerate(matrices) if matrix is None]
+        if missing:
+            embeddings = self.encode_documents([docs[idx] for idx in missing])
+            for idx, matrix in zip(missing, embeddings):
+                matrices[idx] = matrix
+                self.store.set(chunk_ids[idx], matrix)
+
+        # Zero padding matches the masked positions produced by docFromText
+        padded = np.zeros(
+            (
+                len(matrices),
+                max(matrix.shape[0] for matrix in matrices),
+                matrices[0].shape[1],
+            ),
+            dtype=np.float32,
+        )
+        for idx, matrix in enumerate(matrices):
+            padded[idx, : matrix.shape[0]] = matrix
+
+        return torch.from_numpy(padded)
+
     def predict(self, sentences):
 
         query = sentences[0][0]
         docs = [i[1] for i in sentences]
 
         # Embedding the documents
-        embedded_docs = self.ckpt.docFromText(docs, bsize=32)[0]
+        embedded_docs = self.get_document_embeddings(docs)
         # Embedding the queries
         embedded_queries = self.ckpt.queryFromText([query], bsize=32)
         embedded_query = embedded_queries[0]
 
         # Calculate retrieval scores for the query against all documents
         scores = self.calculate_similarity_scores(
-            embedded_query.unsqueeze(0), embedded_docs
+            embedded_query.unsqueeze(0), embedded_docs.to(embedded_query.dtype)
         )
 
         return scores
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from open_webui.env import RAG_COLBERT_STORE_MAX_SIZE_MB, SRC_LOG_LEVELS
+from open_webui.utils.cache import DirectoryCache
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class ColBERTDocumentStore:
+    """
+    Sidecar store of per-chunk ColBERT document token embeddings. Each chunk's
+    [tokens, dim] matrix is kept as a float16 `.npy` file keyed by the chunk id,
+    which is the SHA-256 of the chunk text so it can be derived from the
+    candidate documents at rerank time. Once the files exceed `max_size` bytes,
+    the least recently used ones are deleted.
+    """
+
+    def __init__(self, path: Path, max_size: int):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.cache = DirectoryCache(self.path, max_size)
+
+    @staticmethod
+    def get_chunk_id(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _get_name(self, chunk_id: str) -> str:
+        return f"{chunk_id}.npy"
+
+    def has(self, chunk_id: str) -> bool:
+        return self.cache.get(self._get_name(chunk_id)) is not None
+
+    def get(self, chunk_id: str) -> Optional[np.ndarray]:
+        file_path = self.cache.get(self._get_name(chunk_id))
+        if not file_path:
+            return None
+        try:
+            return np.load(file_path)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, chunk_id: str, embeddings: np.ndarray):
+        def write(path: str):
+            # np.save appends .npy to paths, but not to open files
+            with open(path, "wb") as f:
+                np.save(f, embeddings.astype(np.float16))
+
+        self.cache.write(self.cache.get_path(self._get_name(chunk_id)), write)
+
+    def delete(self, chunk_id: str):
+        self.cache.delete(self._get_name(chunk_id))
+
+
+# One store per model directory, shared so that their size is tracked once
+_stores: dict[str, ColBERTDocumentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_document_store(
+    path: Path, max_size: int = RAG_COLBERT_STORE_MAX_SIZE_MB * 1024 * 1024
+) -> ColBERTDocumentStore:
+    with _stores_lock:
+        store = _stores.get(str(path))
+        if store is None:
+            store = _stores[str(path)] = ColBERTDocumentStore(path, max_size)
+        return store
+
+
+def delete_documents(directory: Path, documents: list[str]):
+    """
+    Delete the stored embeddings of `documents` for every model under
+    `directory`. Chunks shared with other collections are encoded again the
+    next time they are reranked.
+    """
+    if not os.path.isdir(directory):
+        return
+
+    chunk_ids = {ColBERTDocumentStore.get_chunk_id(doc) for doc in documents}
+    for entry in os.scandir(directory):
+        if entry.is_dir():
+            store = get_document_store(Path(entry.path))
+            for chunk_id in chunk_ids:
+                store.delete(chunk_id)
+
+
+def delete_all_documents(directory: Path):
+    """Delete the stored embeddings of every model under `directory`."""
+    if not os.path.isdir(directory):
+        return
+
+    for entry in os.scandir(directory):
+        if entry.is_dir():
+            store = get_document_store(Path(entry.path))
+            for name in os.listdir(entry.path):
+                store.cache.delete(name)
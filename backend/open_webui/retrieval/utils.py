@@ -32,6 +32,9 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     OFFLINE_MODE,
     ENABLE_FORWARD_USER_INFO_HEADERS,
+    SENTENCE_TRANSFORMERS_BATCHING,
+    SENTENCE_TRANSFORMERS_MAX_BATCH_SIZE,
+    SENTENCE_TRANSFORMERS_BATCH_WAIT_MS,
 )
 from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
@@ -420,7 +423,17 @@ def get_embedding_function(
     embedding_batch_size,
     azure_api_version=None,
 ):
-    if embedding_engine == "":
+    if embedding_engine == "" and SENTENCE_TRANSFORMERS_BATCHING and embedding_function:
+        from open_webui.retrieval.models.batching import (
+            get_batched_embedding_function,
+        )
+
+        return get_batched_embedding_function(
+            embedding_function,
+            max_batch_size=SENTENCE_TRANSFORMERS_MAX_BATCH_SIZE,
+            max_wait_ms=SENTENCE_TRANSFORMERS_BATCH_WAIT_MS,
+        )
+    elif embedding_engine == "":
         return lambda query, prefix=None, user=None: embedding_function.encode(
             query, **({"prompt": prefix} if prefix else {})
         ).tolist()
@@ -552,6 +565,9 @@ def get_sources_from_files(
                     collection_names.append(file["id"])
             elif file.get("collection_name"):
                 collection_names.append(file["collection_name"])
+            elif file.get("type") == "web_search":
+                # One collection per fetched page
+                collection_names = file.get("collection_names", [])
             elif file.get("id"):
                 if file.get("legacy"):
                     collection_names.append(f"{file['id']}")
@@ -0,0 +1,313 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    WEB_SEARCH_CACHE_TTL,
+    WEB_SEARCH_CACHE_ENGINE_TTLS,
+    WEB_SEARCH_CACHE_SIZE,
+    WEB_SEARCH_CACHE_REDIS_URL,
+    WEB_LOADER_CACHE_TTL,
+    WEB_LOADER_CACHE_DEFAULT_MAX_AGE,
+    WEB_LOADER_CACHE_SIZE,
+    WEB_LOADER_CACHE_REDIS_URL,
+)
+from open_webui.retrieval.web.main import SearchResult
+from open_webui.utils.cache import get_cache
+from open_webui.utils.metrics import Counter, Histogram
+from open_webui.utils.redis import get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+WEB_SEARCH_CACHE = (
+    get_cache(
+        "web_search",
+        maxsize=WEB_SEARCH_CACHE_SIZE,
+        ttl=WEB_SEARCH_CACHE_TTL,
+        redis_url=WEB_SEARCH_CACHE_REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+    )
+    if WEB_SEARCH_CACHE_TTL > 0
+    else None
+)
+
+WEB_PAGE_CACHE = (
+    get_cache(
+        "web_page",
+        maxsize=WEB_LOADER_CACHE_SIZE,
+        ttl=WEB_LOADER_CACHE_TTL,
+        redis_url=WEB_LOADER_CACHE_REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+    )
+    if WEB_LOADER_CACHE_TTL > 0
+    else None
+)
+
+# Collection holding the embedded chunks of each page, by URL
+WEB_PAGE_COLLECTIONS = (
+    get_cache(
+        "web_page_collection",
+        maxsize=WEB_LOADER_CACHE_SIZE,
+        ttl=WEB_LOADER_CACHE_TTL,
+        redis_url=WEB_LOADER_CACHE_REDIS_URL,
+        redis_sentinels=get_sentinels_from_env(
+            REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+        ),
+    )
+    if WEB_LOADER_CACHE_TTL > 0
+    else None
+)
+
+# Upstream searches currently running in this worker, by cache key
+INFLIGHT_SEARCHES: dict[str, asyncio.Task] = {}
+
+WEB_SEARCH_STATS: dict[str, dict] = {}
+
+WEB_PAGE_STATS = Counter("hits", "revalidated", "misses")
+
+
+def get_engine_stats(engine: str) -> dict:
+    if engine not in WEB_SEARCH_STATS:
+        WEB_SEARCH_STATS[engine] = {
+            "requests": Counter("hits", "misses", "coalesced", "errors"),
+            "upstream_latency_seconds": Histogram(),
+        }
+    return WEB_SEARCH_STATS[engine]
+
+
+def get_web_search_stats() -> dict:
+    return {
+        "engines": {
+            engine: {name: metric.snapshot() for name, metric in stats.items()}
+            for engine, stats in WEB_SEARCH_STATS.items()
+        },
+        "pages": WEB_PAGE_STATS.snapshot(),
+    }
+
+
+def get_search_cache_key(
+    engine: str,
+    query: str,
+    count: int,
+    domain_filter: Optional[list[str]],
+    engine_config: Optional[dict] = None,
+) -> str:
+    # Search engines ignore case and extra whitespace
+    normalized_query = " ".join(query.lower().split())
+    key = json.dumps(
+        [
+            engine,
+            normalized_query,
+            count,
+            sorted(domain_filter or []),
+            # Results change with the engine's URL, credentials or language
+            sorted((engine_config or {}).items()),
+        ],
+        default=str,
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+async def cached_search(
+    engine: str,
+    query: str,
+    count: int,
+    domain_filter: Optional[list[str]],
+    search: Callable[[], list[SearchResult]],
+    engine_config: Optional[dict] = None,
+) -> list[SearchResult]:
+    """
+    Return the results of `search` (a blocking call to the engine) from the
+    cache when possible. Concurrent identical searches share a single
+    upstream call. `engine_config` holds the settings the engine is called
+    with, so that changing them doesn't serve stale results.
+    """
+    stats = get_engine_stats(engine)
+    key = get_search_cache_key(engine, query, count, domain_filter, engine_config)
+
+    if WEB_SEARCH_CACHE is not None:
+        # The cache may be backed by Redis, keep it off the event loop
+        cached = await run_in_threadpool(WEB_SEARCH_CACHE.get, key)
+        if cached is not None:
+            stats["requests"].inc("hits")
+            return [SearchResult(**result) for result in cached]
+
+    task = INFLIGHT_SEARCHES.get(key)
+    if task:
+        stats["requests"].inc("coalesced")
+    else:
+        stats["requests"].inc("misses")
+
+        def search_and_store():
+            start = time.perf_counter()
+            try:
+                results = search()
+            except Exception:
+                stats["requests"].inc("errors")
+                raise
+            finally:
+                stats["upstream_latency_seconds"].observe(time.perf_counter() - start)
+
+            if WEB_SEARCH_CACHE is not None and results is not None:
+                WEB_SEARCH_CACHE.set(
+                    key,
+                    [result.model_dump() for result in results],
+                    ttl=WEB_SEARCH_CACHE_ENGINE_TTLS.get(engine),
+                )
+            return results
+
+        task = asyncio.create_task(run_in_threadpool(search_and_store))
+        INFLIGHT_SEARCHES[key] = task
+        task.add_done_callback(lambda _: INFLIGHT_SEARCHES.pop(key, None))
+
+    # Shielded so that one cancelled request doesn't cancel the search for all
+    return await asyncio.shield(task)
+
+
+####################
+# Fetched pages
+####################
+
+
+def get_page_cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def get_page_max_age(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Return how many seconds a response stays fresh according to its
+    Cache-Control/Expires headers, or None if it must not be stored.
+    """
+    directives = {}
+    for directive in headers.get("Cache-Control", "").lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+
+    try:
+        age = float(headers.get("Age", 0))
+    except ValueError:
+        age = 0
+
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(float(directives[name]) - age, 0)
+            except ValueError:
+                return 0
+
+    if "Expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["Expires"])
+            date = (
+                parsedate_to_datetime(headers["Date"]).timestamp()
+                if "Date" in headers
+                else time.time()
+            )
+            return max(expires.timestamp() - date, 0)
+        except (TypeError, ValueError):
+            # An invalid Expires means "already expired"
+            return 0
+
+    return WEB_LOADER_CACHE_DEFAULT_MAX_AGE
+
+
+def get_cached_page(url: str) -> Optional[dict]:
+    if WEB_PAGE_CACHE is None:
+        return None
+
+    return WEB_PAGE_CACHE.get(get_page_cache_key(url))
+
+
+def is_page_fresh(entry: dict) -> bool:
+    return entry["expires_at"] > time.time()
+
+
+def get_revalidation_headers(entry: Optional[dict]) -> dict:
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def set_cached_page(
+    url: str, content: str, metadata: dict, headers: Mapping[str, str]
+) -> None:
+    if WEB_PAGE_CACHE is None:
+        return
+
+    max_age = get_page_max_age(headers)
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if max_age is None or (max_age == 0 and not (etag or last_modified)):
+        # Neither fresh nor revalidatable, nothing to gain from storing it
+        return
+
+    WEB_PAGE_CACHE.set(
+        get_page_cache_key(url),
+        {
+            "content": content,
+            "metadata": metadata,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": time.time() + max_age,
+        },
+    )
+
+
+def refresh_cached_page(url: str, entry: dict, headers: Mapping[str, str]) -> None:
+    """Extend a cached page's freshness after a 304 Not Modified response."""
+    if WEB_PAGE_CACHE is None:
+        return
+
+    max_age = get_page_max_age(headers)
+    if max_age is None:
+        WEB_PAGE_CACHE.delete(get_page_cache_key(url))
+        return
+
+    WEB_PAGE_CACHE.set(
+        get_page_cache_key(url),
+        {
+            **entry,
+            "etag": headers.get("ETag", entry.get("etag")),
+            "last_modified": headers.get("Last-Modified", entry.get("last_modified")),
+            "expires_at": time.time() + max_age,
+        },
+    )
+
+
+def get_page_collection(url: str) -> Optional[dict]:
+    if WEB_PAGE_COLLECTIONS is None:
+        return None
+
+    return WEB_PAGE_COLLECTIONS.get(get_page_cache_key(url))
+
+
+def set_page_collection(url: str, entry: dict) -> None:
+    if WEB_PAGE_COLLECTIONS is None:
+        return
+
+    WEB_PAGE_COLLECTIONS.set(get_page_cache_key(url), entry)
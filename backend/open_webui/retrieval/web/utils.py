@@ -1,4 +1,5 @@
 import asyncio
+import ipaddress
 import logging
 import socket
 import ssl
@@ -12,20 +13,32 @@ from typing import (
     Dict,
     Iterator,
     List,
+    Mapping,
     Optional,
     Sequence,
+    Tuple,
     Union,
     Literal,
 )
 import aiohttp
 import certifi
+from aiohttp.abc import AbstractResolver
 import validators
 from langchain_community.document_loaders import PlaywrightURLLoader, WebBaseLoader
 from langchain_community.document_loaders.firecrawl import FireCrawlLoader
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
+from open_webui.retrieval.loaders.html import aextract_html, extract_html
 from open_webui.retrieval.loaders.tavily import TavilyLoader
 from open_webui.retrieval.loaders.external_web import ExternalWebLoader
+from open_webui.retrieval.web.cache import (
+    WEB_PAGE_STATS,
+    get_cached_page,
+    get_revalidation_headers,
+    is_page_fresh,
+    refresh_cached_page,
+    set_cached_page,
+)
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
     ENABLE_RAG_LOCAL_WEB_FETCH,
@@ -39,67 +52,150 @@ from open_webui.config import (
     EXTERNAL_WEB_LOADER_URL,
     EXTERNAL_WEB_LOADER_API_KEY,
 )
-from open_webui.env import SRC_LOG_LEVELS, AIOHTTP_CLIENT_SESSION_SSL
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    AIOHTTP_CLIENT_SESSION_SSL,
+    WEB_LOADER_URL_TIMEOUT,
+    WEB_LOADER_DNS_CACHE_TTL,
+)
+from open_webui.utils.cache import TTLCache
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-def validate_url(url: Union[str, Sequence[str]]):
-    if isinstance(url, str):
-        if isinstance(validators.url(url), validators.ValidationError):
+DNS_CACHE = TTLCache(maxsize=1024, ttl=WEB_LOADER_DNS_CACHE_TTL)
+
+
+def is_private_address(ip: str) -> bool:
+    address = ipaddress.ip_address(ip)
+    if address.version == 6 and address.ipv4_mapped:
+        # e.g. ::ffff:10.0.0.1
+        address = address.ipv4_mapped
+
+    return (
+        address.is_private
+        or address.is_loopback
+        or address.is_link_local
+        or address.is_reserved
+        or address.is_unspecified
+        or address.is_multicast
+    )
+
+
+def validate_addresses(ipv4_addresses: List[str], ipv6_addresses: List[str]):
+    """Raise if local web fetch is disabled and any address is private."""
+    if ENABLE_RAG_LOCAL_WEB_FETCH:
+        return
+
+    # validators.ipv6 has no `private` check, so both go through ipaddress
+    for ip in [*ipv4_addresses, *ipv6_addresses]:
+        if is_private_address(ip):
             raise ValueError(ERROR_MESSAGES.INVALID_URL)
-        if not ENABLE_RAG_LOCAL_WEB_FETCH:
-            # Local web fetch is disabled, filter out any URLs that resolve to private IP addresses
-            parsed_url = urllib.parse.urlparse(url)
-            # Get IPv4 and IPv6 addresses
-            ipv4_addresses, ipv6_addresses = resolve_hostname(parsed_url.hostname)
-            # Check if any of the resolved addresses are private
-            # This is technically still vulnerable to DNS rebinding attacks, as we don't control WebBaseLoader
-            for ip in ipv4_addresses:
-                if validators.ipv4(ip, private=True):
-                    raise ValueError(ERROR_MESSAGES.INVALID_URL)
-            for ip in ipv6_addresses:
-                if validators.ipv6(ip, private=True):
-                    raise ValueError(ERROR_MESSAGES.INVALID_URL)
-        return True
-    elif isinstance(url, Sequence):
-        return all(validate_url(u) for u in url)
-    else:
-        return False
 
 
-def safe_validate_urls(url: Sequence[str]) -> Sequence[str]:
+async def avalidate_url(url: str) -> bool:
+    """
+    Check that a URL is valid and, unless ENABLE_RAG_LOCAL_WEB_FETCH is set,
+    that its host does not resolve to a private address.
+    """
+    if isinstance(validators.url(url), validators.ValidationError):
+        raise ValueError(ERROR_MESSAGES.INVALID_URL)
+    if not ENABLE_RAG_LOCAL_WEB_FETCH:
+        parsed_url = urllib.parse.urlparse(url)
+        ipv4_addresses, ipv6_addresses = await aresolve_hostname(parsed_url.hostname)
+        validate_addresses(ipv4_addresses, ipv6_addresses)
+    return True
+
+
+async def asafe_validate_urls(urls: Sequence[str]) -> List[str]:
+    """Validate URLs concurrently, dropping the invalid and unresolvable ones."""
+    results = await asyncio.gather(
+        *[avalidate_url(url) for url in urls], return_exceptions=True
+    )
+
     valid_urls = []
-    for u in url:
-        try:
-            if validate_url(u):
-                valid_urls.append(u)
-        except ValueError:
-            continue
+    for url, result in zip(urls, results):
+        if result is True:
+            valid_urls.append(url)
+        elif not isinstance(result, ValueError):
+            log.debug(f"Error validating {url}: {result}")
     return valid_urls
 
 
-def resolve_hostname(hostname):
-    # Get address information
-    addr_info = socket.getaddrinfo(hostname, None)
-
+def get_addresses(addr_info) -> Tuple[List[str], List[str]]:
     # Extract IP addresses from address information
     ipv4_addresses = [info[4][0] for info in addr_info if info[0] == socket.AF_INET]
     ipv6_addresses = [info[4][0] for info in addr_info if info[0] == socket.AF_INET6]
 
-    return ipv4_addresses, ipv6_addresses
+    return list(dict.fromkeys(ipv4_addresses)), list(dict.fromkeys(ipv6_addresses))
+
 
+async def aresolve_hostname(hostname: str) -> Tuple[List[str], List[str]]:
+    """Resolve a hostname without blocking the event loop, sharing DNS_CACHE."""
+    if cached := DNS_CACHE.get(hostname):
+        return cached
 
-def extract_metadata(soup, url):
-    metadata = {"source": url}
-    if title := soup.find("title"):
-        metadata["title"] = title.get_text()
-    if description := soup.find("meta", attrs={"name": "description"}):
-        metadata["description"] = description.get("content", "No description found.")
-    if html := soup.find("html"):
-        metadata["language"] = html.get("lang", "No language found.")
-    return metadata
+    addr_info = await asyncio.get_running_loop().getaddrinfo(hostname, None)
+
+    addresses = get_addresses(addr_info)
+    DNS_CACHE.set(hostname, addresses)
+    return addresses
+
+
+class SafeResolver(AbstractResolver):
+    """
+    aiohttp resolver answering from DNS_CACHE, so that pages are fetched from
+    the addresses their URL was validated against. The addresses are checked
+    again on every connection, redirects included, so a hostname re-resolving
+    to a private address in between is refused.
+    """
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> List[Dict[str, Any]]:
+        ipv4_addresses, ipv6_addresses = await aresolve_hostname(host)
+        validate_addresses(ipv4_addresses, ipv6_addresses)
+
+        addresses = []
+        if family in (socket.AF_INET, socket.AF_UNSPEC):
+            addresses += [(socket.AF_INET, ip) for ip in ipv4_addresses]
+        if family in (socket.AF_INET6, socket.AF_UNSPEC):
+            addresses += [(socket.AF_INET6, ip) for ip in ipv6_addresses]
+        if not addresses:
+            raise OSError(f"Could not resolve {host}")
+
+        return [
+            {
+                "hostname": host,
+                "host": ip,
+                "port": port,
+                "family": address_family,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+            for address_family, ip in addresses
+        ]
+
+    async def close(self) -> None:
+        pass
+
+
+async def on_request_start(session, context, params: aiohttp.TraceRequestStartParams):
+    # aiohttp doesn't resolve IP addresses, so check redirects to them here
+    try:
+        ip = ipaddress.ip_address(params.url.host)
+    except ValueError:
+        return
+
+    if ip.version == 4:
+        validate_addresses([str(ip)], [])
+    else:
+        validate_addresses([], [str(ip)])
+
+
+SAFE_TRACE_CONFIG = aiohttp.TraceConfig()
+SAFE_TRACE_CONFIG.on_request_start.append(on_request_start)
 
 
 def verify_ssl_cert(url: str) -> bool:
@@ -492,23 +588,48 @@ class SafePlaywrightURLLoader(PlaywrightURLLoader, RateLimitMixin, URLProcessing
 class SafeWebBaseLoader(WebBaseLoader):
     """WebBaseLoader with enhanced error handling for URLs."""
 
-    def __init__(self, trust_env: bool = False, *args, **kwargs):
+    def __init__(
+        self,
+        trust_env: bool = False,
+        *args,
+        url_timeout: Optional[float] = WEB_LOADER_URL_TIMEOUT,
+        **kwargs,
+    ):
         """Initialize SafeWebBaseLoader
         Args:
             trust_env (bool, optional): set to True if using proxy to make web requests, for example
                 using http(s)_proxy environment variables. Defaults to False.
+            url_timeout (float, optional): seconds to wait for a single URL, including
+                retries. Defaults to WEB_LOADER_URL_TIMEOUT.
         """
         super().__init__(*args, **kwargs)
         self.trust_env = trust_env
+        self.url_timeout = url_timeout or None
 
-    async def _fetch(
-        self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
-    ) -> str:
-        async with aiohttp.ClientSession(trust_env=self.trust_env) as session:
+    async def _fetch_response(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        retries: int = 3,
+        cooldown: int = 2,
+        backoff: float = 1.5,
+    ) -> Tuple[int, str, Mapping[str, str]]:
+        """Fetch a URL, returning the status, body and headers of the response."""
+        # Behind a proxy, the proxy resolves the page's hostname instead
+        connector = (
+            None
+            if self.trust_env
+            else aiohttp.TCPConnector(resolver=SafeResolver(), use_dns_cache=False)
+        )
+        async with aiohttp.ClientSession(
+            trust_env=self.trust_env,
+            connector=connector,
+            trace_configs=[SAFE_TRACE_CONFIG],
+        ) as session:
             for i in range(retries):
                 try:
                     kwargs: Dict = dict(
-                        headers=self.session.headers,
+                        headers={**self.session.headers, **(headers or {})},
                         cookies=self.session.cookies.get_dict(),
                     )
                     if not self.session.verify:
@@ -520,7 +641,11 @@ class SafeWebBaseLoader(WebBaseLoader):
                     ) as response:
                         if self.raise_for_status:
                             response.raise_for_status()
-                        return await response.text()
+                        return (
+                            response.status,
+                            await response.text(),
+                            response.headers.copy(),
+                        )
                 except aiohttp.ClientConnectionError as e:
                     if i == retries - 1:
                         raise
@@ -532,76 +657,123 @@ class SafeWebBaseLoader(WebBaseLoader):
                         await asyncio.sleep(cooldown * backoff**i)
         raise ValueError("retry count exceeded")
 
-    def _unpack_fetch_results(
-        self, results: Any, urls: List[str], parser: Union[str, None] = None
-    ) -> List[Any]:
-        """Unpack fetch results into BeautifulSoup objects."""
-        from bs4 import BeautifulSoup
-
-        final_results = []
-        for i, result in enumerate(results):
-            url = urls[i]
-            if parser is None:
-                if url.endswith(".xml"):
-                    parser = "xml"
-                else:
-                    parser = self.default_parser
-                self._check_parser(parser)
-            final_results.append(BeautifulSoup(result, parser, **self.bs_kwargs))
-        return final_results
-
-    async def ascrape_all(
-        self, urls: List[str], parser: Union[str, None] = None
-    ) -> List[Any]:
-        """Async fetch all urls, then return soups for all results."""
-        results = await self.fetch_all(urls)
-        return self._unpack_fetch_results(results, urls, parser=parser)
+    async def _fetch(
+        self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
+    ) -> str:
+        _, text, _ = await self._fetch_response(
+            url, retries=retries, cooldown=cooldown, backoff=backoff
+        )
+        return text
 
-    def lazy_load(self) -> Iterator[Document]:
-        """Lazy load text from the url(s) in web_path with error handling."""
-        for path in self.web_paths:
-            try:
-                soup = self._scrape(path, bs_kwargs=self.bs_kwargs)
-                text = soup.get_text(**self.bs_get_text_kwargs)
+    def _parse_page(self, url: str, html: str) -> Document:
+        text, metadata = extract_html(html, url)
+        return Document(page_content=text, metadata=metadata)
 
-                # Build metadata
-                metadata = extract_metadata(soup, path)
+    async def _aparse_page(self, url: str, html: str) -> Document:
+        # Parsed in the extraction pool, large pages would stall the event loop
+        text, metadata = await aextract_html(html, url)
+        return Document(page_content=text, metadata=metadata)
 
-                yield Document(page_content=text, metadata=metadata)
+    async def _aload_page(
+        self, url: str, semaphore: asyncio.Semaphore
+    ) -> Optional[Document]:
+        """
+        Load a page from the page cache, revalidating or fetching it as needed.
+        Returns None if the page failed to load.
+        """
+        entry = get_cached_page(url)
+        if entry and is_page_fresh(entry):
+            WEB_PAGE_STATS.inc("hits")
+            return Document(page_content=entry["content"], metadata=entry["metadata"])
+
+        async with semaphore:
+            try:
+                status, html, headers = await asyncio.wait_for(
+                    self._fetch_response(url, headers=get_revalidation_headers(entry)),
+                    timeout=self.url_timeout,
+                )
             except Exception as e:
-                # Log the error and continue with the next URL
-                log.exception(f"Error loading {path}: {e}")
+                if self.continue_on_failure:
+                    log.warning(f"Error fetching {url}, skipping: {e!r}")
+                    return None
+                raise e
+
+        if status == 304 and entry:
+            WEB_PAGE_STATS.inc("revalidated")
+            refresh_cached_page(url, entry, headers)
+            return Document(page_content=entry["content"], metadata=entry["metadata"])
+
+        WEB_PAGE_STATS.inc("misses")
+        if status == 304:
+            # Not Modified without a page to revalidate, there's nothing to read
+            e = ValueError(f"{url} returned 304 Not Modified to a full request")
+            if self.continue_on_failure:
+                log.warning(f"Error fetching {url}, skipping: {e!r}")
+                return None
+            raise e
+
+        try:
+            document = await self._aparse_page(url, html)
+        except Exception as e:
+            if self.continue_on_failure:
+                log.warning(f"Error extracting {url}, skipping: {e!r}")
+                return None
+            raise e
+        # Error pages are still returned, as before, but never stored
+        if 200 <= status < 300:
+            set_cached_page(url, document.page_content, document.metadata, headers)
+        return document
+
+    def lazy_load(self) -> Iterator[Document]:
+        """
+        Load text from the url(s) in web_path with error handling, for callers
+        outside an event loop. Pages are fetched by alazy_load, so that they
+        are connected to through SafeResolver like async loads.
+        """
+        yield from asyncio.run(self.aload())
 
     async def alazy_load(self) -> AsyncIterator[Document]:
-        """Async lazy load text from the url(s) in web_path."""
-        results = await self.ascrape_all(self.web_paths)
-        for path, soup in zip(self.web_paths, results):
-            text = soup.get_text(**self.bs_get_text_kwargs)
-            metadata = {"source": path}
-            if title := soup.find("title"):
-                metadata["title"] = title.get_text()
-            if description := soup.find("meta", attrs={"name": "description"}):
-                metadata["description"] = description.get(
-                    "content", "No description found."
-                )
-            if html := soup.find("html"):
-                metadata["language"] = html.get("lang", "No language found.")
-            yield Document(page_content=text, metadata=metadata)
+        """
+        Async lazy load text from the url(s) in web_path, yielding each page
+        as soon as it is loaded.
+        """
+        semaphore = asyncio.Semaphore(self.requests_per_second)
+        tasks = [
+            asyncio.create_task(self._aload_page(path, semaphore))
+            for path in self.web_paths
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                document = await task
+                if document is not None:
+                    yield document
+        finally:
+            # Stop fetching the remaining pages once the consumer stops early
+            for task in tasks:
+                task.cancel()
 
     async def aload(self) -> list[Document]:
         """Load data into Document objects."""
         return [document async for document in self.alazy_load()]
 
 
-def get_web_loader(
+async def aget_web_loader(
     urls: Union[str, Sequence[str]],
     verify_ssl: bool = True,
     requests_per_second: int = 2,
     trust_env: bool = False,
 ):
-    # Check if the URLs are valid
-    safe_urls = safe_validate_urls([urls] if isinstance(urls, str) else urls)
+    """Create the configured web loader for the URLs that pass validation."""
+    safe_urls = await asafe_validate_urls([urls] if isinstance(urls, str) else urls)
+    return create_web_loader(safe_urls, verify_ssl, requests_per_second, trust_env)
+
 
+def create_web_loader(
+    safe_urls: Sequence[str],
+    verify_ssl: bool = True,
+    requests_per_second: int = 2,
+    trust_env: bool = False,
+):
     web_loader_args = {
         "web_paths": safe_urls,
         "verify_ssl": verify_ssl,
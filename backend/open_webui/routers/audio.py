@@ -1,17 +1,21 @@
+import asyncio
 import hashlib
+import io
 import json
 import logging
 import os
+import re
+import threading
 import uuid
 from functools import lru_cache
 from pathlib import Path
 from pydub import AudioSegment
-from pydub.silence import split_on_silence
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
 
 
 import aiohttp
+import anyio
 import aiofiles
 import requests
 import mimetypes
@@ -27,12 +31,14 @@ from fastapi import (
     status,
     APIRouter,
 )
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 
 
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.model_manager import MODEL_MANAGER
 from open_webui.config import (
     WHISPER_MODEL_AUTO_UPDATE,
     WHISPER_MODEL_DIR,
@@ -44,11 +50,19 @@ from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
     AIOHTTP_CLIENT_SESSION_SSL,
     AIOHTTP_CLIENT_TIMEOUT,
+    AUDIO_STT_CHUNK_SECONDS,
+    AUDIO_STT_LOCAL_CONCURRENCY,
+    AUDIO_STT_REMOTE_CONCURRENCY,
+    AUDIO_TTS_STREAM_CONCURRENCY,
     ENV,
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
     ENABLE_FORWARD_USER_INFO_HEADERS,
+    SPEECH_CACHE_MAX_SIZE_MB,
+    TRANSCRIPTION_CACHE_MAX_SIZE_MB,
 )
+from open_webui.socket.main import emit_to_user
+from open_webui.utils.cache import DirectoryCache
 
 
 router = APIRouter()
@@ -64,6 +78,29 @@ log.setLevel(SRC_LOG_LEVELS["AUDIO"])
 
 SPEECH_CACHE_DIR = CACHE_DIR / "audio" / "speech"
 SPEECH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+SPEECH_CACHE = DirectoryCache(SPEECH_CACHE_DIR, SPEECH_CACHE_MAX_SIZE_MB * 1024 * 1024)
+
+# Sentences of streamed speech end at punctuation followed by whitespace, or a
+# line break
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+MIN_SENTENCE_LENGTH = 20
+
+# Transcripts by the content of the recording and the STT settings
+TRANSCRIPTION_CACHE_DIR = CACHE_DIR / "audio" / "transcripts"
+TRANSCRIPTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+TRANSCRIPTION_CACHE = DirectoryCache(
+    TRANSCRIPTION_CACHE_DIR, TRANSCRIPTION_CACHE_MAX_SIZE_MB * 1024 * 1024
+)
+
+# Format of the chunks of split recordings. The local model reads them
+# uncompressed, external engines get a small upload (~4KB per second).
+LOCAL_CHUNK_FORMAT = {"format": "wav"}
+REMOTE_CHUNK_FORMAT = {"format": "mp3", "bitrate": "32k"}
+REMOTE_CHUNK_BYTES_PER_SECOND = 32000 // 8
+
+# Chunks are cut at the quietest 100ms in the last 10 seconds before their limit
+SILENCE_SEARCH_MS = 10000
+SILENCE_FRAME_MS = 100
 
 
 ##########################################
@@ -122,27 +159,50 @@ def convert_audio_to_mp3(file_path):
 def set_faster_whisper_model(model: str, auto_update: bool = False):
     whisper_model = None
     if model:
-        from faster_whisper import WhisperModel
-
-        faster_whisper_kwargs = {
-            "model_size_or_path": model,
-            "device": DEVICE_TYPE if DEVICE_TYPE and DEVICE_TYPE == "cuda" else "cpu",
-            "compute_type": "int8",
-            "download_root": WHISPER_MODEL_DIR,
-            "local_files_only": not auto_update,
-        }
 
-        try:
-            whisper_model = WhisperModel(**faster_whisper_kwargs)
-        except Exception:
-            log.warning(
-                "WhisperModel initialization failed, attempting download with local_files_only=False"
-            )
-            faster_whisper_kwargs["local_files_only"] = False
-            whisper_model = WhisperModel(**faster_whisper_kwargs)
+        def load_whisper_model():
+            from faster_whisper import WhisperModel
+
+            faster_whisper_kwargs = {
+                "model_size_or_path": model,
+                "device": (
+                    DEVICE_TYPE if DEVICE_TYPE and DEVICE_TYPE == "cuda" else "cpu"
+                ),
+                "compute_type": "int8",
+                # Chunks transcribed in parallel would otherwise wait on each other
+                "num_workers": max(AUDIO_STT_LOCAL_CONCURRENCY, 1),
+                "download_root": WHISPER_MODEL_DIR,
+                "local_files_only": not auto_update,
+            }
+
+            try:
+                return WhisperModel(**faster_whisper_kwargs)
+            except Exception:
+                log.warning(
+                    "WhisperModel initialization failed, attempting download with local_files_only=False"
+                )
+                faster_whisper_kwargs["local_files_only"] = False
+                return WhisperModel(**faster_whisper_kwargs)
+
+        # Managed so that it can be unloaded once idle
+        whisper_model = MODEL_MANAGER.register("whisper", load_whisper_model)
+        whisper_model.load()
     return whisper_model
 
 
+_faster_whisper_model_lock = threading.Lock()
+
+
+def get_faster_whisper_model(request):
+    # Locked, as the chunks of a recording ask for it at the same time
+    with _faster_whisper_model_lock:
+        if request.app.state.faster_whisper_model is None:
+            request.app.state.faster_whisper_model = set_faster_whisper_model(
+                request.app.state.config.WHISPER_MODEL
+            )
+    return request.app.state.faster_whisper_model
+
+
 ##########################################
 #
 # Audio API
@@ -295,31 +355,48 @@ def load_speech_pipeline(request):
         )
 
 
-@router.post("/speech")
-async def speech(request: Request, user=Depends(get_verified_user)):
-    body = await request.body()
-    name = hashlib.sha256(
-        body
-        + str(request.app.state.config.TTS_ENGINE).encode("utf-8")
-        + str(request.app.state.config.TTS_MODEL).encode("utf-8")
-    ).hexdigest()
+def get_speech_cache_name(request: Request, payload: dict) -> str:
+    config = request.app.state.config
+    key = [config.TTS_ENGINE, config.TTS_MODEL, payload]
+    if config.TTS_ENGINE == "azure":
+        # Set by the config rather than the payload
+        key += [config.TTS_VOICE, config.TTS_AZURE_SPEECH_OUTPUT_FORMAT]
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
 
-    file_path = SPEECH_CACHE_DIR.joinpath(f"{name}.mp3")
-    file_body_path = SPEECH_CACHE_DIR.joinpath(f"{name}.json")
 
-    # Check if the file already exists in the cache
-    if file_path.is_file():
-        return FileResponse(file_path)
+def is_speech_streamable(request: Request, payload: dict) -> bool:
+    """
+    Whether the speech of `payload` is MP3, whose per-sentence files can be
+    concatenated into a single stream (unlike e.g. RIFF/WAV or Ogg files).
+    """
+    config = request.app.state.config
+    if config.TTS_ENGINE == "azure":
+        return config.TTS_AZURE_SPEECH_OUTPUT_FORMAT.lower().endswith("mp3")
+    if config.TTS_ENGINE == "openai":
+        return payload.get("response_format", "mp3") == "mp3"
+    # ElevenLabs is asked for audio/mpeg, and local speech is written as MP3
+    return True
+
+
+def split_into_sentences(text: str) -> list[str]:
+    sentences = []
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        # Too short to be worth a request of its own, e.g. a list number
+        if sentences and len(sentences[-1]) < MIN_SENTENCE_LENGTH:
+            sentences[-1] += f" {sentence}"
+        else:
+            sentences.append(sentence)
+    return sentences
 
-    payload = None
-    try:
-        payload = json.loads(body.decode("utf-8"))
-    except Exception as e:
-        log.exception(e)
-        raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
+async def synthesize_speech(request: Request, payload: dict, user) -> bytes:
+    """Synthesize `payload["input"]` with the configured TTS engine."""
+    r = None
     if request.app.state.config.TTS_ENGINE == "openai":
-        payload["model"] = request.app.state.config.TTS_MODEL
+        payload = {**payload, "model": request.app.state.config.TTS_MODEL}
 
         try:
             timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
@@ -346,14 +423,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -402,14 +472,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-            return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -429,12 +492,6 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "azure":
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
-
         region = request.app.state.config.TTS_AZURE_SPEECH_REGION or "eastus"
         base_url = request.app.state.config.TTS_AZURE_SPEECH_BASE_URL
         language = request.app.state.config.TTS_VOICE
@@ -461,14 +518,7 @@ async def speech(request: Request, user=Depends(get_verified_user)):
                     ssl=AIOHTTP_CLIENT_SESSION_SSL,
                 ) as r:
                     r.raise_for_status()
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(await r.read())
-
-                    async with aiofiles.open(file_body_path, "w") as f:
-                        await f.write(json.dumps(payload))
-
-                    return FileResponse(file_path)
+                    return await r.read()
 
         except Exception as e:
             log.exception(e)
@@ -488,43 +538,131 @@ async def speech(request: Request, user=Depends(get_verified_user)):
             )
 
     elif request.app.state.config.TTS_ENGINE == "transformers":
-        payload = None
-        try:
-            payload = json.loads(body.decode("utf-8"))
-        except Exception as e:
-            log.exception(e)
-            raise HTTPException(status_code=400, detail="Invalid JSON payload")
+        # The model runs on the CPU/GPU, off the event loop
+        return await run_in_threadpool(synthesize_speech_locally, request, payload)
 
-        import torch
-        import soundfile as sf
+    raise HTTPException(status_code=400, detail="TTS engine not configured")
 
-        load_speech_pipeline(request)
 
-        embeddings_dataset = request.app.state.speech_speaker_embeddings_dataset
+def synthesize_speech_locally(request: Request, payload: dict) -> bytes:
+    import torch
+    import soundfile as sf
 
-        speaker_index = 6799
-        try:
-            speaker_index = embeddings_dataset["filename"].index(
-                request.app.state.config.TTS_MODEL
-            )
-        except Exception:
-            pass
+    load_speech_pipeline(request)
 
-        speaker_embedding = torch.tensor(
-            embeddings_dataset[speaker_index]["xvector"]
-        ).unsqueeze(0)
+    embeddings_dataset = request.app.state.speech_speaker_embeddings_dataset
 
-        speech = request.app.state.speech_synthesiser(
-            payload["input"],
-            forward_params={"speaker_embeddings": speaker_embedding},
+    speaker_index = 6799
+    try:
+        speaker_index = embeddings_dataset["filename"].index(
+            request.app.state.config.TTS_MODEL
         )
+    except Exception:
+        pass
+
+    speaker_embedding = torch.tensor(
+        embeddings_dataset[speaker_index]["xvector"]
+    ).unsqueeze(0)
+
+    speech = request.app.state.speech_synthesiser(
+        payload["input"],
+        forward_params={"speaker_embeddings": speaker_embedding},
+    )
 
-        sf.write(file_path, speech["audio"], samplerate=speech["sampling_rate"])
+    buffer = io.BytesIO()
+    sf.write(buffer, speech["audio"], samplerate=speech["sampling_rate"], format="MP3")
+    return buffer.getvalue()
 
-        async with aiofiles.open(file_body_path, "w") as f:
-            await f.write(json.dumps(payload))
 
-        return FileResponse(file_path)
+async def parse_speech_payload(request: Request) -> dict:
+    try:
+        payload = json.loads(await request.body())
+    except Exception as e:
+        log.exception(e)
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+
+    if not isinstance(payload, dict) or not isinstance(payload.get("input"), str):
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    return payload
+
+
+async def get_speech(request: Request, payload: dict, user) -> str:
+    """Return the path of the speech of the payload, synthesized unless cached."""
+    name = get_speech_cache_name(request, payload)
+
+    file_path = SPEECH_CACHE.get(f"{name}.mp3")
+    if file_path is None:
+        audio = await synthesize_speech(request, payload, user)
+        file_path = await run_in_threadpool(SPEECH_CACHE.put, f"{name}.mp3", audio)
+    return file_path
+
+
+@router.post("/speech")
+async def speech(request: Request, user=Depends(get_verified_user)):
+    payload = await parse_speech_payload(request)
+    return FileResponse(await get_speech(request, payload, user))
+
+
+@router.post("/speech/stream")
+async def speech_stream(request: Request, user=Depends(get_verified_user)):
+    """
+    Stream the speech of a long text sentence by sentence, as MP3. Sentences
+    are synthesized concurrently, up to AUDIO_TTS_STREAM_CONCURRENCY at a time,
+    and cached on their own, so that sentences repeated across texts are only
+    synthesized once.
+    """
+    payload = await parse_speech_payload(request)
+    if not is_speech_streamable(request, payload):
+        raise HTTPException(
+            status_code=400,
+            detail="Speech can only be streamed as MP3, use /speech for this format",
+        )
+
+    sentences = split_into_sentences(payload["input"])
+    if not sentences:
+        raise HTTPException(status_code=400, detail="No text to synthesize")
+
+    semaphore = asyncio.Semaphore(max(AUDIO_TTS_STREAM_CONCURRENCY, 1))
+
+    async def get_sentence_speech(sentence: str) -> bytes:
+        sentence_payload = {**payload, "input": sentence}
+        name = f"{get_speech_cache_name(request, sentence_payload)}.mp3"
+
+        file_path = SPEECH_CACHE.get(name)
+        if file_path is not None:
+            async with aiofiles.open(file_path, "rb") as f:
+                return await f.read()
+
+        async with semaphore:
+            audio = await synthesize_speech(request, sentence_payload, user)
+        await run_in_threadpool(SPEECH_CACHE.put, name, audio)
+        return audio
+
+    tasks = [asyncio.create_task(get_sentence_speech(s)) for s in sentences]
+
+    # Wait for the first sentence, so that errors can still be reported as such
+    try:
+        first = await tasks[0]
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    async def stream_speech():
+        try:
+            yield first
+            for index, task in enumerate(tasks[1:], start=1):
+                try:
+                    yield await task
+                except HTTPException as e:
+                    log.error(f"Error synthesizing sentence {index}: {e.detail}")
+                    return
+        finally:
+            # e.g. the client stopped listening
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream_speech(), media_type="audio/mpeg")
 
 
 def transcription_handler(request, file_path, metadata):
@@ -535,12 +673,7 @@ def transcription_handler(request, file_path, metadata):
     metadata = metadata or {}
 
     if request.app.state.config.STT_ENGINE == "":
-        if request.app.state.faster_whisper_model is None:
-            request.app.state.faster_whisper_model = set_faster_whisper_model(
-                request.app.state.config.WHISPER_MODEL
-            )
-
-        model = request.app.state.faster_whisper_model
+        model = get_faster_whisper_model(request)
         segments, info = model.transcribe(
             file_path,
             beam_size=5,
@@ -786,119 +919,238 @@ def transcription_handler(request, file_path, metadata):
             )
 
 
-def transcribe(request: Request, file_path: str, metadata: Optional[dict] = None):
-    log.info(f"transcribe: {file_path} {metadata}")
+_transcription_executors: dict[str, ThreadPoolExecutor] = {}
+_transcription_executors_lock = threading.Lock()
 
-    if is_audio_conversion_required(file_path):
-        file_path = convert_audio_to_mp3(file_path)
 
-    try:
-        file_path = compress_audio(file_path)
-    except Exception as e:
-        log.exception(e)
+def get_transcription_executor(engine: str) -> ThreadPoolExecutor:
+    # Shared by all requests, so that the number of chunks transcribed at once
+    # is bounded per engine rather than per recording
+    with _transcription_executors_lock:
+        if engine not in _transcription_executors:
+            max_workers = (
+                AUDIO_STT_LOCAL_CONCURRENCY
+                if engine == ""
+                else AUDIO_STT_REMOTE_CONCURRENCY
+            )
+            _transcription_executors[engine] = ThreadPoolExecutor(
+                max_workers=max(max_workers, 1),
+                thread_name_prefix=f"transcription-{engine or 'local'}",
+            )
+        return _transcription_executors[engine]
+
+
+def get_file_hash(file_path: str) -> str:
+    hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            hash.update(chunk)
+    return hash.hexdigest()
+
+
+def get_transcription_cache_name(
+    request: Request, file_hash: str, metadata: dict
+) -> str:
+    config = request.app.state.config
+    engine = config.STT_ENGINE
+    if engine == "":
+        model = config.WHISPER_MODEL
+    elif engine == "azure":
+        model = config.AUDIO_STT_AZURE_LOCALES
+    else:
+        model = config.STT_MODEL
 
-    # Always produce a list of chunk paths (could be one entry if small)
+    settings = json.dumps([engine, model, metadata.get("language")]).encode()
+    # Prefixed by the hash of the recording, see delete_cached_transcripts
+    return f"{file_hash}-{hashlib.sha256(settings).hexdigest()}.json"
+
+
+def delete_cached_transcripts(
+    file_path: Optional[str] = None, file_hash: Optional[str] = None
+):
+    """
+    Delete the cached transcripts of a recording, e.g. when it is deleted, or
+    all of them without `file_path` or its SHA-256 `file_hash`.
+    """
+    if file_path and not file_hash:
+        file_hash = get_file_hash(file_path)
+    prefix = f"{file_hash}-" if file_hash else ""
+    for name in os.listdir(TRANSCRIPTION_CACHE.directory):
+        if name.startswith(prefix) and name.endswith(".json"):
+            TRANSCRIPTION_CACHE.delete(name)
+
+
+def get_audio_duration(file_path: str) -> Optional[float]:
     try:
-        chunk_paths = split_audio(file_path, MAX_FILE_SIZE)
-        print(f"Chunk paths: {chunk_paths}")
+        return float(mediainfo(file_path)["duration"])
     except Exception as e:
-        log.exception(e)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=ERROR_MESSAGES.DEFAULT(e),
+        log.debug(f"Could not get the duration of {file_path}: {e}")
+        return None
+
+
+def get_chunk_ranges(audio: AudioSegment, max_chunk_ms: int) -> list[tuple[int, int]]:
+    """
+    Split audio into chunks of at most max_chunk_ms, returning their (start, end)
+    in milliseconds. Chunks end at the quietest moment shortly before their
+    limit, so that words aren't cut in half.
+    """
+    ranges = []
+    start = 0
+    while len(audio) - start > max_chunk_ms:
+        end = start + max_chunk_ms
+        search_start = max(end - SILENCE_SEARCH_MS, start + max_chunk_ms // 2)
+        quietest = min(
+            range(search_start, end - SILENCE_FRAME_MS + 1, SILENCE_FRAME_MS),
+            key=lambda frame: audio[frame : frame + SILENCE_FRAME_MS].rms,
+            default=end - SILENCE_FRAME_MS,
         )
+        end = quietest + SILENCE_FRAME_MS // 2
+        ranges.append((start, end))
+        start = end
+    ranges.append((start, len(audio)))
+    return ranges
+
 
-    results = []
+def transcribe_chunk(request, chunk: AudioSegment, chunk_path, chunk_format, metadata):
     try:
-        with ThreadPoolExecutor() as executor:
-            # Submit tasks for each chunk_path
-            futures = [
-                executor.submit(transcription_handler, request, chunk_path, metadata)
-                for chunk_path in chunk_paths
-            ]
-            # Gather results as they complete
-            for future in futures:
-                try:
-                    results.append(future.result())
-                except Exception as transcribe_exc:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Error transcribing chunk: {transcribe_exc}",
-                    )
+        chunk.export(chunk_path, **chunk_format)
+        return transcription_handler(request, chunk_path, metadata)
     finally:
-        # Clean up only the temporary chunks, never the original file
-        for chunk_path in chunk_paths:
-            if chunk_path != file_path and os.path.isfile(chunk_path):
-                try:
-                    os.remove(chunk_path)
-                except Exception:
-                    pass
-
-    return {
-        "text": " ".join([result["text"] for result in results]),
-    }
+        # Along with the transcript transcription_handler saves next to it
+        for path in (chunk_path, f"{os.path.splitext(chunk_path)[0]}.json"):
+            if os.path.isfile(path):
+                os.remove(path)
 
 
-def compress_audio(file_path):
-    if os.path.getsize(file_path) > MAX_FILE_SIZE:
-        id = os.path.splitext(os.path.basename(file_path))[
-            0
-        ]  # Handles names with multiple dots
-        file_dir = os.path.dirname(file_path)
+def transcribe(
+    request: Request,
+    file_path: str,
+    metadata: Optional[dict] = None,
+    event_emitter: Optional[Callable[[dict], None]] = None,
+    file_hash: Optional[str] = None,
+):
+    """
+    Transcribe an audio file with the configured STT engine.
 
-        audio = AudioSegment.from_file(file_path)
-        audio = audio.set_frame_rate(16000).set_channels(1)  # Compress audio
+    Recordings too long or too large to send at once are decoded once, split at
+    pauses and their chunks transcribed in parallel. `event_emitter` is called
+    with the transcript of each chunk as it finishes. Transcripts are cached by
+    the content of the file, hashed unless its SHA-256 `file_hash` is given.
+    """
+    log.info(f"transcribe: {file_path} {metadata}")
 
-        compressed_path = os.path.join(file_dir, f"{id}_compressed.mp3")
-        audio.export(compressed_path, format="mp3", bitrate="32k")
-        # log.debug(f"Compressed audio to {compressed_path}")  # Uncomment if log is defined
+    metadata = metadata or {}
+    engine = request.app.state.config.STT_ENGINE
 
-        return compressed_path
-    else:
-        return file_path
+    cache_name = get_transcription_cache_name(
+        request, file_hash or get_file_hash(file_path), metadata
+    )
+    cache_path = TRANSCRIPTION_CACHE.get(cache_name)
+    if cache_path:
+        log.debug(f"Using cached transcript {cache_path}")
+        with open(cache_path, "r") as f:
+            return json.load(f)
+
+    max_chunk_ms = max(AUDIO_STT_CHUNK_SECONDS, 1) * 1000
+    chunk_format = LOCAL_CHUNK_FORMAT
+    if engine != "":
+        chunk_format = REMOTE_CHUNK_FORMAT
+        # Stay well below the upload limit of the engines
+        max_chunk_ms = min(
+            max_chunk_ms,
+            int(MAX_FILE_SIZE * 0.9 / REMOTE_CHUNK_BYTES_PER_SECOND) * 1000,
+        )
 
+    duration = get_audio_duration(file_path)
+    if os.path.getsize(file_path) <= MAX_FILE_SIZE and (
+        duration is None or duration * 1000 <= max_chunk_ms
+    ):
+        # Short enough to be sent as is
+        if is_audio_conversion_required(file_path):
+            file_path = convert_audio_to_mp3(file_path)
 
-def split_audio(file_path, max_bytes, format="mp3", bitrate="32k"):
-    """
-    Splits audio into chunks not exceeding max_bytes.
-    Returns a list of chunk file paths. If audio fits, returns list with original path.
-    """
-    file_size = os.path.getsize(file_path)
-    if file_size <= max_bytes:
-        return [file_path]  # Nothing to split
+        try:
+            texts = [transcription_handler(request, file_path, metadata)["text"]]
+        except Exception as transcribe_exc:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error transcribing chunk: {transcribe_exc}",
+            )
+    else:
+        try:
+            # Downmixed and resampled to what STT models use while decoding
+            audio = AudioSegment.from_file(
+                file_path, parameters=["-ac", "1", "-ar", "16000"]
+            )
+            audio = audio.set_channels(1).set_frame_rate(16000)
+        except Exception as e:
+            log.exception(e)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ERROR_MESSAGES.DEFAULT(e),
+            )
 
-    audio = AudioSegment.from_file(file_path)
-    duration_ms = len(audio)
-    orig_size = file_size
+        if engine == "":
+            # Loaded up front, rather than by the first chunks at the same time
+            get_faster_whisper_model(request)
+
+        base = os.path.splitext(file_path)[0]
+        executor = get_transcription_executor(engine)
+        futures = {
+            executor.submit(
+                transcribe_chunk,
+                request,
+                audio[start:end],
+                f"{base}_chunk_{index}.{chunk_format['format']}",
+                chunk_format,
+                metadata,
+            ): index
+            for index, (start, end) in enumerate(get_chunk_ranges(audio, max_chunk_ms))
+        }
+        log.info(f"Transcribing {file_path} in {len(futures)} chunks")
 
-    approx_chunk_ms = max(int(duration_ms * (max_bytes / orig_size)) - 1000, 1000)
-    chunks = []
-    start = 0
-    i = 0
+        texts = [""] * len(futures)
+        try:
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    texts[index] = future.result()["text"]
+                except Exception as transcribe_exc:
+                    raise HTTPException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Error transcribing chunk: {transcribe_exc}",
+                    )
 
-    base, _ = os.path.splitext(file_path)
+                if event_emitter:
+                    event_emitter(
+                        {"chunk": index, "chunks": len(texts), "text": texts[index]}
+                    )
+        finally:
+            # Don't leave the remaining chunks of a failed recording queued
+            for future in futures:
+                future.cancel()
 
-    while start < duration_ms:
-        end = min(start + approx_chunk_ms, duration_ms)
-        chunk = audio[start:end]
-        chunk_path = f"{base}_chunk_{i}.{format}"
-        chunk.export(chunk_path, format=format, bitrate=bitrate)
+    data = {"text": " ".join(text for text in texts if text)}
+    TRANSCRIPTION_CACHE.put(cache_name, json.dumps(data).encode())
+    return data
 
-        # Reduce chunk duration if still too large
-        while os.path.getsize(chunk_path) > max_bytes and (end - start) > 5000:
-            end = start + ((end - start) // 2)
-            chunk = audio[start:end]
-            chunk.export(chunk_path, format=format, bitrate=bitrate)
 
-        if os.path.getsize(chunk_path) > max_bytes:
-            os.remove(chunk_path)
-            raise Exception("Audio chunk cannot be reduced below max file size.")
+def get_transcription_event_emitter(user_id: str, id: str) -> Callable[[dict], None]:
+    """
+    Emit the partial transcripts of `transcribe` to the sockets of the user, as
+    "transcription" events with the given id. Only works from the worker thread
+    of a sync endpoint.
+    """
 
-        chunks.append(chunk_path)
-        start = end
-        i += 1
+    def event_emitter(data: dict):
+        try:
+            anyio.from_thread.run(
+                emit_to_user, user_id, "transcription", {"id": id, **data}
+            )
+        except Exception as e:
+            log.debug(f"Could not emit partial transcript: {e}")
 
-    return chunks
+    return event_emitter
 
 
 @router.post("/transcriptions")
@@ -940,7 +1192,12 @@ def transcription(
             if language:
                 metadata = {"language": language}
 
-            result = transcribe(request, file_path, metadata)
+            result = transcribe(
+                request,
+                file_path,
+                metadata,
+                event_emitter=get_transcription_event_emitter(user.id, filename),
+            )
 
             return {
                 **result,
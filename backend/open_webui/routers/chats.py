@@ -7,6 +7,7 @@ from open_webui.socket.main import get_event_emitter
 from open_webui.models.chats import (
     ChatForm,
     ChatImportForm,
+    ChatListItemResponse,
     ChatResponse,
     Chats,
     ChatTitleIdResponse,
@@ -18,16 +19,19 @@ from open_webui.config import ENABLE_ADMIN_CHAT_ACCESS, ENABLE_ADMIN_EXPORT
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 
+from open_webui.utils.response import ORJSONResponse
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_permission
+from open_webui.utils.export import get_export_response
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 ############################
 # GetChatList
@@ -37,15 +41,28 @@ router = APIRouter()
 @router.get("/", response_model=list[ChatTitleIdResponse])
 @router.get("/list", response_model=list[ChatTitleIdResponse])
 async def get_session_user_chat_list(
-    user=Depends(get_verified_user), page: Optional[int] = None
+    user=Depends(get_verified_user),
+    page: Optional[int] = None,
+    cursor: Optional[str] = None,
 ):
-    if page is not None:
-        limit = 60
-        skip = (page - 1) * limit
+    try:
+        if cursor is not None:
+            return Chats.get_chat_title_id_list_by_user_id(
+                user.id, cursor=cursor, limit=60
+            )
+        elif page is not None:
+            limit = 60
+            skip = (page - 1) * limit
 
-        return Chats.get_chat_title_id_list_by_user_id(user.id, skip=skip, limit=limit)
-    else:
-        return Chats.get_chat_title_id_list_by_user_id(user.id)
+            return Chats.get_chat_title_id_list_by_user_id(
+                user.id, skip=skip, limit=limit
+            )
+        else:
+            return Chats.get_chat_title_id_list_by_user_id(user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=ERROR_MESSAGES.DEFAULT(e)
+        )
 
 
 ############################
@@ -73,10 +90,11 @@ async def delete_all_user_chats(request: Request, user=Depends(get_verified_user
 ############################
 
 
-@router.get("/list/user/{user_id}", response_model=list[ChatTitleIdResponse])
+@router.get("/list/user/{user_id}", response_model=list[ChatListItemResponse])
 async def get_user_chat_list_by_user_id(
     user_id: str,
     page: Optional[int] = None,
+    cursor: Optional[str] = None,
     query: Optional[str] = None,
     order_by: Optional[str] = None,
     direction: Optional[str] = None,
@@ -102,9 +120,19 @@ async def get_user_chat_list_by_user_id(
     if direction:
         filter["direction"] = direction
 
-    return Chats.get_chat_list_by_user_id(
-        user_id, include_archived=True, filter=filter, skip=skip, limit=limit
-    )
+    try:
+        return Chats.get_chat_list_by_user_id(
+            user_id,
+            include_archived=True,
+            filter=filter,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=ERROR_MESSAGES.DEFAULT(e)
+        )
 
 
 ############################
@@ -211,12 +239,9 @@ async def get_chats_by_folder_id(folder_id: str, user=Depends(get_verified_user)
 ############################
 
 
-@router.get("/pinned", response_model=list[ChatTitleIdResponse])
+@router.get("/pinned", response_model=list[ChatListItemResponse])
 async def get_user_pinned_chats(user=Depends(get_verified_user)):
-    return [
-        ChatTitleIdResponse(**chat.model_dump())
-        for chat in Chats.get_pinned_chats_by_user_id(user.id)
-    ]
+    return Chats.get_pinned_chats_by_user_id(user.id)
 
 
 ############################
@@ -224,12 +249,24 @@ async def get_user_pinned_chats(user=Depends(get_verified_user)):
 ############################
 
 
-@router.get("/all", response_model=list[ChatResponse])
-async def get_user_chats(user=Depends(get_verified_user)):
-    return [
-        ChatResponse(**chat.model_dump())
-        for chat in Chats.get_chats_by_user_id(user.id)
-    ]
+@router.get("/all", response_class=StreamingResponse)
+async def get_user_chats(
+    format: Optional[str] = None,
+    since: Optional[int] = None,
+    compress: bool = False,
+    user=Depends(get_verified_user),
+):
+    try:
+        return get_export_response(
+            Chats.iter_chats(user_id=user.id, since=since),
+            "chats",
+            format=format,
+            compress=compress,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=ERROR_MESSAGES.DEFAULT(e)
+        )
 
 
 ############################
@@ -267,14 +304,30 @@ async def get_all_user_tags(user=Depends(get_verified_user)):
 ############################
 
 
-@router.get("/all/db", response_model=list[ChatResponse])
-async def get_all_user_chats_in_db(user=Depends(get_admin_user)):
+@router.get("/all/db", response_class=StreamingResponse)
+async def get_all_user_chats_in_db(
+    format: Optional[str] = None,
+    since: Optional[int] = None,
+    compress: bool = False,
+    user=Depends(get_admin_user),
+):
     if not ENABLE_ADMIN_EXPORT:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
-    return [ChatResponse(**chat.model_dump()) for chat in Chats.get_chats()]
+
+    try:
+        return get_export_response(
+            Chats.iter_chats(since=since),
+            "chats",
+            format=format,
+            compress=compress,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=ERROR_MESSAGES.DEFAULT(e)
+        )
 
 
 ############################
@@ -282,9 +335,10 @@ async def get_all_user_chats_in_db(user=Depends(get_admin_user)):
 ############################
 
 
-@router.get("/archived", response_model=list[ChatTitleIdResponse])
+@router.get("/archived", response_model=list[ChatListItemResponse])
 async def get_archived_session_user_chat_list(
     page: Optional[int] = None,
+    cursor: Optional[str] = None,
     query: Optional[str] = None,
     order_by: Optional[str] = None,
     direction: Optional[str] = None,
@@ -304,17 +358,18 @@ async def get_archived_session_user_chat_list(
     if direction:
         filter["direction"] = direction
 
-    chat_list = [
-        ChatTitleIdResponse(**chat.model_dump())
-        for chat in Chats.get_archived_chat_list_by_user_id(
+    try:
+        return Chats.get_archived_chat_list_by_user_id(
             user.id,
             filter=filter,
             skip=skip,
             limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=ERROR_MESSAGES.DEFAULT(e)
         )
-    ]
-
-    return chat_list
 
 
 ############################
@@ -1,5 +1,6 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from open_webui.models.users import Users, UserModel
@@ -12,6 +13,7 @@ from open_webui.models.feedbacks import (
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.export import get_export_response
 
 router = APIRouter()
 
@@ -93,10 +95,24 @@ async def delete_all_feedbacks(user=Depends(get_admin_user)):
     return success
 
 
-@router.get("/feedbacks/all/export", response_model=list[FeedbackModel])
-async def get_all_feedbacks(user=Depends(get_admin_user)):
-    feedbacks = Feedbacks.get_all_feedbacks()
-    return feedbacks
+@router.get("/feedbacks/all/export", response_class=StreamingResponse)
+async def export_all_feedbacks(
+    format: Optional[str] = None,
+    since: Optional[int] = None,
+    compress: bool = False,
+    user=Depends(get_admin_user),
+):
+    try:
+        return get_export_response(
+            Feedbacks.iter_feedbacks(since=since),
+            "feedbacks",
+            format=format,
+            compress=compress,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=ERROR_MESSAGES.DEFAULT(e)
+        )
 
 
 @router.get("/feedbacks/user", response_model=list[FeedbackUserResponse])
@@ -1,5 +1,6 @@
 import logging
 import os
+import re
 import uuid
 import json
 from fnmatch import fnmatch
@@ -18,7 +19,8 @@ from fastapi import (
     status,
     Query,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -33,8 +35,13 @@ from open_webui.models.knowledge import Knowledges
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
 from open_webui.routers.retrieval import ProcessFileForm, process_file
-from open_webui.routers.audio import transcribe
-from open_webui.storage.provider import Storage
+from open_webui.routers.audio import (
+    delete_cached_transcripts,
+    get_transcription_event_emitter,
+    transcribe,
+)
+from open_webui.storage.provider import LocalStorageProvider, Storage
+from open_webui.utils.response import ORJSONResponse
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from pydantic import BaseModel
 
@@ -42,7 +49,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 ############################
@@ -77,6 +84,24 @@ def has_access_to_file(
     return has_access
 
 
+def is_audio_file(content_type: Optional[str]) -> bool:
+    return bool(content_type) and (
+        content_type.startswith("audio/") or content_type in {"video/webm"}
+    )
+
+
+def delete_file_transcripts(file_path: str, file_hash: Optional[str] = None):
+    # The cached transcripts are keyed by the content of the recording, so
+    # without its hash it has to be read before it is deleted
+    try:
+        if file_hash:
+            delete_cached_transcripts(file_hash=file_hash)
+        else:
+            delete_cached_transcripts(Storage.get_file(file_path))
+    except Exception as e:
+        log.warning(f"Error deleting the transcripts of {file_path}: {e}")
+
+
 ############################
 # Upload File
 ############################
@@ -134,7 +159,7 @@ def upload_file(
             "OpenWebUI-User-Name": user.name,
             "OpenWebUI-File-Id": id,
         }
-        contents, file_path = Storage.upload_file(file.file, filename, tags)
+        size, sha256, file_path = Storage.upload_file(file.file, filename, tags)
 
         file_item = Files.insert_new_file(
             user.id,
@@ -146,7 +171,8 @@ def upload_file(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
+                        "sha256": sha256,
                         "data": file_metadata,
                     },
                 }
@@ -155,11 +181,15 @@ def upload_file(
         if process:
             try:
                 if file.content_type:
-                    if file.content_type.startswith("audio/") or file.content_type in {
-                        "video/webm"
-                    }:
+                    if is_audio_file(file.content_type):
                         file_path = Storage.get_file(file_path)
-                        result = transcribe(request, file_path, file_metadata)
+                        result = transcribe(
+                            request,
+                            file_path,
+                            file_metadata,
+                            event_emitter=get_transcription_event_emitter(user.id, id),
+                            file_hash=sha256,
+                        )
 
                         process_file(
                             request,
@@ -276,6 +306,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
     if result:
         try:
             Storage.delete_all_files()
+            await run_in_threadpool(delete_cached_transcripts)
         except Exception as e:
             log.exception(e)
             log.error("Error deleting files")
@@ -291,6 +322,16 @@ async def delete_all_files(user=Depends(get_admin_user)):
         )
 
 
+############################
+# Storage Cache Stats
+############################
+
+
+@router.get("/cache/stats")
+async def get_storage_cache_stats(user=Depends(get_admin_user)):
+    return {"storage_cache": Storage.get_cache_stats()}
+
+
 ############################
 # Get File By Id
 ############################
@@ -397,9 +438,77 @@ async def update_file_data_content_by_id(
 ############################
 
 
+def parse_range_header(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single `bytes=` range into inclusive (start, end) offsets, or raise
+    ValueError if it can't be satisfied. Returns None for ranges we don't
+    support (e.g. multiple ranges), in which case the whole file is sent.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", range_header.strip())
+    if not match or not any(match.groups()):
+        return None
+
+    start, end = match.groups()
+    if not start:
+        # Suffix range, e.g. "bytes=-500" for the last 500 bytes
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+    if start >= size or start > end:
+        raise ValueError(f"Range {range_header} not satisfiable for size {size}")
+    return start, end
+
+
+async def get_storage_file_response(
+    request: Request, file_path: str, headers: dict, media_type: Optional[str]
+) -> Response:
+    """
+    Stream a stored file, honouring the Range header. Files in cloud storage are
+    streamed straight from the provider instead of being downloaded first.
+    """
+    if isinstance(Storage, LocalStorageProvider):
+        # FileResponse handles Range requests itself
+        return FileResponse(
+            Storage.get_file(file_path), headers=headers, media_type=media_type
+        )
+
+    size = await run_in_threadpool(Storage.get_file_size, file_path)
+    headers = {**headers, "Accept-Ranges": "bytes"}
+
+    try:
+        byte_range = parse_range_header(request.headers.get("range", ""), size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"},
+        )
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        if not size:
+            return Response(headers=headers, media_type=media_type)
+        return StreamingResponse(
+            Storage.iter_file(file_path), headers=headers, media_type=media_type
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        Storage.iter_file(file_path, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        headers=headers,
+        media_type=media_type,
+    )
+
+
 @router.get("/{id}/content")
 async def get_file_content_by_id(
-    id: str, user=Depends(get_verified_user), attachment: bool = Query(False)
+    id: str,
+    request: Request,
+    user=Depends(get_verified_user),
+    attachment: bool = Query(False),
 ):
     file = Files.get_file_by_id(id)
 
@@ -415,44 +524,41 @@ async def get_file_content_by_id(
         or has_access_to_file(id, "read", user)
     ):
         try:
-            file_path = Storage.get_file(file.path)
-            file_path = Path(file_path)
-
-            # Check if the file already exists in the cache
-            if file_path.is_file():
-                # Handle Unicode filenames
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)  # RFC5987 encoding
-
-                content_type = file.meta.get("content_type")
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)
-                headers = {}
-
-                if attachment:
+            # Handle Unicode filenames
+            content_type = file.meta.get("content_type")
+            filename = file.meta.get("name", file.filename)
+            encoded_filename = quote(filename)  # RFC5987 encoding
+            headers = {}
+
+            if attachment:
+                headers["Content-Disposition"] = (
+                    f"attachment; filename*=UTF-8''{encoded_filename}"
+                )
+            else:
+                if content_type == "application/pdf" or filename.lower().endswith(
+                    ".pdf"
+                ):
+                    headers["Content-Disposition"] = (
+                        f"inline; filename*=UTF-8''{encoded_filename}"
+                    )
+                    content_type = "application/pdf"
+                elif content_type != "text/plain":
                     headers["Content-Disposition"] = (
                         f"attachment; filename*=UTF-8''{encoded_filename}"
                     )
-                else:
-                    if content_type == "application/pdf" or filename.lower().endswith(
-                        ".pdf"
-                    ):
-                        headers["Content-Disposition"] = (
-                            f"inline; filename*=UTF-8''{encoded_filename}"
-                        )
-                        content_type = "application/pdf"
-                    elif content_type != "text/plain":
-                        headers["Content-Disposition"] = (
-                            f"attachment; filename*=UTF-8''{encoded_filename}"
-                        )
 
-                return FileResponse(file_path, headers=headers, media_type=content_type)
-
-            else:
+            if (
+                isinstance(Storage, LocalStorageProvider)
+                and not Path(Storage.get_file(file.path)).is_file()
+            ):
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=ERROR_MESSAGES.NOT_FOUND,
                 )
+
+            return await get_storage_file_response(
+                request, file.path, headers, content_type
+            )
         except Exception as e:
             log.exception(e)
             log.error("Error getting file content")
@@ -597,6 +703,10 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
 
         result = Files.delete_file_by_id(id)
         if result:
+            if is_audio_file(file.meta.get("content_type") if file.meta else None):
+                await run_in_threadpool(
+                    delete_file_transcripts, file.path, file.meta.get("sha256")
+                )
             try:
                 Storage.delete_file(file.path)
             except Exception as e:
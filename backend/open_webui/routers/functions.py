@@ -16,6 +16,8 @@ from open_webui.utils.plugin import (
     load_function_module_by_id,
     replace_imports,
     get_function_module_from_cache,
+    REQUIREMENTS_INSTALL_STATUS,
+    PLUGIN_CACHE,
 )
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
@@ -41,6 +43,16 @@ async def get_functions(user=Depends(get_verified_user)):
     return Functions.get_functions()
 
 
+############################
+# GetRequirementsStatus
+############################
+
+
+@router.get("/requirements/status", response_model=dict)
+async def get_requirements_status(user=Depends(get_admin_user)):
+    return REQUIREMENTS_INSTALL_STATUS
+
+
 ############################
 # ExportFunctions
 ############################
@@ -139,7 +151,9 @@ class SyncFunctionsForm(FunctionForm):
 async def sync_functions(
     request: Request, form_data: SyncFunctionsForm, user=Depends(get_admin_user)
 ):
-    return Functions.sync_functions(user.id, form_data.functions)
+    functions = Functions.sync_functions(user.id, form_data.functions)
+    PLUGIN_CACHE.clear()
+    return functions
 
 
 ############################
@@ -169,10 +183,8 @@ async def create_new_function(
             )
             form_data.meta.manifest = frontmatter
 
-            FUNCTIONS = request.app.state.FUNCTIONS
-            FUNCTIONS[form_data.id] = function_module
-
             function = Functions.insert_new_function(user.id, function_type, form_data)
+            PLUGIN_CACHE.invalidate("function", form_data.id)
 
             function_cache_dir = CACHE_DIR / "functions" / form_data.id
             function_cache_dir.mkdir(parents=True, exist_ok=True)
@@ -227,6 +239,7 @@ async def toggle_function_by_id(id: str, user=Depends(get_admin_user)):
         function = Functions.update_function_by_id(
             id, {"is_active": not function.is_active}
         )
+        PLUGIN_CACHE.invalidate("function", id)
 
         if function:
             return function
@@ -254,6 +267,7 @@ async def toggle_global_by_id(id: str, user=Depends(get_admin_user)):
         function = Functions.update_function_by_id(
             id, {"is_global": not function.is_global}
         )
+        PLUGIN_CACHE.invalidate("function", id)
 
         if function:
             return function
@@ -285,13 +299,11 @@ async def update_function_by_id(
         )
         form_data.meta.manifest = frontmatter
 
-        FUNCTIONS = request.app.state.FUNCTIONS
-        FUNCTIONS[id] = function_module
-
         updated = {**form_data.model_dump(exclude={"id"}), "type": function_type}
         log.debug(updated)
 
         function = Functions.update_function_by_id(id, updated)
+        PLUGIN_CACHE.invalidate("function", id)
 
         if function:
             return function
@@ -320,9 +332,7 @@ async def delete_function_by_id(
     result = Functions.delete_function_by_id(id)
 
     if result:
-        FUNCTIONS = request.app.state.FUNCTIONS
-        if id in FUNCTIONS:
-            del FUNCTIONS[id]
+        PLUGIN_CACHE.invalidate("function", id)
 
     return result
 
@@ -399,6 +409,7 @@ async def update_function_valves_by_id(
                 form_data = {k: v for k, v in form_data.items() if v is not None}
                 valves = Valves(**form_data)
                 Functions.update_function_valves_by_id(id, valves.model_dump())
+                PLUGIN_CACHE.invalidate("function", id)
                 return valves.model_dump()
             except Exception as e:
                 log.exception(f"Error updating function values by id {id}: {e}")
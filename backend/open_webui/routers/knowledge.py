@@ -14,6 +14,7 @@ from open_webui.models.users import Users
 from open_webui.models.groups import Groups
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
 from open_webui.routers.retrieval import (
+    delete_collection,
     process_file,
     ProcessFileForm,
     process_files_batch,
@@ -22,6 +23,7 @@ from open_webui.routers.retrieval import (
 from open_webui.storage.provider import Storage
 
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.utils.response import ORJSONResponse
 from open_webui.utils.auth import get_verified_user, get_admin_user
 from open_webui.utils.access_control import has_access, has_permission, get_users_with_access
 
@@ -32,7 +34,7 @@ from open_webui.models.models import Models, ModelForm
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 ############################
 # getKnowledgeBases
@@ -540,7 +542,7 @@ def remove_file_from_knowledge_by_id(
         # Remove the file's collection from vector database
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
-            VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+            delete_collection(file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -638,7 +640,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     # Clean up vector DB
     try:
-        VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        delete_collection(id)
     except Exception as e:
         log.debug(e)
         pass
@@ -671,7 +673,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
         )
 
     try:
-        VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        delete_collection(id)
     except Exception as e:
         log.debug(e)
         pass
@@ -4,10 +4,12 @@ import mimetypes
 import os
 import shutil
 import asyncio
+import threading
 
 
 import uuid
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Iterator, List, Optional, Sequence, Union
 
@@ -43,6 +45,10 @@ from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.factory import VECTOR_DB_CLIENT
+from open_webui.retrieval.models.colbert_store import (
+    delete_all_documents,
+    delete_documents,
+)
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
@@ -50,7 +56,13 @@ from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
 from open_webui.retrieval.web.main import SearchResult
-from open_webui.retrieval.web.utils import get_web_loader
+from open_webui.retrieval.web.cache import (
+    cached_search,
+    get_page_collection,
+    get_web_search_stats,
+    set_page_collection,
+)
+from open_webui.retrieval.web.utils import aget_web_loader
 from open_webui.retrieval.web.brave import search_brave
 from open_webui.retrieval.web.kagi import search_kagi
 from open_webui.retrieval.web.mojeek import search_mojeek
@@ -73,6 +85,7 @@ from open_webui.retrieval.web.sougou import search_sougou
 from open_webui.retrieval.web.firecrawl import search_firecrawl
 from open_webui.retrieval.web.external import search_external
 
+from open_webui.retrieval.models.base_reranker import BaseReranker
 from open_webui.retrieval.utils import (
     get_embedding_function,
     get_model_path,
@@ -85,9 +98,11 @@ from open_webui.utils.misc import (
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.model_manager import MODEL_MANAGER, ManagedModel
 
 from open_webui.config import (
     ENV,
+    CACHE_DIR,
     RAG_EMBEDDING_MODEL_AUTO_UPDATE,
     RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
     RAG_RERANKING_MODEL_AUTO_UPDATE,
@@ -105,6 +120,11 @@ from open_webui.env import (
     SENTENCE_TRANSFORMERS_MODEL_KWARGS,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS,
+    SENTENCE_TRANSFORMERS_BATCHING,
+    SENTENCE_TRANSFORMERS_MAX_BATCH_SIZE,
+    SENTENCE_TRANSFORMERS_BATCH_WAIT_MS,
+    RAG_COLBERT_STORE_DOC_EMBEDDINGS,
+    WEB_SEARCH_LOAD_TIME_BUDGET,
 )
 
 from open_webui.constants import ERROR_MESSAGES
@@ -112,6 +132,8 @@ from open_webui.constants import ERROR_MESSAGES
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
+COLBERT_STORE_DIR = CACHE_DIR / "colbert"
+
 ##########################################
 #
 # Utility functions
@@ -123,21 +145,36 @@ def get_ef(
     engine: str,
     embedding_model: str,
     auto_update: bool = False,
+    lazy: bool = False,
 ):
+    """
+    Return the local embedding model as a ManagedModel, loaded right away
+    unless `lazy` is set, in which case it is loaded in the background after
+    startup or on first use.
+    """
     ef = None
     if embedding_model and engine == "":
-        from sentence_transformers import SentenceTransformer
 
-        try:
-            ef = SentenceTransformer(
+        def load_sentence_transformer():
+            from sentence_transformers import SentenceTransformer
+
+            return SentenceTransformer(
                 get_model_path(embedding_model, auto_update),
                 device=DEVICE_TYPE,
                 trust_remote_code=RAG_EMBEDDING_MODEL_TRUST_REMOTE_CODE,
                 backend=SENTENCE_TRANSFORMERS_BACKEND,
                 model_kwargs=SENTENCE_TRANSFORMERS_MODEL_KWARGS,
             )
-        except Exception as e:
-            log.debug(f"Error loading SentenceTransformer: {e}")
+
+        ef = MODEL_MANAGER.register("embedding", load_sentence_transformer)
+        if not lazy:
+            try:
+                ef.load()
+            except Exception as e:
+                log.debug(f"Error loading SentenceTransformer: {e}")
+                ef = None
+    else:
+        MODEL_MANAGER.unregister("embedding")
 
     return ef
 
@@ -148,23 +185,37 @@ def get_rf(
     external_reranker_url: str = "",
     external_reranker_api_key: str = "",
     auto_update: bool = False,
+    lazy: bool = False,
 ):
+    """
+    Return the reranking function. Local models are wrapped in a ManagedModel
+    that is loaded right away unless `lazy` is set.
+    """
     rf = None
     if reranking_model:
         if any(model in reranking_model for model in ["jinaai/jina-colbert-v2"]):
-            try:
+
+            def load_colbert():
                 from open_webui.retrieval.models.colbert import ColBERT
 
-                rf = ColBERT(
+                return ColBERT(
                     get_model_path(reranking_model, auto_update),
                     env="docker" if DOCKER else None,
+                    cache_dir=(
+                        COLBERT_STORE_DIR if RAG_COLBERT_STORE_DOC_EMBEDDINGS else None
+                    ),
                 )
 
-            except Exception as e:
-                log.error(f"ColBERT: {e}")
-                raise Exception(ERROR_MESSAGES.DEFAULT(e))
+            rf = MODEL_MANAGER.register("reranking", load_colbert)
+            if not lazy:
+                try:
+                    rf.load()
+                except Exception as e:
+                    log.error(f"ColBERT: {e}")
+                    raise Exception(ERROR_MESSAGES.DEFAULT(e))
         else:
             if engine == "external":
+                MODEL_MANAGER.unregister("reranking")
                 try:
                     from open_webui.retrieval.models.external import ExternalReranker
 
@@ -177,23 +228,63 @@ def get_rf(
                     log.error(f"ExternalReranking: {e}")
                     raise Exception(ERROR_MESSAGES.DEFAULT(e))
             else:
-                import sentence_transformers
 
-                try:
-                    rf = sentence_transformers.CrossEncoder(
+                def load_cross_encoder():
+                    import sentence_transformers
+
+                    return sentence_transformers.CrossEncoder(
                         get_model_path(reranking_model, auto_update),
                         device=DEVICE_TYPE,
                         trust_remote_code=RAG_RERANKING_MODEL_TRUST_REMOTE_CODE,
                         backend=SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
                         model_kwargs=SENTENCE_TRANSFORMERS_CROSS_ENCODER_MODEL_KWARGS,
                     )
-                except Exception as e:
-                    log.error(f"CrossEncoder: {e}")
-                    raise Exception(ERROR_MESSAGES.DEFAULT("CrossEncoder error"))
+
+                rf = MODEL_MANAGER.register("reranking", load_cross_encoder)
+                if not lazy:
+                    try:
+                        rf.load()
+                    except Exception as e:
+                        log.error(f"CrossEncoder: {e}")
+                        raise Exception(ERROR_MESSAGES.DEFAULT("CrossEncoder error"))
+
+                if SENTENCE_TRANSFORMERS_BATCHING:
+                    from open_webui.retrieval.models.batching import BatchedReranker
+
+                    rf = BatchedReranker(
+                        rf,
+                        max_batch_size=SENTENCE_TRANSFORMERS_MAX_BATCH_SIZE,
+                        max_wait_ms=SENTENCE_TRANSFORMERS_BATCH_WAIT_MS,
+                    )
+
+            # ColBERT scores are normalized over the candidate set, so only
+            # pairwise rerankers can be cached
+            from open_webui.retrieval.models.cache import RERANK_CACHE, CachedReranker
+
+            if RERANK_CACHE is not None:
+                rf = CachedReranker(rf, model=reranking_model)
+    else:
+        MODEL_MANAGER.unregister("reranking")
 
     return rf
 
 
+def delete_collection(collection_name: str):
+    """
+    Delete a collection from the vector DB along with the ColBERT embeddings
+    stored for its chunks.
+    """
+    if RAG_COLBERT_STORE_DOC_EMBEDDINGS:
+        try:
+            result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+            if result and result.documents:
+                delete_documents(COLBERT_STORE_DIR, result.documents[0])
+        except Exception as e:
+            log.warning(f"Failed to delete stored embeddings of {collection_name}: {e}")
+
+    VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+
+
 ##########################################
 #
 # API routes
@@ -230,6 +321,17 @@ async def get_status(request: Request):
     }
 
 
+@router.get("/inference/stats")
+async def get_inference_stats(user=Depends(get_admin_user)):
+    from open_webui.retrieval.models.batching import get_batcher_stats
+    from open_webui.retrieval.models.cache import RERANK_CACHE
+
+    return {
+        **get_batcher_stats(),
+        "rerank_cache": RERANK_CACHE.get_stats() if RERANK_CACHE else None,
+    }
+
+
 @router.get("/embedding")
 async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     return {
@@ -640,6 +742,7 @@ async def update_rag_config(
     # Free up memory if hybrid search is disabled
     if not request.app.state.config.ENABLE_RAG_HYBRID_SEARCH:
         request.app.state.rf = None
+        MODEL_MANAGER.unregister("reranking")
 
     request.app.state.config.TOP_K_RERANKER = (
         form_data.TOP_K_RERANKER
@@ -1072,7 +1175,14 @@ def save_docs_to_vector_db(
     split: bool = True,
     add: bool = False,
     user=None,
+    cancelled: Optional[threading.Event] = None,
 ) -> bool:
+    """
+    Split, embed and insert `docs` into `collection_name`. Returns False
+    without writing anything if `cancelled` is set before the write, e.g. by a
+    request that stopped waiting for it.
+    """
+
     def _get_docs_info(docs: list[Document]) -> str:
         docs_info = set()
 
@@ -1172,7 +1282,7 @@ def save_docs_to_vector_db(
             log.info(f"collection {collection_name} already exists")
 
             if overwrite:
-                VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                delete_collection(collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -1180,6 +1290,10 @@ def save_docs_to_vector_db(
                 )
                 return True
 
+        if cancelled and cancelled.is_set():
+            log.info(f"not adding to collection {collection_name}, cancelled")
+            return False
+
         log.info(f"adding to collection {collection_name}")
         embedding_function = get_embedding_function(
             request.app.state.config.RAG_EMBEDDING_ENGINE,
@@ -1227,17 +1341,98 @@ def save_docs_to_vector_db(
             for idx, text in enumerate(texts)
         ]
 
+        if cancelled and cancelled.is_set():
+            log.info(f"not adding to collection {collection_name}, cancelled")
+            return False
+
         VECTOR_DB_CLIENT.insert(
             collection_name=collection_name,
             items=items,
         )
 
+        reranking_function = request.app.state.rf
+        if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH and reranking_function:
+            try:
+                if isinstance(reranking_function, ManagedModel):
+                    reranking_function = reranking_function.get()
+                if isinstance(reranking_function, BaseReranker):
+                    reranking_function.index_documents(texts)
+            except Exception as e:
+                log.warning(f"Failed to index documents for reranking: {e}")
+
         return True
     except Exception as e:
         log.exception(e)
         raise e
 
 
+def get_web_page_collection_name(url: str, slot: int) -> str:
+    return f"web-page-{calculate_sha256_string(url)[:48]}-{slot}"
+
+
+def save_web_page_to_vector_db(
+    request: Request,
+    url: str,
+    docs: list[Document],
+    user=None,
+    cancelled: Optional[threading.Event] = None,
+) -> Optional[str]:
+    """
+    Save the documents loaded from a web page to a collection of their own.
+    If the page's current collection holds the same content embedded with the
+    current embedding model, it is reused without re-embedding.
+
+    Each page has two collections, used in turn: changed content is written
+    to the one not currently in use, which replaces it once fully written, so
+    requests still reading the current one aren't affected. Without a current
+    collection (e.g. once it expired from WEB_PAGE_COLLECTIONS) the first one
+    is overwritten. Returns None if `cancelled` is set before the page is
+    saved.
+    """
+    content_hash = calculate_sha256_string("\n".join(doc.page_content for doc in docs))
+    embedding_config = json.dumps(
+        {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
+
+    current = get_page_collection(url)
+    if (
+        current
+        and current["hash"] == content_hash
+        and current["embedding_config"] == embedding_config
+        and VECTOR_DB_CLIENT.has_collection(collection_name=current["collection_name"])
+    ):
+        log.debug(
+            f"reusing embedded content of {url} from {current['collection_name']}"
+        )
+        return current["collection_name"]
+
+    slot = 1 - current["slot"] if current else 0
+    collection_name = get_web_page_collection_name(url, slot)
+    if not save_docs_to_vector_db(
+        request,
+        docs,
+        collection_name,
+        overwrite=True,
+        user=user,
+        cancelled=cancelled,
+    ):
+        return None
+
+    set_page_collection(
+        url,
+        {
+            "collection_name": collection_name,
+            "slot": slot,
+            "hash": content_hash,
+            "embedding_config": embedding_config,
+        },
+    )
+    return collection_name
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -1264,7 +1459,7 @@ def process_file(
 
             try:
                 # /files/{file_id}/data/content/update
-                VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                delete_collection(f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -1521,28 +1716,35 @@ def process_youtube_video(
 
 
 @router.post("/process/web")
-def process_web(
+async def process_web(
     request: Request, form_data: ProcessUrlForm, user=Depends(get_verified_user)
 ):
     try:
-        collection_name = form_data.collection_name
-        if not collection_name:
-            collection_name = calculate_sha256_string(form_data.url)[:63]
-
-        loader = get_web_loader(
+        loader = await aget_web_loader(
             form_data.url,
             verify_ssl=request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION,
             requests_per_second=request.app.state.config.WEB_SEARCH_CONCURRENT_REQUESTS,
         )
-        docs = loader.load()
+        docs = await loader.aload()
         content = " ".join([doc.page_content for doc in docs])
 
         log.debug(f"text_content: {content}")
 
+        collection_name = form_data.collection_name
         if not request.app.state.config.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL:
-            save_docs_to_vector_db(
-                request, docs, collection_name, overwrite=True, user=user
-            )
+            if collection_name:
+                await run_in_threadpool(
+                    save_docs_to_vector_db,
+                    request,
+                    docs,
+                    collection_name,
+                    overwrite=True,
+                    user=user,
+                )
+            else:
+                collection_name = await run_in_threadpool(
+                    save_web_page_to_vector_db, request, form_data.url, docs, user=user
+                )
         else:
             collection_name = None
 
@@ -1568,6 +1770,42 @@ def process_web(
         )
 
 
+# The settings each engine is called with by search_web, besides the result
+# count and domain filter
+WEB_SEARCH_ENGINE_CONFIG_KEYS = {
+    "searxng": ["SEARXNG_QUERY_URL"],
+    "yacy": ["YACY_QUERY_URL", "YACY_USERNAME", "YACY_PASSWORD"],
+    "google_pse": ["GOOGLE_PSE_API_KEY", "GOOGLE_PSE_ENGINE_ID"],
+    "brave": ["BRAVE_SEARCH_API_KEY"],
+    "kagi": ["KAGI_SEARCH_API_KEY"],
+    "mojeek": ["MOJEEK_SEARCH_API_KEY"],
+    "bocha": ["BOCHA_SEARCH_API_KEY"],
+    "serpstack": ["SERPSTACK_API_KEY", "SERPSTACK_HTTPS"],
+    "serper": ["SERPER_API_KEY"],
+    "serply": ["SERPLY_API_KEY"],
+    "tavily": ["TAVILY_API_KEY"],
+    "searchapi": ["SEARCHAPI_API_KEY", "SEARCHAPI_ENGINE"],
+    "serpapi": ["SERPAPI_API_KEY", "SERPAPI_ENGINE"],
+    "jina": ["JINA_API_KEY"],
+    "bing": ["BING_SEARCH_V7_SUBSCRIPTION_KEY", "BING_SEARCH_V7_ENDPOINT"],
+    "exa": ["EXA_API_KEY"],
+    "perplexity": ["PERPLEXITY_API_KEY"],
+    "sougou": ["SOUGOU_API_SID", "SOUGOU_API_SK"],
+    "firecrawl": ["FIRECRAWL_API_BASE_URL", "FIRECRAWL_API_KEY"],
+    "external": ["EXTERNAL_WEB_SEARCH_URL", "EXTERNAL_WEB_SEARCH_API_KEY"],
+}
+
+
+def get_web_search_engine_config(request: Request, engine: str) -> dict:
+    config = {
+        key: getattr(request.app.state.config, key)
+        for key in WEB_SEARCH_ENGINE_CONFIG_KEYS.get(engine, [])
+    }
+    if engine == "bing":
+        config["DEFAULT_LOCALE"] = str(DEFAULT_LOCALE)
+    return config
+
+
 def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
     """Search the web using a search engine and return the results as a list of SearchResult objects.
     Will look for a search engine API key in environment variables in the following order:
@@ -1804,6 +2042,79 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         raise Exception("No search engine API key found in environment variables")
 
 
+async def load_web_pages(
+    request: Request, loader, save: bool = True, user=None
+) -> tuple[list[Document], list[str]]:
+    """
+    Load the pages of `loader` and, if `save` is set, embed each page into its
+    own collection as soon as it arrives. Pages still loading or embedding
+    after WEB_SEARCH_LOAD_TIME_BUDGET seconds are cancelled and left out.
+    """
+    docs = []
+    # The latest collection of each page, saved again as its documents arrive
+    collection_names: dict[str, str] = {}
+    pages: dict[str, list[Document]] = {}
+    save_tasks: dict[str, asyncio.Task] = {}
+    # Cancelling a task doesn't stop its thread, which checks this instead
+    cancelled = threading.Event()
+
+    async def save_page(url: str, previous: Optional[asyncio.Task]):
+        if previous:
+            # Another document of the same page arrived, save them together
+            await previous
+
+        try:
+            collection_name = await run_in_threadpool(
+                save_web_page_to_vector_db,
+                request,
+                url,
+                list(pages[url]),
+                user=user,
+                cancelled=cancelled,
+            )
+            if collection_name:
+                collection_names[url] = collection_name
+        except Exception as e:
+            log.debug(f"error saving docs from {url}: {e}")
+
+    async def load():
+        async for doc in loader.alazy_load():
+            docs.append(doc)
+            if save:
+                url = doc.metadata.get("source") or doc.page_content
+                pages.setdefault(url, []).append(doc)
+                save_tasks[url] = asyncio.create_task(
+                    save_page(url, save_tasks.get(url))
+                )
+
+        await asyncio.gather(*save_tasks.values())
+
+    task = asyncio.create_task(load())
+    try:
+        done, _ = await asyncio.wait(
+            [task], timeout=WEB_SEARCH_LOAD_TIME_BUDGET or None
+        )
+        if not done:
+            log.info(
+                f"web pages not loaded within {WEB_SEARCH_LOAD_TIME_BUDGET}s, "
+                f"continuing with {len(collection_names)} indexed pages"
+            )
+        else:
+            task.result()
+    finally:
+        cancelled.set()
+        task.cancel()
+        for save_task in save_tasks.values():
+            save_task.cancel()
+
+    return docs, list(collection_names.values())
+
+
+@router.get("/process/web/search/stats")
+async def get_web_search_cache_stats(user=Depends(get_admin_user)):
+    return get_web_search_stats()
+
+
 @router.post("/process/web/search")
 async def process_web_search(
     request: Request, form_data: SearchForm, user=Depends(get_verified_user)
@@ -1816,11 +2127,20 @@ async def process_web_search(
         )
 
         search_tasks = [
-            run_in_threadpool(
-                search_web,
-                request,
+            cached_search(
                 request.app.state.config.WEB_SEARCH_ENGINE,
                 query,
+                request.app.state.config.WEB_SEARCH_RESULT_COUNT,
+                request.app.state.config.WEB_SEARCH_DOMAIN_FILTER_LIST,
+                partial(
+                    search_web,
+                    request,
+                    request.app.state.config.WEB_SEARCH_ENGINE,
+                    query,
+                ),
+                engine_config=get_web_search_engine_config(
+                    request, request.app.state.config.WEB_SEARCH_ENGINE
+                ),
             )
             for query in form_data.queries
         ]
@@ -1860,13 +2180,18 @@ async def process_web_search(
                 if hasattr(result, "snippet")
             ]
         else:
-            loader = get_web_loader(
+            loader = await aget_web_loader(
                 urls,
                 verify_ssl=request.app.state.config.ENABLE_WEB_LOADER_SSL_VERIFICATION,
                 requests_per_second=request.app.state.config.WEB_SEARCH_CONCURRENT_REQUESTS,
                 trust_env=request.app.state.config.WEB_SEARCH_TRUST_ENV,
             )
-            docs = await loader.aload()
+            docs, collection_names = await load_web_pages(
+                request,
+                loader,
+                save=not request.app.state.config.BYPASS_WEB_SEARCH_EMBEDDING_AND_RETRIEVAL,
+                user=user,
+            )
 
         urls = [
             doc.metadata.get("source") for doc in docs if doc.metadata.get("source")
@@ -1886,8 +2211,8 @@ async def process_web_search(
                 ],
                 "loaded_count": len(docs),
             }
-        else:
-            # Create a single collection for all documents
+        elif request.app.state.config.BYPASS_WEB_SEARCH_WEB_LOADER:
+            # Create a single collection for all snippets
             collection_name = (
                 f"web-search-{calculate_sha256_string('-'.join(form_data.queries))}"[
                     :63
@@ -1912,6 +2237,13 @@ async def process_web_search(
                 "filenames": urls,
                 "loaded_count": len(docs),
             }
+        else:
+            return {
+                "status": True,
+                "collection_names": collection_names,
+                "filenames": urls,
+                "loaded_count": len(docs),
+            }
     except Exception as e:
         log.exception(e)
         raise HTTPException(
@@ -2072,6 +2404,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    delete_all_documents(COLBERT_STORE_DIR)
     Knowledges.delete_all_knowledge()
 
 
@@ -13,7 +13,11 @@ from open_webui.models.tools import (
     ToolUserResponse,
     Tools,
 )
-from open_webui.utils.plugin import load_tool_module_by_id, replace_imports
+from open_webui.utils.plugin import (
+    PLUGIN_CACHE,
+    load_tool_module_by_id,
+    replace_imports,
+)
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -221,6 +225,7 @@ async def create_new_tools(
             )
             form_data.meta.manifest = frontmatter
 
+            PLUGIN_CACHE.invalidate("tool", form_data.id)
             TOOLS = request.app.state.TOOLS
             TOOLS[form_data.id] = tool_module
 
@@ -308,6 +313,7 @@ async def update_tools_by_id(
         tool_module, frontmatter = load_tool_module_by_id(id, content=form_data.content)
         form_data.meta.manifest = frontmatter
 
+        PLUGIN_CACHE.invalidate("tool", id)
         TOOLS = request.app.state.TOOLS
         TOOLS[id] = tool_module
 
@@ -364,9 +370,7 @@ async def delete_tools_by_id(
 
     result = Tools.delete_tool_by_id(id)
     if result:
-        TOOLS = request.app.state.TOOLS
-        if id in TOOLS:
-            del TOOLS[id]
+        PLUGIN_CACHE.invalidate("tool", id)
 
     return result
 
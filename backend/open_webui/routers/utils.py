@@ -126,6 +126,13 @@ async def download_db(user=Depends(get_admin_user)):
     )
 
 
+@router.get("/audit/stats")
+async def get_audit_log_stats(user=Depends(get_admin_user)):
+    from open_webui.utils.audit import AUDIT_LOG_SINK
+
+    return AUDIT_LOG_SINK.get_stats()
+
+
 @router.get("/litellm/config")
 async def download_litellm_config_yaml(user=Depends(get_admin_user)):
     return FileResponse(
@@ -20,9 +20,16 @@ from open_webui.env import (
     WEBSOCKET_REDIS_LOCK_TIMEOUT,
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
+    WEBSOCKET_SESSION_POOL_CACHE_TTL,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock
+from open_webui.socket.utils import (
+    RedisLock,
+    RedisSessionPool,
+    RedisUsagePool,
+    SessionPool,
+    UsagePool,
+)
 
 from open_webui.env import (
     GLOBAL_LOG_LEVEL,
@@ -65,6 +72,9 @@ else:
 # Timeout duration in seconds
 TIMEOUT_DURATION = 3
 
+# Delay in seconds used to coalesce bursts of usage changes into one broadcast
+USAGE_BROADCAST_DEBOUNCE = 0.5
+
 # Dictionary to maintain the user pool
 
 if WEBSOCKET_MANAGER == "redis":
@@ -72,20 +82,17 @@ if WEBSOCKET_MANAGER == "redis":
     redis_sentinels = get_sentinels_from_env(
         WEBSOCKET_SENTINEL_HOSTS, WEBSOCKET_SENTINEL_PORT
     )
-    SESSION_POOL = RedisDict(
-        "open-webui:session_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-    )
-    USER_POOL = RedisDict(
-        "open-webui:user_pool",
+    SESSION_POOL = RedisSessionPool(
+        "open-webui:presence",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
+        cache_ttl=WEBSOCKET_SESSION_POOL_CACHE_TTL,
     )
-    USAGE_POOL = RedisDict(
-        "open-webui:usage_pool",
+    USAGE_POOL = RedisUsagePool(
+        "open-webui:usage",
         redis_url=WEBSOCKET_REDIS_URL,
         redis_sentinels=redis_sentinels,
+        ttl=TIMEOUT_DURATION,
     )
 
     clean_up_lock = RedisLock(
@@ -98,9 +105,8 @@ if WEBSOCKET_MANAGER == "redis":
     renew_func = clean_up_lock.renew_lock
     release_func = clean_up_lock.release_lock
 else:
-    SESSION_POOL = {}
-    USER_POOL = {}
-    USAGE_POOL = {}
+    SESSION_POOL = SessionPool()
+    USAGE_POOL = UsagePool(ttl=TIMEOUT_DURATION)
     aquire_func = release_func = renew_func = lambda: True
 
 
@@ -115,32 +121,17 @@ async def periodic_usage_pool_cleanup():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
-            now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
+            if await USAGE_POOL.expire():
+                schedule_usage_broadcast()
 
-            if send_usage:
-                # Emit updated usage information after cleaning
-                await sio.emit("usage", {"models": get_models_in_use()})
-
-            await asyncio.sleep(TIMEOUT_DURATION)
+            # Sleep until the next (model, sid) entry is due to expire
+            next_expiry = await USAGE_POOL.next_expiry()
+            if next_expiry is None:
+                await asyncio.sleep(TIMEOUT_DURATION)
+            else:
+                await asyncio.sleep(
+                    min(max(next_expiry - time.time(), 0.1), TIMEOUT_DURATION)
+                )
     finally:
         release_func()
 
@@ -151,27 +142,42 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return await USAGE_POOL.get_models()
+
+
+usage_broadcast_task = None
+
+
+async def broadcast_usage():
+    await asyncio.sleep(USAGE_BROADCAST_DEBOUNCE)
+    models_in_use = await get_models_in_use()
+    if await USAGE_POOL.set_broadcast_models(models_in_use):
+        await sio.emit("usage", {"models": models_in_use})
+
+
+def schedule_usage_broadcast():
+    """
+    Broadcast the models in use once pending changes settle, and only if they
+    differ from what was last broadcast.
+    """
+    global usage_broadcast_task
+
+    if usage_broadcast_task and not usage_broadcast_task.done():
+        return
+    usage_broadcast_task = asyncio.create_task(broadcast_usage())
 
 
 @sio.on("usage")
 async def usage(sid, data):
-    if sid in SESSION_POOL:
+    if await SESSION_POOL.get(sid):
         model_id = data["model"]
-        # Record the timestamp for the last update
-        current_time = int(time.time())
 
-        # Store the new usage data and task
-        USAGE_POOL[model_id] = {
-            **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-            sid: {"updated_at": current_time},
-        }
-
-        # Broadcast the usage data to all clients
-        await sio.emit("usage", {"models": get_models_in_use()})
+        # Refresh the expiry of this session's usage of the model, and only
+        # broadcast when the session started using it
+        if await USAGE_POOL.touch(model_id, sid):
+            schedule_usage_broadcast()
 
 
 @sio.event
@@ -184,15 +190,11 @@ async def connect(sid, environ, auth):
             user = Users.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = user.model_dump()
-            if user.id in USER_POOL:
-                USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-            else:
-                USER_POOL[user.id] = [sid]
+            await SESSION_POOL.add(sid, user.model_dump())
 
             # print(f"user {user.name}({user.id}) connected with session ID {sid}")
-            await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
-            await sio.emit("usage", {"models": get_models_in_use()})
+            await sio.emit("user-list", {"user_ids": await SESSION_POOL.get_user_ids()})
+            await sio.emit("usage", {"models": await get_models_in_use()}, to=sid)
 
 
 @sio.on("user-join")
@@ -210,11 +212,7 @@ async def user_join(sid, data):
     if not user:
         return
 
-    SESSION_POOL[sid] = user.model_dump()
-    if user.id in USER_POOL:
-        USER_POOL[user.id] = USER_POOL[user.id] + [sid]
-    else:
-        USER_POOL[user.id] = [sid]
+    await SESSION_POOL.add(sid, user.model_dump())
 
     # Join all the channels
     channels = Channels.get_channels_by_user_id(user.id)
@@ -224,7 +222,7 @@ async def user_join(sid, data):
 
     # print(f"user {user.name}({user.id}) connected with session ID {sid}")
 
-    await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    await sio.emit("user-list", {"user_ids": await SESSION_POOL.get_user_ids()})
     return {"id": user.id, "name": user.name}
 
 
@@ -271,7 +269,7 @@ async def channel_events(sid, data):
                 "channel_id": data["channel_id"],
                 "message_id": data.get("message_id", None),
                 "data": event_data,
-                "user": UserNameResponse(**SESSION_POOL[sid]).model_dump(),
+                "user": UserNameResponse(**await SESSION_POOL.get(sid)).model_dump(),
             },
             room=room,
         )
@@ -279,23 +277,15 @@ async def channel_events(sid, data):
 
 @sio.on("user-list")
 async def user_list(sid):
-    if sid in SESSION_POOL:
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    if await SESSION_POOL.get(sid):
+        await sio.emit("user-list", {"user_ids": await SESSION_POOL.get_user_ids()})
 
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
-
-        user_id = user["id"]
-        USER_POOL[user_id] = [_sid for _sid in USER_POOL[user_id] if _sid != sid]
-
-        if len(USER_POOL[user_id]) == 0:
-            del USER_POOL[user_id]
-
-        await sio.emit("user-list", {"user_ids": list(USER_POOL.keys())})
+    user = await SESSION_POOL.remove(sid)
+    if user:
+        await sio.emit("user-list", {"user_ids": await SESSION_POOL.get_user_ids()})
     else:
         pass
         # print(f"Unknown session ID {sid} disconnected")
@@ -305,9 +295,10 @@ def get_event_emitter(request_info, update_db=True):
     async def __event_emitter__(event_data):
         user_id = request_info["user_id"]
 
+        # Served from the session pool's local cache for most streamed chunks
         session_ids = list(
             set(
-                USER_POOL.get(user_id, [])
+                await SESSION_POOL.get_session_ids_by_user_id(user_id)
                 + (
                     [request_info.get("session_id")]
                     if request_info.get("session_id")
@@ -390,28 +381,32 @@ def get_event_call(request_info):
 get_event_caller = get_event_call
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SESSION_POOL.get(sid)
     if user:
         return user["id"]
     return None
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = sio.manager.get_participants(
         namespace="/",
         room=room,
     )
 
-    active_user_ids = list(
-        set(
-            [SESSION_POOL.get(session_id[0])["id"] for session_id in active_session_ids]
-        )
+    users = await SESSION_POOL.get_many(
+        [session_id[0] for session_id in active_session_ids]
     )
+    active_user_ids = list(set([user["id"] for user in users if user]))
     return active_user_ids
 
 
-def get_active_status_by_user_id(user_id):
-    if user_id in USER_POOL:
-        return True
-    return False
+async def emit_to_user(user_id: str, event: str, data: dict):
+    session_ids = await SESSION_POOL.get_session_ids_by_user_id(user_id)
+    await asyncio.gather(
+        *[sio.emit(event, data, to=session_id) for session_id in session_ids]
+    )
+
+
+async def get_active_status_by_user_id(user_id):
+    return await SESSION_POOL.is_user_active(user_id)
@@ -1,6 +1,11 @@
 import json
+import time
 import uuid
-from open_webui.utils.redis import get_redis_connection
+from typing import Optional
+
+from redis.exceptions import ResponseError
+
+from open_webui.utils.redis import get_async_redis_connection, get_redis_connection
 
 
 class RedisLock:
@@ -89,3 +94,232 @@ class RedisDict:
         if key not in self:
             self[key] = default
         return self[key]
+
+
+class SessionPool:
+    """
+    In-process presence store mapping socket session ids to users and users to
+    their session ids.
+    """
+
+    def __init__(self):
+        self.sessions: dict[str, dict] = {}
+        self.user_sessions: dict[str, set[str]] = {}
+
+    async def add(self, sid: str, user: dict):
+        self.sessions[sid] = user
+        self.user_sessions.setdefault(user["id"], set()).add(sid)
+
+    async def remove(self, sid: str) -> Optional[dict]:
+        user = self.sessions.pop(sid, None)
+        if user:
+            session_ids = self.user_sessions.get(user["id"], set())
+            session_ids.discard(sid)
+            if not session_ids:
+                self.user_sessions.pop(user["id"], None)
+        return user
+
+    async def get(self, sid: str) -> Optional[dict]:
+        return self.sessions.get(sid)
+
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        return [self.sessions.get(sid) for sid in sids]
+
+    async def get_session_ids_by_user_id(self, user_id: str) -> list[str]:
+        return list(self.user_sessions.get(user_id, []))
+
+    async def get_user_ids(self) -> list[str]:
+        return list(self.user_sessions.keys())
+
+    async def is_user_active(self, user_id: str) -> bool:
+        return user_id in self.user_sessions
+
+
+class RedisSessionPool(SessionPool):
+    """
+    Redis-backed presence store shared by all workers. Sessions live in a hash
+    and each user's session ids in a set, so joins and leaves are atomic
+    SADD/SREM operations instead of read-modify-write cycles. Lookups go
+    through a short-lived local cache so hot paths (e.g. streaming chat
+    events) don't hit Redis for every emit.
+    """
+
+    # Removes a session and drops the user from the active set once their last
+    # session is gone, atomically with respect to concurrent joins.
+    REMOVE_SCRIPT = """
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('SREM', KEYS[2], ARGV[1])
+    if redis.call('SCARD', KEYS[2]) == 0 then
+        redis.call('SREM', KEYS[3], ARGV[2])
+    end
+    return 1
+    """
+
+    MAX_CACHE_ENTRIES = 10000
+
+    def __init__(self, name, redis_url, redis_sentinels=[], cache_ttl: float = 1.0):
+        self.name = name
+        self.redis = get_async_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True
+        )
+        self.sessions_key = f"{name}:sessions"
+        self.users_key = f"{name}:users"
+        self.cache_ttl = cache_ttl
+        self.cache: dict[str, tuple[float, object]] = {}
+        self.remove_script = self.redis.register_script(self.REMOVE_SCRIPT)
+
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.name}:user:{user_id}"
+
+    async def _cached(self, key: str, fetch):
+        entry = self.cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        value = await fetch()
+        now = time.monotonic()
+        if len(self.cache) > self.MAX_CACHE_ENTRIES:
+            self.cache = {k: v for k, v in self.cache.items() if v[0] > now}
+        self.cache[key] = (now + self.cache_ttl, value)
+        return value
+
+    def _invalidate(self, sid: str, user_id: str):
+        for key in (f"session:{sid}", f"user:{user_id}", "users"):
+            self.cache.pop(key, None)
+
+    async def add(self, sid: str, user: dict):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.sessions_key, sid, json.dumps(user))
+            pipe.sadd(self._user_key(user["id"]), sid)
+            pipe.sadd(self.users_key, user["id"])
+            await pipe.execute()
+        self._invalidate(sid, user["id"])
+
+    async def remove(self, sid: str) -> Optional[dict]:
+        user = await self.redis.hget(self.sessions_key, sid)
+        if user is None:
+            return None
+
+        user = json.loads(user)
+        await self.remove_script(
+            keys=[self.sessions_key, self._user_key(user["id"]), self.users_key],
+            args=[sid, user["id"]],
+        )
+        self._invalidate(sid, user["id"])
+        return user
+
+    async def get(self, sid: str) -> Optional[dict]:
+        async def fetch():
+            value = await self.redis.hget(self.sessions_key, sid)
+            return json.loads(value) if value else None
+
+        return await self._cached(f"session:{sid}", fetch)
+
+    async def get_many(self, sids: list[str]) -> list[Optional[dict]]:
+        if not sids:
+            return []
+        values = await self.redis.hmget(self.sessions_key, sids)
+        return [json.loads(value) if value else None for value in values]
+
+    async def get_session_ids_by_user_id(self, user_id: str) -> list[str]:
+        async def fetch():
+            return list(await self.redis.smembers(self._user_key(user_id)))
+
+        return await self._cached(f"user:{user_id}", fetch)
+
+    async def get_user_ids(self) -> list[str]:
+        async def fetch():
+            return list(await self.redis.smembers(self.users_key))
+
+        return await self._cached("users", fetch)
+
+    async def is_user_active(self, user_id: str) -> bool:
+        return len(await self.get_session_ids_by_user_id(user_id)) > 0
+
+
+class UsagePool:
+    """
+    In-process store of the models in use, as (model, sid) pairs that expire
+    `ttl` seconds after the session last reported using the model.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.usage: dict[tuple[str, str], float] = {}
+        self.broadcast_models: Optional[list[str]] = None
+
+    async def touch(self, model_id: str, sid: str) -> bool:
+        # Returns True if the session wasn't already using the model
+        is_new = (model_id, sid) not in self.usage
+        self.usage[(model_id, sid)] = time.time() + self.ttl
+        return is_new
+
+    async def expire(self) -> int:
+        now = time.time()
+        expired = [key for key, expires_at in self.usage.items() if expires_at <= now]
+        for key in expired:
+            del self.usage[key]
+        return len(expired)
+
+    async def next_expiry(self) -> Optional[float]:
+        return min(self.usage.values(), default=None)
+
+    async def get_models(self) -> list[str]:
+        now = time.time()
+        return sorted(
+            {
+                model_id
+                for (model_id, _), expires_at in self.usage.items()
+                if expires_at > now
+            }
+        )
+
+    async def set_broadcast_models(self, models: list[str]) -> bool:
+        # Record the models last broadcast, returning True if they changed
+        changed = models != self.broadcast_models
+        self.broadcast_models = models
+        return changed
+
+
+class RedisUsagePool(UsagePool):
+    """
+    Redis-backed usage store: a single sorted set of "<sid>|<model_id>" members
+    scored by their expiry time, so refreshes are one ZADD and expiry is one
+    ZREMRANGEBYSCORE.
+    """
+
+    def __init__(self, name, redis_url, redis_sentinels=[], ttl: float = 3):
+        self.name = name
+        self.redis = get_async_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True
+        )
+        self.ttl = ttl
+
+    async def touch(self, model_id: str, sid: str) -> bool:
+        added = await self.redis.zadd(
+            self.name, {f"{sid}|{model_id}": time.time() + self.ttl}
+        )
+        return added > 0
+
+    async def expire(self) -> int:
+        return await self.redis.zremrangebyscore(self.name, "-inf", time.time())
+
+    async def next_expiry(self) -> Optional[float]:
+        first = await self.redis.zrange(self.name, 0, 0, withscores=True)
+        return first[0][1] if first else None
+
+    async def get_models(self) -> list[str]:
+        # Exclusive, as entries expiring now are removed by expire()
+        members = await self.redis.zrangebyscore(self.name, f"({time.time()}", "+inf")
+        return sorted({member.split("|", 1)[1] for member in members})
+
+    async def set_broadcast_models(self, models: list[str]) -> bool:
+        # Shared across workers so each change is broadcast by one worker only
+        key = f"{self.name}:broadcast"
+        value = json.dumps(models)
+        try:
+            previous = await self.redis.set(key, value, get=True)
+        except ResponseError:
+            # SET ... GET needs Redis 6.2, use the deprecated GETSET before that
+            previous = await self.redis.getset(key, value)
+        return previous != value
@@ -0,0 +1,68 @@
+import os
+import threading
+from typing import Callable, Optional
+
+from open_webui.utils.cache import FileCache
+
+
+class StorageCache(FileCache):
+    """
+    Read-through cache of cloud storage objects downloaded to local paths.
+
+    Each entry remembers the version (ETag or generation) of the object it
+    was downloaded from, and is downloaded again when the remote version
+    differs. Concurrent reads of the same object share a single download, and
+    once the cached files exceed `max_size` bytes, the least recently used
+    ones are deleted, including the files already in `directory` (e.g. copies
+    downloaded before a restart).
+    """
+
+    def __init__(self, max_size: int, directory: Optional[str] = None):
+        super().__init__(max_size, directory=directory, stats=("downloaded_bytes",))
+        self._download_locks: dict[str, threading.Lock] = {}
+
+    def _get_download_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            return self._download_locks.setdefault(path, threading.Lock())
+
+    def get(
+        self,
+        path: str,
+        version: Optional[str],
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Return `path`, calling `download` with a temporary path to fetch the
+        object first unless the cached copy is at `version`.
+        """
+        with self._get_download_lock(path):
+            if version is None:
+                # Unknown remote version, the local copy can't be trusted
+                self.stats.inc("misses")
+            elif self.lookup(path, version):
+                return path
+
+            self.write(path, download, version)
+            self.stats.inc("downloaded_bytes", os.path.getsize(path))
+            return path
+
+    def put(self, path: str, version: Optional[str]):
+        """Track a local copy of an object, e.g. one that was just uploaded."""
+        self.track(path, version)
+
+    def track(self, path: str, version: Optional[str] = None) -> list[str]:
+        evicted = super().track(path, version)
+        with self._lock:
+            for evicted_path in evicted:
+                self._download_locks.pop(evicted_path, None)
+        return evicted
+
+    def discard(self, path: str, delete: bool = False):
+        super().discard(path, delete)
+        with self._lock:
+            self._download_locks.pop(path, None)
+
+    def clear(self):
+        super().clear()
+        with self._lock:
+            self._download_locks.clear()
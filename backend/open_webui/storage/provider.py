@@ -1,12 +1,14 @@
+import hashlib
 import os
 import shutil
 import json
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple, Dict
+from typing import BinaryIO, Tuple, Dict, Iterator, Optional
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -25,20 +27,43 @@ from open_webui.config import (
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
     STORAGE_PROVIDER,
+    STORAGE_CACHE_MAX_SIZE_MB,
+    STORAGE_MULTIPART_CHUNK_SIZE_MB,
+    STORAGE_MULTIPART_CONCURRENCY,
     UPLOAD_DIR,
 )
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
 from google.cloud.exceptions import GoogleCloudError, NotFound
 from open_webui.constants import ERROR_MESSAGES
 from azure.identity import DefaultAzureCredential
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import ResourceNotFoundError
 from open_webui.env import SRC_LOG_LEVELS
+from open_webui.storage.cache import StorageCache
 
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+CHUNK_SIZE = 1024 * 1024
+MULTIPART_CHUNK_SIZE = STORAGE_MULTIPART_CHUNK_SIZE_MB * 1024 * 1024
+
+
+def iter_range(
+    f: BinaryIO, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """Yield the bytes of a seekable file object from `start` to `end` (inclusive)."""
+    f.seek(start)
+    remaining = None if end is None else end - start + 1
+    while remaining is None or remaining > 0:
+        chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        yield chunk
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -48,7 +73,8 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str, str]:
+        """Store the file, returning its size, SHA-256 hash and path."""
         pass
 
     @abstractmethod
@@ -59,19 +85,41 @@ class StorageProvider(ABC):
     def delete_file(self, file_path: str) -> None:
         pass
 
+    def get_file_size(self, file_path: str) -> int:
+        return os.path.getsize(self.get_file(file_path))
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Yield the bytes of the file from `start` to `end` (inclusive)."""
+        with open(self.get_file(file_path), "rb") as f:
+            yield from iter_range(f, start, end)
+
+    def get_cache_stats(self) -> Optional[dict]:
+        """Return the local cache metrics of providers that download files."""
+        cache = getattr(self, "cache", None)
+        return cache.get_stats() if cache else None
+
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[int, str, str]:
+        # Copy in chunks, hashing along the way, so large uploads aren't held in memory
         file_path = f"{UPLOAD_DIR}/{filename}"
+        size = 0
+        sha256 = hashlib.sha256()
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            while chunk := file.read(CHUNK_SIZE):
+                f.write(chunk)
+                sha256.update(chunk)
+                size += len(chunk)
+
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, sha256.hexdigest(), file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -136,6 +184,14 @@ class S3StorageProvider(StorageProvider):
 
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
+        self.cache = StorageCache(
+            STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024, directory=UPLOAD_DIR
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=MULTIPART_CHUNK_SIZE,
+            max_concurrency=STORAGE_MULTIPART_CONCURRENCY,
+        )
 
     @staticmethod
     def sanitize_tag_value(s: str) -> str:
@@ -144,12 +200,14 @@ class S3StorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, sha256, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+            self.s3_client.upload_file(
+                file_path, self.bucket_name, s3_key, Config=self.transfer_config
+            )
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -165,10 +223,8 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            self.cache.put(file_path, self._get_etag(s3_key))
+            return size, sha256, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -176,11 +232,37 @@ class S3StorageProvider(StorageProvider):
         """Handles downloading of the file from S3 storage."""
         try:
             s3_key = self._extract_s3_key(file_path)
-            local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+            return self.cache.get(
+                self._get_local_file_path(s3_key),
+                self._get_etag(s3_key),
+                lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path
+                ),
+            )
+        except ClientError as e:
+            raise RuntimeError(f"Error downloading file from S3: {e}")
+
+    def get_file_size(self, file_path: str) -> int:
+        try:
+            return self.s3_client.head_object(
+                Bucket=self.bucket_name, Key=self._extract_s3_key(file_path)
+            )["ContentLength"]
+        except ClientError as e:
+            raise RuntimeError(f"Error downloading file from S3: {e}")
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Stream a byte range of the file from S3 without a local copy."""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=self._extract_s3_key(file_path),
+                Range=f"bytes={start}-{'' if end is None else end}",
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
+        yield from response["Body"].iter_chunks(CHUNK_SIZE)
 
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from S3 storage."""
@@ -191,6 +273,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
         # Always delete from local storage
+        self.cache.discard(self._get_local_file_path(s3_key))
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -210,6 +293,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
@@ -219,6 +303,9 @@ class S3StorageProvider(StorageProvider):
     def _get_local_file_path(self, s3_key: str) -> str:
         return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
 
+    def _get_etag(self, s3_key: str) -> str:
+        return self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)["ETag"]
+
 
 class GCSStorageProvider(StorageProvider):
     def __init__(self):
@@ -234,16 +321,30 @@ class GCSStorageProvider(StorageProvider):
             # if running on a Compute Engine instance, credentials would be from Google Metadata server
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
+        self.cache = StorageCache(
+            STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024, directory=UPLOAD_DIR
+        )
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, sha256, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob = self.bucket.blob(filename)
-            blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            if size > MULTIPART_CHUNK_SIZE:
+                transfer_manager.upload_chunks_concurrently(
+                    file_path,
+                    blob,
+                    chunk_size=MULTIPART_CHUNK_SIZE,
+                    max_workers=STORAGE_MULTIPART_CONCURRENCY,
+                    worker_type=transfer_manager.THREAD,
+                )
+                blob.reload()
+            else:
+                blob.upload_from_filename(file_path)
+            self.cache.put(file_path, str(blob.generation))
+            return size, sha256, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -251,11 +352,33 @@ class GCSStorageProvider(StorageProvider):
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
+            if blob is None:
+                raise NotFound(f"{filename} not found")
+
+            return self.cache.get(
+                f"{UPLOAD_DIR}/{filename}",
+                str(blob.generation),
+                blob.download_to_filename,
+            )
+        except NotFound as e:
+            raise RuntimeError(f"Error downloading file from GCS: {e}")
 
-            return local_file_path
+    def get_file_size(self, file_path: str) -> int:
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        blob = self.bucket.get_blob(filename)
+        if blob is None:
+            raise RuntimeError(f"Error downloading file from GCS: {filename} not found")
+        return blob.size
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Stream a byte range of the file from GCS without a local copy."""
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        try:
+            with self.bucket.blob(filename).open("rb", chunk_size=CHUNK_SIZE) as f:
+                yield from iter_range(f, start, end)
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -269,6 +392,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
         # Always delete from local storage
+        self.cache.discard(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -283,6 +407,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -306,16 +431,27 @@ class AzureStorageProvider(StorageProvider):
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        self.cache = StorageCache(
+            STORAGE_CACHE_MAX_SIZE_MB * 1024 * 1024, directory=UPLOAD_DIR
+        )
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        size, sha256, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            with open(file_path, "rb") as data:
+                result = blob_client.upload_blob(
+                    data,
+                    length=size,
+                    overwrite=True,
+                    max_block_size=MULTIPART_CHUNK_SIZE,
+                    max_concurrency=STORAGE_MULTIPART_CONCURRENCY,
+                )
+            self.cache.put(file_path, result.get("etag"))
+            return size, sha256, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -323,13 +459,43 @@ class AzureStorageProvider(StorageProvider):
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            def download(path: str):
+                with open(path, "wb") as download_file:
+                    blob_client.download_blob().readinto(download_file)
+
+            return self.cache.get(
+                f"{UPLOAD_DIR}/{filename}",
+                blob_client.get_blob_properties().etag,
+                download,
+            )
+        except ResourceNotFoundError as e:
+            raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
+
+    def get_file_size(self, file_path: str) -> int:
+        try:
+            blob_client = self.container_client.get_blob_client(
+                file_path.split("/")[-1]
+            )
+            return blob_client.get_blob_properties().size
+        except ResourceNotFoundError as e:
+            raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Stream a byte range of the file from Azure without a local copy."""
+        try:
+            blob_client = self.container_client.get_blob_client(
+                file_path.split("/")[-1]
+            )
+            downloader = blob_client.download_blob(
+                offset=start, length=None if end is None else end - start + 1
+            )
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
+        yield from downloader.chunks()
 
     def delete_file(self, file_path: str) -> None:
         """Handles deletion of the file from Azure Blob Storage."""
@@ -341,6 +507,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        self.cache.discard(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -353,6 +520,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -1,12 +1,153 @@
 # tasks.py
 import asyncio
-from typing import Dict
+import json
+import logging
+import os
+import socket
+import time
+from typing import Dict, Optional
 from uuid import uuid4
 
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    TASK_HEARTBEAT_INTERVAL,
+    TASK_MANAGER,
+    TASK_REDIS_URL,
+    TASK_SENTINEL_HOSTS,
+    TASK_SENTINEL_PORT,
+)
+from open_webui.utils.redis import (
+    get_async_redis_connection,
+    get_sentinels_from_env,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
 # A dictionary to keep track of active tasks
 tasks: Dict[str, asyncio.Task] = {}
 chat_tasks = {}
 
+# Identifies the worker owning a task in the shared registry
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+class RedisTaskRegistry:
+    """
+    Shares the tasks running on every worker through Redis, so that listing and
+    stopping tasks works regardless of which worker receives the request.
+
+    Tasks are kept in sorted sets scored by their expiry time, which owners
+    push forward on every heartbeat. Tasks of a crashed worker therefore drop
+    out of the registry once their TTL elapses. Cancellation requests are
+    broadcast on a pub/sub channel that every worker listens on.
+    """
+
+    KEY_PREFIX = "open-webui:tasks"
+
+    def __init__(self, redis_url, redis_sentinels=[], ttl: int = 30):
+        self.redis = get_async_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True
+        )
+        self.ttl = ttl
+        self.tasks_key = self.KEY_PREFIX
+        self.cancel_channel = f"{self.KEY_PREFIX}:cancel"
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.KEY_PREFIX}:task:{task_id}"
+
+    def _chat_key(self, chat_id: str) -> str:
+        return f"{self.KEY_PREFIX}:chat:{chat_id}"
+
+    async def add(self, task_id: str, chat_id: Optional[str] = None):
+        await self.heartbeat({task_id: chat_id})
+
+    async def heartbeat(self, task_chat_ids: dict[str, Optional[str]]):
+        if not task_chat_ids:
+            return
+
+        expires_at = time.time() + self.ttl
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for task_id, chat_id in task_chat_ids.items():
+                pipe.set(
+                    self._task_key(task_id),
+                    json.dumps({"chat_id": chat_id, "worker_id": WORKER_ID}),
+                    ex=self.ttl,
+                )
+                pipe.zadd(self.tasks_key, {task_id: expires_at})
+                if chat_id:
+                    pipe.zadd(self._chat_key(chat_id), {task_id: expires_at})
+                    pipe.expire(self._chat_key(chat_id), self.ttl)
+            await pipe.execute()
+
+    async def remove(self, task_id: str, chat_id: Optional[str] = None):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(self._task_key(task_id))
+            pipe.zrem(self.tasks_key, task_id)
+            if chat_id:
+                pipe.zrem(self._chat_key(chat_id), task_id)
+            await pipe.execute()
+
+    async def _list(self, key: str) -> list[str]:
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(key, "-inf", now)
+            pipe.zrangebyscore(key, now, "+inf")
+            _, task_ids = await pipe.execute()
+        return task_ids
+
+    async def list_tasks(self) -> list[str]:
+        return await self._list(self.tasks_key)
+
+    async def list_task_ids_by_chat_id(self, chat_id: str) -> list[str]:
+        return await self._list(self._chat_key(chat_id))
+
+    async def exists(self, task_id: str) -> bool:
+        return bool(await self.redis.exists(self._task_key(task_id)))
+
+    async def cancel(self, task_id: str):
+        await self.redis.publish(self.cancel_channel, task_id)
+
+    async def listen(self):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.cancel_channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+
+                task = tasks.get(message["data"])
+                if task:
+                    log.info(f"Cancelling task {message['data']} on request")
+                    task.cancel()
+        finally:
+            await pubsub.unsubscribe(self.cancel_channel)
+
+
+if TASK_MANAGER == "redis":
+    task_registry = RedisTaskRegistry(
+        TASK_REDIS_URL,
+        get_sentinels_from_env(TASK_SENTINEL_HOSTS, TASK_SENTINEL_PORT),
+        ttl=TASK_HEARTBEAT_INTERVAL * 3,
+    )
+else:
+    task_registry = None
+
+# Holds references to fire-and-forget registry updates so they aren't GC'd
+registry_updates: set[asyncio.Task] = set()
+
+
+def schedule_registry_update(coroutine):
+    update = asyncio.create_task(coroutine)
+    registry_updates.add(update)
+    update.add_done_callback(registry_updates.discard)
+    update.add_done_callback(log_registry_update_error)
+
+
+def log_registry_update_error(update: asyncio.Task):
+    if not update.cancelled() and update.exception():
+        log.error(f"Task registry update failed: {update.exception()}")
+
 
 def cleanup_task(task_id: str, id=None):
     """
@@ -20,12 +161,25 @@ def cleanup_task(task_id: str, id=None):
         if not chat_tasks[id]:  # If no tasks left for this ID, remove the entry
             chat_tasks.pop(id, None)
 
+    if task_registry:
+        schedule_registry_update(task_registry.remove(task_id, id))
 
-def create_task(coroutine, id=None):
+
+async def create_task(coroutine, id=None):
     """
     Create a new asyncio task and add it to the global task dictionary.
     """
     task_id = str(uuid4())  # Generate a unique ID for the task
+
+    # Registered before the task starts, so that its removal always comes
+    # after the registration
+    if task_registry:
+        try:
+            await task_registry.add(task_id, id)
+        except Exception as e:
+            # Still tracked locally, and picked up by the next heartbeat
+            log.error(f"Failed to register task {task_id}: {e}")
+
     task = asyncio.create_task(coroutine)  # Create the task
 
     # Add a done callback for cleanup
@@ -48,17 +202,21 @@ def get_task(task_id: str):
     return tasks.get(task_id)
 
 
-def list_tasks():
+async def list_tasks():
     """
     List all currently active task IDs.
     """
+    if task_registry:
+        return await task_registry.list_tasks()
     return list(tasks.keys())
 
 
-def list_task_ids_by_chat_id(id):
+async def list_task_ids_by_chat_id(id):
     """
     List all tasks associated with a specific ID.
     """
+    if task_registry:
+        return await task_registry.list_task_ids_by_chat_id(id)
     return chat_tasks.get(id, [])
 
 
@@ -68,6 +226,11 @@ async def stop_task(task_id: str):
     """
     task = tasks.get(task_id)
     if not task:
+        # The task may be running on another worker
+        if task_registry and await task_registry.exists(task_id):
+            await task_registry.cancel(task_id)
+            return {"status": True, "message": f"Task {task_id} stop requested."}
+
         raise ValueError(f"Task with ID {task_id} not found.")
 
     task.cancel()  # Request task cancellation
@@ -79,3 +242,35 @@ async def stop_task(task_id: str):
         return {"status": True, "message": f"Task {task_id} successfully stopped."}
 
     return {"status": False, "message": f"Failed to stop task {task_id}."}
+
+
+async def periodic_task_registry_heartbeat():
+    """
+    Keep this worker's tasks alive in the shared registry and listen for
+    cancellation requests from other workers.
+    """
+    if not task_registry:
+        return
+
+    listener = None
+    try:
+        while True:
+            if listener is None or listener.done():
+                # (Re)subscribe, e.g. after the Redis connection dropped
+                listener = asyncio.create_task(task_registry.listen())
+
+            try:
+                await task_registry.heartbeat(
+                    {
+                        task_id: chat_id
+                        for chat_id, task_ids in list(chat_tasks.items())
+                        for task_id in task_ids
+                    }
+                )
+            except Exception as e:
+                log.error(f"Task registry heartbeat failed: {e}")
+
+            await asyncio.sleep(TASK_HEARTBEAT_INTERVAL)
+    finally:
+        if listener:
+            listener.cancel()
@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+import json
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.models import chats, feedbacks
+from open_webui.models.chats import Chat, Chats
+from open_webui.models.feedbacks import Feedback, Feedbacks
+from open_webui.utils.export import get_export_response
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'webui.db'}")
+    Chat.__table__.create(engine)
+    Feedback.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    sessions = {"open": 0, "opened": 0}
+
+    @contextmanager
+    def get_db():
+        session = Session()
+        sessions["open"] += 1
+        sessions["opened"] += 1
+        try:
+            yield session
+        finally:
+            session.close()
+            sessions["open"] -= 1
+
+    monkeypatch.setattr(chats, "get_db", get_db)
+    monkeypatch.setattr(feedbacks, "get_db", get_db)
+
+    with Session() as session:
+        # Several rows share an updated_at so that pages split ties
+        for i in range(10):
+            session.add(
+                Chat(
+                    id=f"chat-{i}",
+                    user_id="user" if i < 8 else "other",
+                    title=f"Chat {i}",
+                    chat={"title": f"Chat {i}"},
+                    created_at=100,
+                    updated_at=100 + i // 3,
+                    archived=False,
+                    pinned=False,
+                    meta={},
+                )
+            )
+            session.add(
+                Feedback(
+                    id=f"feedback-{i}",
+                    user_id="user",
+                    version=0,
+                    type="rating",
+                    data={},
+                    meta={},
+                    snapshot={},
+                    created_at=100,
+                    updated_at=100 + i // 3,
+                )
+            )
+        session.commit()
+
+    return sessions
+
+
+def consume(items, sessions):
+    ids = []
+    for item in items:
+        # No connection is held while the consumer handles a row
+        assert sessions["open"] == 0
+        ids.append(item.id)
+    return ids
+
+
+def test_iter_chats_pages_without_gaps_or_duplicates(db):
+    ids = consume(Chats.iter_chats(user_id="user", batch_size=3), db)
+
+    assert ids == [f"chat-{i}" for i in (7, 6, 5, 4, 3, 2, 1, 0)]
+    assert db["opened"] == 3
+
+
+def test_iter_chats_since_is_oldest_first(db):
+    ids = consume(Chats.iter_chats(since=101, batch_size=2), db)
+
+    assert ids == [f"chat-{i}" for i in range(3, 10)]
+
+
+def test_iter_feedbacks(db):
+    assert consume(Feedbacks.iter_feedbacks(batch_size=4), db) == [
+        f"feedback-{i}" for i in reversed(range(10))
+    ]
+    assert consume(Feedbacks.iter_feedbacks(since=103, batch_size=4), db) == [
+        "feedback-9"
+    ]
+
+
+def test_abandoned_export_holds_no_connection(db):
+    items = Chats.iter_chats(batch_size=3)
+    next(items)
+    # e.g. the client disconnected after the first chunk
+    assert db["open"] == 0
+
+
+def body(response) -> bytes:
+    async def read():
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    return asyncio.run(read())
+
+
+def test_export_formats(db):
+    response = get_export_response(Chats.iter_chats(batch_size=4), "chats")
+    assert response.headers["content-disposition"] == (
+        'attachment; filename="chats.json"'
+    )
+    assert [chat["id"] for chat in json.loads(body(response))] == [
+        f"chat-{i}" for i in reversed(range(10))
+    ]
+
+    response = get_export_response(
+        Chats.iter_chats(since=103), "chats", format="ndjson", compress=True
+    )
+    assert response.media_type == "application/gzip"
+    lines = gzip.decompress(body(response)).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ["chat-9"]
+
+    with pytest.raises(ValueError):
+        get_export_response(Chats.iter_chats(), "chats", format="xml")
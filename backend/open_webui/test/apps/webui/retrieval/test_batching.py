@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from open_webui.retrieval.models.batching import MicroBatcher
+
+
+class RecordingModel:
+    """Doubles each item, recording batches and blocking until released."""
+
+    def __init__(self):
+        self.batches = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, items, **kwargs):
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.batches.append(list(items))
+        if "fail" in items:
+            raise ValueError("failed")
+        return [item * 2 for item in items]
+
+
+@pytest.fixture
+def model():
+    return RecordingModel()
+
+
+@pytest.fixture
+def batcher(model):
+    batcher = MicroBatcher("test", model, max_batch_size=4, max_wait_ms=50)
+    yield batcher
+    model.release.set()
+    batcher.close()
+    batcher.thread.join(timeout=5)
+
+
+def block(batcher, model):
+    """Occupy the worker so that the next submissions queue up."""
+    future = batcher.submit(["blocker"])
+    assert model.started.wait(timeout=5)
+    return future
+
+
+def test_concurrent_requests_share_a_batch(batcher, model):
+    blocker = block(batcher, model)
+    futures = [batcher.submit([i]) for i in range(3)]
+    model.release.set()
+
+    assert [future.result(timeout=5) for future in futures] == [[0], [2], [4]]
+    assert blocker.result(timeout=5) == ["blockerblocker"]
+    assert model.batches == [["blocker"], [0, 1, 2]]
+
+
+def test_batch_never_exceeds_max_batch_size(batcher, model):
+    block(batcher, model)
+    futures = [batcher.submit([i, i]) for i in range(3)]
+    model.release.set()
+
+    assert [future.result(timeout=5) for future in futures] == [
+        [0, 0],
+        [2, 2],
+        [4, 4],
+    ]
+    assert model.batches[1:] == [[0, 0, 1, 1], [2, 2]]
+
+
+def test_requests_with_different_kwargs_are_not_merged(batcher, model):
+    block(batcher, model)
+    first = batcher.submit([1], prompt="query: ")
+    second = batcher.submit([2], prompt="passage: ")
+    model.release.set()
+
+    assert first.result(timeout=5) == [2]
+    assert second.result(timeout=5) == [4]
+    assert model.batches[1:] == [[1], [2]]
+
+
+def test_large_request_is_split_into_batches(batcher, model):
+    model.release.set()
+    items = list(range(10))
+
+    assert batcher.submit(items).result(timeout=5) == [i * 2 for i in items]
+    assert [len(batch) for batch in model.batches] == [4, 4, 2]
+
+
+def test_small_requests_go_before_queued_bulk_slices(batcher, model):
+    block(batcher, model)
+    bulk = batcher.submit(list(range(100, 112)))
+    query = batcher.submit(["query"])
+    model.release.set()
+
+    assert query.result(timeout=5) == ["queryquery"]
+    assert bulk.result(timeout=5) == [i * 2 for i in range(100, 112)]
+    assert model.batches == [
+        ["blocker"],
+        ["query"],
+        [100, 101, 102, 103],
+        [104, 105, 106, 107],
+        [108, 109, 110, 111],
+    ]
+
+
+def test_failed_slice_fails_the_whole_request(batcher, model):
+    model.release.set()
+
+    with pytest.raises(ValueError):
+        batcher.submit([1, 2, 3, 4, "fail"]).result(timeout=5)
+    assert batcher.submit([1]).result(timeout=5) == [2]
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from open_webui.retrieval.loaders import html, html_worker
+
+PARAGRAPH = "The quick brown fox jumps over the lazy dog. " * 6
+
+PAGE = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <title> Foxes </title>
+  <meta name="description" content="All about foxes">
+  <style>body {{ color: red; }}</style>
+  <script>var tracking = true;</script>
+</head>
+<body>
+  <nav><a href="/">Home</a> <a href="/about">About</a></nav>
+  <main>
+    <h1>Foxes</h1>
+    <!-- an editorial comment -->
+    <p>{PARAGRAPH}</p>
+    <aside>Related: wolves</aside>
+    <table><tr><td>Red</td><td>Arctic</td></tr></table>
+  </main>
+  <footer>Copyright</footer>
+</body>
+</html>"""
+
+
+def test_extract_html_content_prefers_main_content():
+    text, metadata = html_worker.extract_html_content(PAGE, "https://example.com")
+
+    assert text.splitlines() == ["Foxes", PARAGRAPH.strip(), "Red Arctic"]
+    assert metadata == {
+        "source": "https://example.com",
+        "title": "Foxes",
+        "description": "All about foxes",
+        "language": "en",
+    }
+
+
+def test_extract_html_content_keeps_the_page_without_main_content():
+    text, _ = html_worker.extract_html_content(
+        f"<nav>Menu</nav><main>Short</main><div><p>{PARAGRAPH}</p></div>", "page"
+    )
+    assert text.splitlines() == ["Short", PARAGRAPH.strip()]
+
+    # Not dropped when it is all there is
+    text, _ = html_worker.extract_html_content("<nav>Menu</nav><p>Hi</p>", "page")
+    assert text.splitlines() == ["Menu", "Hi"]
+
+
+def test_extract_html_content_decodes_bytes():
+    document = '<meta charset="windows-1252"><p>Café — déjà vu</p>'
+    text, _ = html_worker.extract_html_content(document.encode("cp1252"), "page")
+    assert text == "Café — déjà vu"
+
+    document = '<?xml version="1.0" encoding="utf-8"?><html><p>Ünïcode</p></html>'
+    text, _ = html_worker.extract_html_content(document.encode(), "page")
+    assert text == "Ünïcode"
+
+
+def test_extract_html_content_truncates_and_handles_empty_documents():
+    text, _ = html_worker.extract_html_content("<p>abcdef</p>", "page", max_bytes=7)
+    assert text == "abcd"
+
+    assert html_worker.extract_html_content("", "page") == ("", {"source": "page"})
+
+
+def test_extract_html_content_without_lxml(monkeypatch):
+    monkeypatch.setattr(html_worker, "LXML_AVAILABLE", False)
+
+    text, metadata = html_worker.extract_html_content(PAGE, "https://example.com")
+
+    assert "var tracking" not in text and "editorial" not in text
+    assert "Foxes" in text and PARAGRAPH.strip() in text
+    assert metadata["title"] == "Foxes"
+    assert metadata["language"] == "en"
+
+
+def test_extract_html_content_with_time_limit(monkeypatch):
+    def extract_html_content(html, source, max_bytes=None):
+        time.sleep(5)
+
+    monkeypatch.setattr(html_worker, "extract_html_content", extract_html_content)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        html_worker.extract_html_content_with_time_limit(
+            "<p>Hi</p>", "page", timeout=0.1
+        )
+    assert time.monotonic() - start < 2
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(html, "HTML_EXTRACTION_WORKERS", 1)
+    html.shutdown_extraction_pool()
+    yield
+    html.shutdown_extraction_pool()
+
+
+def test_extract_html_in_the_pool(pool):
+    assert html.extract_html(PAGE, "page")[1]["title"] == "Foxes"
+    assert asyncio.run(html.aextract_html(PAGE, "page"))[1]["title"] == "Foxes"
+
+
+def test_aextract_html_times_out(monkeypatch, pool):
+    submit = html._submit
+    monkeypatch.setattr(html, "_get_pool_timeout", lambda: 0.5)
+    monkeypatch.setattr(
+        html, "_submit", lambda pool, document, source: pool.submit(time.sleep, 2)
+    )
+
+    extraction_pool = html.get_extraction_pool()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(html.aextract_html(PAGE, "page"))
+
+    # A slow document doesn't take the pool down
+    monkeypatch.setattr(html, "_submit", submit)
+    monkeypatch.setattr(html, "_get_pool_timeout", lambda: None)
+    assert asyncio.run(html.aextract_html(PAGE, "page"))[1]["title"] == "Foxes"
+    assert html.get_extraction_pool() is extraction_pool
+
+
+def test_broken_pool_is_replaced(monkeypatch, pool):
+    submit = html._submit
+    # Workers killed while extracting, e.g. for running out of memory
+    monkeypatch.setattr(
+        html, "_submit", lambda pool, document, source: pool.submit(os._exit, 1)
+    )
+
+    broken_pool = html.get_extraction_pool()
+    with pytest.raises(BrokenProcessPool):
+        html.extract_html(PAGE, "page")
+    assert html.get_extraction_pool() is not broken_pool
+
+    broken_pool = html.get_extraction_pool()
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(html.aextract_html(PAGE, "page"))
+    assert html.get_extraction_pool() is not broken_pool
+
+    monkeypatch.setattr(html, "_submit", submit)
+    assert html.extract_html(PAGE, "page")[1]["title"] == "Foxes"
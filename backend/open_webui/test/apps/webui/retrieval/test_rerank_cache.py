@@ -0,0 +1,82 @@
+import numpy as np
+
+from open_webui.retrieval.models.base_reranker import BaseReranker
+from open_webui.retrieval.models.cache import CachedReranker
+from open_webui.utils.cache import TTLCache
+
+
+class RecordingReranker(BaseReranker):
+    """Scores each pair by the length of its document, recording the calls."""
+
+    def __init__(self):
+        self.calls = []
+        self.indexed = []
+
+    def predict(self, sentences):
+        self.calls.append(list(sentences))
+        # Like CrossEncoder.predict
+        return np.array([len(document) for _, document in sentences], dtype=float)
+
+    def index_documents(self, documents):
+        self.indexed.append(documents)
+
+
+def test_partial_hits_are_merged_in_order():
+    reranker = RecordingReranker()
+    cached = CachedReranker(reranker, model="model", cache=TTLCache())
+
+    assert cached.predict([("q", "a"), ("q", "bbb")]) == [1.0, 3.0]
+    assert cached.predict([("q", "cc"), ("q", "bbb"), ("q", "dddd"), ("q", "a")]) == [
+        2.0,
+        3.0,
+        4.0,
+        1.0,
+    ]
+    # Only the pairs missing from the cache were scored
+    assert reranker.calls[1] == [("q", "cc"), ("q", "dddd")]
+
+    assert cached.predict([("q", "dddd"), ("q", "cc")]) == [4.0, 2.0]
+    assert len(reranker.calls) == 2
+
+
+def test_keys_include_the_model_and_normalized_query():
+    reranker = RecordingReranker()
+    cache = TTLCache()
+
+    CachedReranker(reranker, model="model", cache=cache).predict([("a  query", "x")])
+    CachedReranker(reranker, model="model", cache=cache).predict([(" a query ", "x")])
+    assert len(reranker.calls) == 1
+
+    # Cased rerankers score these differently
+    CachedReranker(reranker, model="model", cache=cache).predict([("A query", "x")])
+    CachedReranker(reranker, model="other", cache=cache).predict([("a query", "x")])
+    assert len(reranker.calls) == 3
+
+
+def test_several_queries_in_one_call():
+    reranker = RecordingReranker()
+    cached = CachedReranker(reranker, model="model", cache=TTLCache())
+
+    cached.predict([("q1", "a")])
+    assert cached.predict([("q1", "a"), ("q2", "a"), ("q2", "bb")]) == [1.0, 1.0, 2.0]
+    assert reranker.calls[1] == [("q2", "a"), ("q2", "bb")]
+
+
+def test_failed_predictions_are_not_cached():
+    class FailingReranker(RecordingReranker):
+        def predict(self, sentences):
+            self.calls.append(list(sentences))
+            return None
+
+    reranker = FailingReranker()
+    cache = TTLCache()
+    cached = CachedReranker(reranker, model="model", cache=cache)
+
+    assert cached.predict([("q", "a")]) is None
+    assert len(cache) == 0
+
+
+def test_index_documents_is_forwarded():
+    reranker = RecordingReranker()
+    CachedReranker(reranker, model="model", cache=TTLCache()).index_documents(["a"])
+    assert reranker.indexed == [["a"]]
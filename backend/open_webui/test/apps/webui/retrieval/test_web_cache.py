@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.retrieval.web import cache
+from open_webui.retrieval.web.cache import cached_search, get_search_cache_key
+from open_webui.retrieval.web.main import SearchResult
+from open_webui.utils.cache import TTLCache
+
+
+class RecordingCache(TTLCache):
+    """Records the threads the cache is used from, like a Redis-backed one."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def get_many(self, keys):
+        self.threads.append(threading.current_thread())
+        return super().get_many(keys)
+
+    def set_many(self, mapping, ttl=None):
+        self.threads.append(threading.current_thread())
+        super().set_many(mapping, ttl)
+
+
+@pytest.fixture
+def search_cache(monkeypatch):
+    search_cache = RecordingCache()
+    monkeypatch.setattr(cache, "WEB_SEARCH_CACHE", search_cache)
+    return search_cache
+
+
+class Search:
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [
+            SearchResult(
+                link=f"https://example.com/{self.calls}", title=None, snippet=None
+            )
+        ]
+
+
+def test_cache_key_normalizes_the_query():
+    assert get_search_cache_key(
+        "searxng", "Open  WebUI", 3, ["b.com", "a.com"]
+    ) == get_search_cache_key("searxng", " open webui ", 3, ["a.com", "b.com"])
+    assert get_search_cache_key("searxng", "q", 3, None) != get_search_cache_key(
+        "searxng", "q", 5, None
+    )
+
+
+def test_cache_key_covers_the_engine_config():
+    key = get_search_cache_key(
+        "searxng", "q", 3, None, {"SEARXNG_QUERY_URL": "http://a/search"}
+    )
+    assert key != get_search_cache_key(
+        "searxng", "q", 3, None, {"SEARXNG_QUERY_URL": "http://b/search"}
+    )
+    assert key == get_search_cache_key(
+        "searxng", "q", 3, None, {"SEARXNG_QUERY_URL": "http://a/search"}
+    )
+
+
+def test_cached_search_hits_and_config_changes(search_cache):
+    search = Search()
+
+    async def run(config):
+        return await cached_search("searxng", "q", 3, None, search, config)
+
+    first = asyncio.run(run({"SEARXNG_QUERY_URL": "http://a"}))
+    assert asyncio.run(run({"SEARXNG_QUERY_URL": "http://a"})) == first
+    assert search.calls == 1
+
+    asyncio.run(run({"SEARXNG_QUERY_URL": "http://b"}))
+    assert search.calls == 2
+
+    # The cache is never used from the event loop's thread
+    assert search_cache.threads
+    assert threading.main_thread() not in search_cache.threads
+
+
+def test_concurrent_identical_searches_share_one_call(search_cache):
+    search = Search(delay=0.1)
+
+    async def run():
+        return await asyncio.gather(
+            *[cached_search("searxng", "q", 3, None, search) for _ in range(5)]
+        )
+
+    results = asyncio.run(run())
+    assert search.calls == 1
+    assert all(result == results[0] for result in results)
+
+
+class VectorDB:
+    """Records the collections written by save_docs_to_vector_db."""
+
+    def __init__(self):
+        self.collections = {}
+        self.writes = []
+
+    def save_docs_to_vector_db(
+        self, request, docs, collection_name, overwrite=False, user=None, cancelled=None
+    ):
+        if cancelled and cancelled.is_set():
+            return False
+        self.writes.append(collection_name)
+        self.collections[collection_name] = [doc.page_content for doc in docs]
+        return True
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+
+@pytest.fixture
+def vector_db(monkeypatch):
+    from open_webui.routers import retrieval
+
+    vector_db = VectorDB()
+    monkeypatch.setattr(
+        retrieval, "save_docs_to_vector_db", vector_db.save_docs_to_vector_db
+    )
+    monkeypatch.setattr(
+        retrieval.VECTOR_DB_CLIENT, "has_collection", vector_db.has_collection
+    )
+    return vector_db
+
+
+def save_page(url, content, model="model", cancelled=None):
+    from langchain_core.documents import Document
+
+    from open_webui.routers.retrieval import save_web_page_to_vector_db
+
+    config = SimpleNamespace(RAG_EMBEDDING_ENGINE="", RAG_EMBEDDING_MODEL=model)
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(config=config)))
+    return save_web_page_to_vector_db(
+        request, url, [Document(page_content=content)], cancelled=cancelled
+    )
+
+
+def test_page_collections_are_reused_and_bounded(monkeypatch, vector_db):
+    monkeypatch.setattr(cache, "WEB_PAGE_COLLECTIONS", TTLCache())
+
+    first = save_page("https://example.com", "v1")
+    assert save_page("https://example.com", "v1") == first
+    assert vector_db.writes == [first]
+
+    # Written next to the collection in use, then used in turn
+    second = save_page("https://example.com", "v2")
+    assert second != first
+    assert save_page("https://example.com", "v3") == first
+    assert save_page("https://example.com", "v3", model="other") == second
+    assert vector_db.collections == {first: ["v3"], second: ["v3"]}
+
+    assert save_page("https://example.org", "v1") not in (first, second)
+
+
+def test_page_collections_are_overwritten_without_the_map(monkeypatch, vector_db):
+    monkeypatch.setattr(cache, "WEB_PAGE_COLLECTIONS", None)
+
+    names = {save_page("https://example.com", f"v{i}") for i in range(3)}
+    assert len(names) == 1
+    assert vector_db.collections == {names.pop(): ["v2"]}
+
+    # Same after an entry expires or is evicted
+    monkeypatch.setattr(cache, "WEB_PAGE_COLLECTIONS", TTLCache())
+    first = save_page("https://example.com", "v1")
+    cache.WEB_PAGE_COLLECTIONS.clear()
+    assert save_page("https://example.com", "v2") == first
+    assert len(vector_db.collections) == 1
+
+
+def test_cancelled_pages_are_not_saved(monkeypatch, vector_db):
+    monkeypatch.setattr(cache, "WEB_PAGE_COLLECTIONS", TTLCache())
+    cancelled = threading.Event()
+    cancelled.set()
+
+    assert save_page("https://example.com", "v1", cancelled=cancelled) is None
+    assert vector_db.collections == {}
+    assert cache.get_page_collection("https://example.com") is None
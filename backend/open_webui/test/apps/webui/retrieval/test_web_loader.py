@@ -0,0 +1,201 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+
+import pytest
+from yarl import URL
+
+from open_webui.retrieval.web import cache, utils
+from open_webui.retrieval.web.utils import (
+    SafeResolver,
+    SafeWebBaseLoader,
+    asafe_validate_urls,
+    on_request_start,
+)
+from open_webui.utils.cache import TTLCache
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"<html><head><title>Page</title></head><body>Hello</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = HTTPServer(("127.0.0.1", 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+
+
+@pytest.fixture
+def dns(monkeypatch):
+    """Answer lookups from a fixed table instead of the network."""
+    dns_cache = TTLCache()
+    monkeypatch.setattr(utils, "DNS_CACHE", dns_cache)
+    monkeypatch.setattr(cache, "WEB_PAGE_CACHE", None)
+    return dns_cache
+
+
+@pytest.fixture
+def local_fetch(monkeypatch):
+    def set(enabled: bool):
+        monkeypatch.setattr(utils, "ENABLE_RAG_LOCAL_WEB_FETCH", enabled)
+
+    return set
+
+
+def resolve(host, family=socket.AF_UNSPEC):
+    return asyncio.run(SafeResolver().resolve(host, 80, family))
+
+
+def test_resolver_answers_from_the_validated_addresses(dns, local_fetch):
+    local_fetch(False)
+    dns.set("example.test", (["93.184.215.14"], ["2606:2800:21f:cb07::1"]))
+
+    hosts = resolve("example.test")
+    assert [host["host"] for host in hosts] == [
+        "93.184.215.14",
+        "2606:2800:21f:cb07::1",
+    ]
+    assert all(host["hostname"] == "example.test" for host in hosts)
+    assert [host["host"] for host in resolve("example.test", socket.AF_INET)] == [
+        "93.184.215.14"
+    ]
+
+
+def test_resolver_refuses_private_addresses(dns, local_fetch):
+    local_fetch(False)
+    dns.set("rebound.test", (["10.0.0.1"], []))
+    dns.set("rebound6.test", ([], ["fd00::1"]))
+
+    with pytest.raises(ValueError):
+        resolve("rebound.test")
+    with pytest.raises(ValueError):
+        resolve("rebound6.test")
+
+    local_fetch(True)
+    assert resolve("rebound.test")[0]["host"] == "10.0.0.1"
+
+
+def test_redirects_to_private_ips_are_refused(local_fetch):
+    local_fetch(False)
+
+    def start(url):
+        return asyncio.run(on_request_start(None, None, SimpleNamespace(url=URL(url))))
+
+    with pytest.raises(ValueError):
+        start("http://10.0.0.1/")
+    with pytest.raises(ValueError):
+        start("http://[::1]/")
+    with pytest.raises(ValueError):
+        start("http://[::ffff:10.0.0.1]/")
+    # Public IPs and hostnames (checked by the resolver) pass
+    start("http://93.184.215.14/")
+    start("http://example.test/")
+
+
+def test_urls_are_validated_against_private_addresses(dns, local_fetch):
+    local_fetch(False)
+    dns.set("public.test", (["93.184.215.14"], []))
+    dns.set("private.test", (["192.168.1.1"], []))
+
+    assert asyncio.run(
+        asafe_validate_urls(
+            ["http://public.test/", "http://private.test/", "not a url"]
+        )
+    ) == ["http://public.test/"]
+
+
+def test_sync_load_connects_to_the_resolved_address(server, dns, local_fetch):
+    # Only the pinned table knows this hostname, so the page can only be
+    # reached through SafeResolver
+    local_fetch(True)
+    dns.set("pinned.test", (["127.0.0.1"], []))
+
+    loader = SafeWebBaseLoader(
+        web_paths=[f"http://pinned.test:{server}/"], continue_on_failure=True
+    )
+    documents = loader.load()
+
+    assert len(documents) == 1
+    assert "Hello" in documents[0].page_content
+
+
+def test_sync_load_refuses_rebinding_to_a_private_address(server, dns, local_fetch):
+    local_fetch(False)
+    # Validated as public, then re-resolved to a private address
+    dns.set("rebound.test", (["127.0.0.1"], []))
+
+    loader = SafeWebBaseLoader(
+        web_paths=[f"http://rebound.test:{server}/"], continue_on_failure=True
+    )
+    assert loader.load() == []
+
+
+@pytest.fixture
+def page_cache(monkeypatch):
+    page_cache = TTLCache()
+    monkeypatch.setattr(cache, "WEB_PAGE_CACHE", page_cache)
+    return page_cache
+
+
+def load_page(responses, continue_on_failure=True):
+    """Load a page with `_fetch_response` answering from `responses`."""
+    requests = []
+
+    async def fetch_response(url, headers=None):
+        requests.append(headers)
+        return responses.pop(0)
+
+    loader = SafeWebBaseLoader(
+        web_paths=["https://example.test/"], continue_on_failure=continue_on_failure
+    )
+    loader._fetch_response = fetch_response
+    document = asyncio.run(loader._aload_page(loader.web_paths[0], asyncio.Semaphore()))
+    return document, requests
+
+
+PAGE = "<html><head><title>Page</title></head><body>Hello</body></html>"
+CACHEABLE = {"Cache-Control": "max-age=300", "ETag": '"v1"'}
+
+
+def test_error_pages_are_not_cached(page_cache):
+    for status in (404, 429, 503):
+        document, _ = load_page([(status, f"<p>Error {status}</p>", CACHEABLE)])
+        assert document.page_content == f"Error {status}"
+        assert cache.get_cached_page("https://example.test/") is None
+
+    document, _ = load_page([(200, PAGE, CACHEABLE)])
+    assert document.page_content == "Hello"
+    # Served from the cache
+    assert load_page([])[0].page_content == "Hello"
+
+
+def test_not_modified_revalidates_the_cached_page(page_cache):
+    load_page([(200, PAGE, {"ETag": '"v1"', "Cache-Control": "no-cache"})])
+
+    document, requests = load_page([(304, "", CACHEABLE)])
+    assert requests == [{"If-None-Match": '"v1"'}]
+    assert document.page_content == "Hello"
+
+
+def test_not_modified_without_a_cached_page_is_a_failure(page_cache):
+    document, requests = load_page([(304, "", CACHEABLE)])
+    assert document is None
+    assert requests == [{}]
+    assert cache.get_cached_page("https://example.test/") is None
+
+    with pytest.raises(ValueError):
+        load_page([(304, "", CACHEABLE)], continue_on_failure=False)
@@ -0,0 +1,235 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from open_webui.routers import audio
+from open_webui.utils.auth import get_verified_user
+from open_webui.utils.cache import DirectoryCache
+
+
+def test_split_into_sentences():
+    assert audio.split_into_sentences("") == []
+    assert audio.split_into_sentences(
+        "The first sentence is long enough. So is the second one, surely! "
+        "And a third?\n\nA new paragraph."
+    ) == [
+        "The first sentence is long enough.",
+        "So is the second one, surely!",
+        "And a third? A new paragraph.",
+    ]
+
+
+def test_split_into_sentences_merges_short_fragments():
+    assert audio.split_into_sentences(
+        "1.\nInstall the package with pip.\n2.\nRun it."
+    ) == ["1. Install the package with pip.", "2. Run it."]
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(
+        TTS_ENGINE="openai",
+        TTS_MODEL="tts-1",
+        TTS_VOICE="alloy",
+        TTS_AZURE_SPEECH_OUTPUT_FORMAT="audio-24khz-160kbitrate-mono-mp3",
+    )
+
+
+@pytest.fixture
+def synthesized(monkeypatch, tmp_path):
+    synthesized = []
+
+    async def synthesize_speech(request, payload, user):
+        if "fail" in payload["input"]:
+            raise HTTPException(status_code=502, detail="TTS failed")
+        synthesized.append(payload["input"])
+        return f"<{payload['input']}>".encode()
+
+    monkeypatch.setattr(audio, "synthesize_speech", synthesize_speech)
+    monkeypatch.setattr(audio, "SPEECH_CACHE", DirectoryCache(tmp_path, 1024 * 1024))
+    return synthesized
+
+
+@pytest.fixture
+def client(config):
+    app = FastAPI()
+    app.state.config = config
+    app.include_router(audio.router)
+    app.dependency_overrides[get_verified_user] = lambda: SimpleNamespace(id="1")
+    return TestClient(app)
+
+
+TEXT = "This is the first sentence here. This is the second sentence here."
+
+
+def test_speech_stream(client, synthesized):
+    response = client.post("/speech/stream", json={"input": TEXT, "voice": "alloy"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.content == (
+        b"<This is the first sentence here.><This is the second sentence here.>"
+    )
+
+    # Sentences are cached on their own
+    client.post(
+        "/speech/stream",
+        json={"input": "This is the second sentence here.", "voice": "alloy"},
+    )
+    assert synthesized == [
+        "This is the first sentence here.",
+        "This is the second sentence here.",
+    ]
+
+
+def test_speech_stream_rejects_formats_that_cant_be_concatenated(
+    client, config, synthesized
+):
+    response = client.post(
+        "/speech/stream", json={"input": TEXT, "response_format": "wav"}
+    )
+    assert response.status_code == 400
+
+    config.TTS_ENGINE = "azure"
+    config.TTS_AZURE_SPEECH_OUTPUT_FORMAT = "riff-24khz-16bit-mono-pcm"
+    assert client.post("/speech/stream", json={"input": TEXT}).status_code == 400
+    assert synthesized == []
+
+
+def test_speech_stream_reports_a_failed_first_sentence(client, synthesized):
+    response = client.post(
+        "/speech/stream",
+        json={"input": "This sentence will fail to be synthesized. " + TEXT},
+    )
+    assert response.status_code == 502
+
+
+def test_speech_stream_stops_at_a_failed_sentence(client, synthesized):
+    response = client.post(
+        "/speech/stream",
+        json={"input": TEXT + " This sentence will fail. This one is never sent."},
+    )
+    assert response.status_code == 200
+    assert response.content == (
+        b"<This is the first sentence here.><This is the second sentence here.>"
+    )
+
+
+def test_invalid_payload(client, synthesized):
+    assert client.post("/speech/stream", content=b"not json").status_code == 400
+    assert client.post("/speech/stream", json={"input": " \n "}).status_code == 400
+
+
+def test_get_chunk_ranges_cut_at_pauses():
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+
+    tone = Sine(440).to_audio_segment(duration=1000)
+    # A pause from 1.3s to 1.7s, and one from 3.2s to 3.6s
+    recording = (
+        tone
+        + tone[:300]
+        + AudioSegment.silent(400)
+        + tone
+        + tone[:500]
+        + AudioSegment.silent(400)
+        + tone
+    )
+
+    ranges = audio.get_chunk_ranges(recording, 2000)
+    assert len(ranges) == 3
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(recording)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert all(0 < end - start <= 2000 for start, end in ranges)
+    assert 1300 <= ranges[0][1] <= 1700
+    assert 3200 <= ranges[1][1] <= 3600
+
+
+@pytest.fixture
+def transcripts(monkeypatch, tmp_path):
+    (tmp_path / "transcripts").mkdir()
+    cache = DirectoryCache(str(tmp_path / "transcripts"), 1024)
+    monkeypatch.setattr(audio, "TRANSCRIPTION_CACHE", cache)
+    monkeypatch.setattr(audio, "get_audio_duration", lambda file_path: 1)
+    monkeypatch.setattr(audio, "is_audio_conversion_required", lambda file_path: False)
+
+    calls = []
+
+    def transcription_handler(request, file_path, metadata):
+        calls.append(file_path)
+        with open(file_path, "rb") as f:
+            return {"text": f.read().decode()}
+
+    monkeypatch.setattr(audio, "transcription_handler", transcription_handler)
+    return cache, calls
+
+
+def test_transcripts_are_cached_and_deleted_with_their_file(tmp_path, transcripts):
+    cache, calls = transcripts
+    request = SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(STT_ENGINE="openai", STT_MODEL="whisper-1")
+            )
+        )
+    )
+    first, second = tmp_path / "first.mp3", tmp_path / "second.mp3"
+    first.write_bytes(b"first recording")
+    second.write_bytes(b"second recording")
+
+    assert audio.transcribe(request, str(first)) == {"text": "first recording"}
+    assert audio.transcribe(request, str(first)) == {"text": "first recording"}
+    assert audio.transcribe(request, str(second)) == {"text": "second recording"}
+    assert calls == [str(first), str(second)]
+
+    audio.delete_cached_transcripts(str(first))
+    assert audio.transcribe(request, str(second)) == {"text": "second recording"}
+    assert audio.transcribe(request, str(first)) == {"text": "first recording"}
+    assert calls == [str(first), str(second), str(first)]
+
+    audio.delete_cached_transcripts()
+    assert cache.get_stats()["files"] == 0
+
+
+def test_transcripts_are_cached_by_the_uploaded_hash(tmp_path, transcripts):
+    cache, calls = transcripts
+    request = SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(STT_ENGINE="openai", STT_MODEL="whisper-1")
+            )
+        )
+    )
+    path = tmp_path / "recording.mp3"
+    path.write_bytes(b"recording")
+    file_hash = audio.get_file_hash(str(path))
+
+    assert audio.transcribe(request, str(path)) == {"text": "recording"}
+    assert audio.transcribe(request, str(path), file_hash=file_hash) == {
+        "text": "recording"
+    }
+    assert calls == [str(path)]
+
+    # Without reading the recording, which may be gone by then
+    path.unlink()
+    audio.delete_cached_transcripts(file_hash=file_hash)
+    assert cache.get_stats()["files"] == 0
+
+
+def test_transcript_cache_is_bounded(tmp_path, transcripts):
+    cache, calls = transcripts
+    request = SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(STT_ENGINE="openai", STT_MODEL="whisper-1")
+            )
+        )
+    )
+    for index in range(20):
+        path = tmp_path / f"{index}.mp3"
+        path.write_bytes(f"recording {index} ".encode() * 5)
+        audio.transcribe(request, str(path))
+
+    assert 0 < cache.get_stats()["size"] <= 1024
@@ -39,6 +39,60 @@ class TestChats(AbstractPostgresTest):
         assert first_chat["created_at"] is not None
         assert first_chat["updated_at"] is not None
 
+    def test_get_session_user_chat_list_with_cursor(self):
+        with mock_webui_user(id="2"):
+            response = self.fast_api_client.get(self.create_url("/list"))
+            first_chat = response.json()[0]
+            cursor = f"{first_chat['updated_at']}:{first_chat['id']}"
+            response = self.fast_api_client.get(
+                self.create_url(f"/list?cursor={cursor}")
+            )
+        assert response.status_code == 200
+        assert response.json() == []
+
+        with mock_webui_user(id="2"):
+            response = self.fast_api_client.get(self.create_url("/list?cursor=bad"))
+        assert response.status_code == 400
+
+    def test_get_session_user_chat_list_with_cursor_over_several_pages(self):
+        from open_webui.internal.db import get_db
+        from open_webui.models.chats import Chat, ChatForm
+
+        for i in range(150):
+            self.chats.insert_new_chat(
+                "2", ChatForm(**{"chat": {"title": f"chat {i}"}})
+            )
+        # Groups of chats updated at the same time, across page boundaries
+        with get_db() as db:
+            for i, chat in enumerate(db.query(Chat).filter_by(user_id="2").all()):
+                chat.updated_at = 1_700_000_000 + i // 50
+            db.commit()
+
+        ids = []
+        cursor = None
+        with mock_webui_user(id="2"):
+            while True:
+                url = f"/list?cursor={cursor}" if cursor else "/list?page=1"
+                response = self.fast_api_client.get(self.create_url(url))
+                assert response.status_code == 200
+                page = response.json()
+                if not page:
+                    break
+                assert len(page) <= 60
+                ids.extend(chat["id"] for chat in page)
+                cursor = f"{page[-1]['updated_at']}:{page[-1]['id']}"
+
+        expected = [
+            chat.id
+            for chat in sorted(
+                self.chats.get_chats_by_user_id("2"),
+                key=lambda chat: (chat.updated_at, chat.id),
+                reverse=True,
+            )
+        ]
+        assert len(ids) == len(set(ids)) == 151
+        assert ids == expected
+
     def test_delete_all_user_chats(self):
         with mock_webui_user(id="2"):
             response = self.fast_api_client.delete(self.create_url("/"))
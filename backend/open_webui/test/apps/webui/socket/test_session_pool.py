@@ -0,0 +1,135 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from open_webui.socket import utils
+from open_webui.socket.utils import RedisSessionPool, SessionPool
+
+ALICE = {"id": "alice", "name": "Alice"}
+BOB = {"id": "bob", "name": "Bob"}
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_pool(monkeypatch, server):
+    monkeypatch.setattr(
+        utils,
+        "get_async_redis_connection",
+        lambda redis_url, redis_sentinels, decode_responses: fakeredis.FakeAsyncRedis(
+            server=server, decode_responses=decode_responses
+        ),
+    )
+
+    def redis_pool(cache_ttl=0):
+        return RedisSessionPool("presence", "redis://", cache_ttl=cache_ttl)
+
+    return redis_pool
+
+
+@pytest.fixture(params=["memory", "redis"])
+def pool(request):
+    if request.param == "memory":
+        return SessionPool
+    return request.getfixturevalue("redis_pool")
+
+
+def test_connect_and_disconnect(pool):
+    async def run():
+        sessions = pool()
+        await sessions.add("sid-1", ALICE)
+        await sessions.add("sid-2", ALICE)
+        await sessions.add("sid-3", BOB)
+
+        assert await sessions.get("sid-1") == ALICE
+        assert await sessions.get("unknown") is None
+        assert await sessions.get_many(["sid-3", "unknown", "sid-2"]) == [
+            BOB,
+            None,
+            ALICE,
+        ]
+        assert sorted(await sessions.get_session_ids_by_user_id("alice")) == [
+            "sid-1",
+            "sid-2",
+        ]
+        assert sorted(await sessions.get_user_ids()) == ["alice", "bob"]
+
+        assert await sessions.remove("sid-1") == ALICE
+        assert await sessions.remove("sid-1") is None
+        # Still connected from another tab
+        assert await sessions.is_user_active("alice")
+        assert await sessions.get_session_ids_by_user_id("alice") == ["sid-2"]
+
+        await sessions.remove("sid-2")
+        assert not await sessions.is_user_active("alice")
+        assert await sessions.get_session_ids_by_user_id("alice") == []
+        assert await sessions.get_user_ids() == ["bob"]
+        assert await sessions.get("sid-2") is None
+
+    asyncio.run(run())
+
+
+def test_redis_keys_are_cleaned_up(redis_pool):
+    async def run():
+        sessions = redis_pool()
+        await sessions.add("sid-1", ALICE)
+        await sessions.add("sid-2", BOB)
+        await sessions.remove("sid-1")
+        await sessions.remove("sid-2")
+        assert await sessions.redis.keys("*") == []
+
+    asyncio.run(run())
+
+
+def test_redis_pool_is_shared_between_workers(redis_pool):
+    async def run():
+        worker_1, worker_2 = redis_pool(), redis_pool()
+        await worker_1.add("sid-1", ALICE)
+        await worker_2.add("sid-2", ALICE)
+
+        assert await worker_2.get("sid-1") == ALICE
+        # A leave on one worker doesn't drop the user's sessions on another
+        await worker_1.remove("sid-1")
+        assert await worker_2.is_user_active("alice")
+        assert await worker_1.get_session_ids_by_user_id("alice") == ["sid-2"]
+
+    asyncio.run(run())
+
+
+def test_redis_lookups_are_cached(redis_pool, monkeypatch):
+    async def run():
+        sessions = redis_pool(cache_ttl=60)
+        other_worker = redis_pool()
+        await sessions.add("sid-1", ALICE)
+        assert await sessions.get_session_ids_by_user_id("alice") == ["sid-1"]
+        assert await sessions.get_user_ids() == ["alice"]
+
+        calls = []
+        smembers = sessions.redis.smembers
+
+        async def recording_smembers(key):
+            calls.append(key)
+            return await smembers(key)
+
+        monkeypatch.setattr(sessions.redis, "smembers", recording_smembers)
+        for _ in range(10):
+            assert await sessions.get("sid-1") == ALICE
+            assert await sessions.is_user_active("alice")
+        assert calls == []
+
+        # Stale until the entry expires when changed by another worker
+        await other_worker.add("sid-2", BOB)
+        assert await sessions.get_user_ids() == ["alice"]
+
+        # Changes made by this worker are seen straight away
+        await sessions.remove("sid-1")
+        assert await sessions.get("sid-1") is None
+        assert not await sessions.is_user_active("alice")
+        assert await sessions.get_user_ids() == ["bob"]
+        assert calls == ["presence:user:alice", "presence:users"]
+
+    asyncio.run(run())
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from redis.exceptions import ResponseError
+
+from open_webui.socket import main as socket_main
+from open_webui.socket import utils
+from open_webui.socket.utils import RedisUsagePool, UsagePool
+
+
+@pytest.fixture
+def redis_pool(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        utils,
+        "get_async_redis_connection",
+        lambda redis_url, redis_sentinels, decode_responses: fakeredis.FakeAsyncRedis(
+            server=server, decode_responses=decode_responses
+        ),
+    )
+
+    def redis_pool(ttl=3):
+        return RedisUsagePool("usage", "redis://", ttl=ttl)
+
+    return redis_pool
+
+
+@pytest.fixture(params=["memory", "redis"])
+def pool(request):
+    if request.param == "memory":
+        return lambda ttl=3: UsagePool(ttl=ttl)
+    return request.getfixturevalue("redis_pool")
+
+
+def test_touch_and_expire(pool, monkeypatch):
+    now = 1_700_000_000.0
+    monkeypatch.setattr(utils.time, "time", lambda: now)
+
+    async def run():
+        nonlocal now
+        usage = pool(ttl=3)
+        assert await usage.next_expiry() is None
+
+        assert await usage.touch("llama", "sid-1")
+        assert await usage.touch("llama", "sid-2")
+        now += 2
+        assert await usage.touch("mistral", "sid-1")
+        # Refreshes aren't reported as new usage
+        assert not await usage.touch("llama", "sid-1")
+        assert await usage.get_models() == ["llama", "mistral"]
+        # sid-2's usage of llama, touched first and not since
+        assert await usage.next_expiry() == now + 1
+
+        now += 1
+        assert await usage.expire() == 1
+        assert await usage.get_models() == ["llama", "mistral"]
+
+        now += 2
+        assert await usage.get_models() == []
+        assert await usage.expire() == 2
+        assert await usage.next_expiry() is None
+
+    asyncio.run(run())
+
+
+def test_broadcasts_are_deduplicated(pool):
+    async def run():
+        usage = pool()
+        assert await usage.set_broadcast_models(["llama"])
+        assert not await usage.set_broadcast_models(["llama"])
+        assert await usage.set_broadcast_models([])
+        assert not await usage.set_broadcast_models([])
+
+    asyncio.run(run())
+
+
+def test_broadcasts_are_deduplicated_across_workers(redis_pool):
+    async def run():
+        worker_1, worker_2 = redis_pool(), redis_pool()
+        assert await worker_1.set_broadcast_models(["llama"])
+        assert not await worker_2.set_broadcast_models(["llama"])
+
+    asyncio.run(run())
+
+
+def test_broadcast_dedup_before_redis_6_2(redis_pool, monkeypatch):
+    async def run():
+        usage = redis_pool()
+        set = usage.redis.set
+
+        async def old_set(*args, get=False, **kwargs):
+            if get:
+                raise ResponseError("syntax error")
+            return await set(*args, **kwargs)
+
+        monkeypatch.setattr(usage.redis, "set", old_set)
+        assert await usage.set_broadcast_models(["llama"])
+        assert not await usage.set_broadcast_models(["llama"])
+
+    asyncio.run(run())
+
+
+def test_cleanup_loop_broadcasts_expired_usage(redis_pool, monkeypatch):
+    emitted = []
+    released = []
+
+    async def emit(event, data, to=None):
+        emitted.append((event, data))
+
+    monkeypatch.setattr(socket_main, "USAGE_POOL", redis_pool(ttl=0.3))
+    monkeypatch.setattr(socket_main, "USAGE_BROADCAST_DEBOUNCE", 0)
+    monkeypatch.setattr(socket_main, "usage_broadcast_task", None)
+    monkeypatch.setattr(socket_main.sio, "emit", emit)
+    monkeypatch.setattr(socket_main, "release_func", lambda: released.append(True))
+
+    async def run():
+        cleanup = asyncio.create_task(socket_main.periodic_usage_pool_cleanup())
+
+        start = time.monotonic()
+        assert await socket_main.USAGE_POOL.touch("llama", "sid-1")
+        socket_main.schedule_usage_broadcast()
+        while len(emitted) < 2 and time.monotonic() - start < 2:
+            await asyncio.sleep(0.05)
+
+        # Woken up by the expiry rather than the next TIMEOUT_DURATION tick
+        assert time.monotonic() - start < socket_main.TIMEOUT_DURATION
+        assert emitted == [("usage", {"models": ["llama"]}), ("usage", {"models": []})]
+
+        cleanup.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cleanup
+        assert released == [True]
+
+    asyncio.run(run())
+
+
+def test_cleanup_loop_stops_when_the_lock_is_lost(monkeypatch):
+    released = []
+    monkeypatch.setattr(socket_main, "renew_func", lambda: False)
+    monkeypatch.setattr(socket_main, "release_func", lambda: released.append(True))
+
+    with pytest.raises(Exception, match="Unable to renew"):
+        asyncio.run(socket_main.periodic_usage_pool_cleanup())
+    assert released == [True]
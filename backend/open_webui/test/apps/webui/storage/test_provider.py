@@ -1,3 +1,4 @@
+import hashlib
 import io
 import os
 import boto3
@@ -5,6 +6,7 @@ import pytest
 from botocore.exceptions import ClientError
 from moto import mock_aws
 from open_webui.storage import provider
+from open_webui.storage.cache import StorageCache
 from gcp_storage_emulator.server import create_server
 from google.cloud import storage
 from azure.storage.blob import BlobServiceClient, ContainerClient, BlobClient
@@ -66,10 +68,13 @@ class TestLocalStorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
+        size, sha256, file_path = self.Storage.upload_file(
+            self.file_bytesio, self.filename
+        )
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -80,6 +85,14 @@ class TestLocalStorageProvider:
         file_path_return = self.Storage.get_file(file_path)
         assert file_path == file_path_return
 
+    def test_iter_file(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        (upload_dir / self.filename).write_bytes(self.file_content)
+        file_path = str(upload_dir / self.filename)
+        assert self.Storage.get_file_size(file_path) == len(self.file_content)
+        assert b"".join(self.Storage.iter_file(file_path)) == self.file_content
+        assert b"".join(self.Storage.iter_file(file_path, 5, 11)) == b"content"
+
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         (upload_dir / self.filename).write_bytes(self.file_content)
@@ -116,7 +129,7 @@ class TestS3StorageProvider:
         with pytest.raises(Exception):
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, sha256, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename)
@@ -124,7 +137,8 @@ class TestS3StorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
         assert s3_file_path == "s3://" + self.Storage.bucket_name + "/" + self.filename
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -132,17 +146,27 @@ class TestS3StorageProvider:
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        _, _, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(s3_file_path)
         assert file_path == str(upload_dir / self.filename)
         assert (upload_dir / self.filename).exists()
 
+    def test_iter_file(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
+        _, _, s3_file_path = self.Storage.upload_file(
+            io.BytesIO(self.file_content), self.filename
+        )
+        assert self.Storage.get_file_size(s3_file_path) == len(self.file_content)
+        assert b"".join(self.Storage.iter_file(s3_file_path)) == self.file_content
+        assert b"".join(self.Storage.iter_file(s3_file_path, 5, 11)) == b"content"
+
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        _, _, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         assert (upload_dir / self.filename).exists()
@@ -229,7 +253,7 @@ class TestGCSStorageProvider:
         with pytest.raises(Exception):
             self.Storage.bucket = monkeypatch(self.Storage, "bucket", None)
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, sha256, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.Storage.bucket.get_blob(self.filename)
@@ -237,7 +261,8 @@ class TestGCSStorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
         assert gcs_file_path == "gs://" + self.Storage.bucket_name + "/" + self.filename
         # test error if file is empty
         with pytest.raises(ValueError):
@@ -245,7 +270,7 @@ class TestGCSStorageProvider:
 
     def test_get_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        _, _, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(gcs_file_path)
@@ -254,7 +279,7 @@ class TestGCSStorageProvider:
 
     def test_delete_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        _, _, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         # ensure that local directory has the uploaded file as well
@@ -348,16 +373,18 @@ class TestAzureStorageProvider:
         # Reset side effect and create container
         self.Storage.container_client.get_blob_client.side_effect = None
         self.Storage.create_container()
-        contents, azure_file_path = self.Storage.upload_file(
+        size, sha256, azure_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
-        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
-        )
-        assert contents == self.file_content
+        upload_blob = self.Storage.container_client.get_blob_client().upload_blob
+        upload_blob.assert_called_once()
+        assert upload_blob.call_args.kwargs["length"] == len(self.file_content)
+        assert upload_blob.call_args.kwargs["overwrite"] is True
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
         assert (
             azure_file_path
             == f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
@@ -433,3 +460,50 @@ class TestAzureStorageProvider:
         )
         with pytest.raises(Exception, match="Blob not found"):
             self.Storage.get_file(file_url)
+
+
+class TestStorageCache:
+    def download(self, content):
+        def download(path):
+            with open(path, "wb") as f:
+                f.write(content)
+
+        return download
+
+    def test_get_file(self, tmp_path):
+        cache = StorageCache(max_size=100)
+        file_path = str(tmp_path / "test.txt")
+        assert cache.get(file_path, "v1", self.download(b"v1")) == file_path
+        assert cache.get(file_path, "v1", self.download(b"other")) == file_path
+        assert (tmp_path / "test.txt").read_bytes() == b"v1"
+        # a new version of the object is downloaded again
+        cache.get(file_path, "v2", self.download(b"v2"))
+        assert (tmp_path / "test.txt").read_bytes() == b"v2"
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_eviction(self, tmp_path):
+        cache = StorageCache(max_size=25)
+        for name in ["a", "b", "c"]:
+            cache.get(str(tmp_path / name), "v1", self.download(b"x" * 10))
+        assert not (tmp_path / "a").exists()
+        assert (tmp_path / "b").exists()
+        assert (tmp_path / "c").exists()
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_existing_files_are_evicted(self, tmp_path):
+        # Downloaded before a restart
+        for mtime, name in enumerate(["old", "new"]):
+            (tmp_path / name).write_bytes(b"x" * 10)
+            os.utime(tmp_path / name, (mtime, mtime))
+
+        cache = StorageCache(max_size=25, directory=str(tmp_path))
+        assert cache.get_stats()["size"] == 20
+        cache.get(str(tmp_path / "c"), "v1", self.download(b"x" * 10))
+        assert not (tmp_path / "old").exists()
+        assert (tmp_path / "new").exists()
+        assert (tmp_path / "c").exists()
+
+        # Their version is unknown, so they are downloaded again
+        cache.get(str(tmp_path / "new"), "v1", self.download(b"v1"))
+        assert (tmp_path / "new").read_bytes() == b"v1"
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from open_webui import tasks
+from open_webui.tasks import RedisTaskRegistry
+
+
+class FailingRegistry:
+    async def add(self, task_id, chat_id=None):
+        raise ConnectionError("Redis is down")
+
+    async def remove(self, task_id, chat_id=None):
+        raise ConnectionError("Redis is down")
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(
+        tasks,
+        "get_async_redis_connection",
+        lambda *args, **kwargs: FakeAsyncRedis(decode_responses=True),
+    )
+    registry = RedisTaskRegistry("redis://localhost:6379/0")
+    monkeypatch.setattr(tasks, "task_registry", registry)
+    return registry
+
+
+async def settle():
+    while tasks.registry_updates:
+        await asyncio.gather(*tasks.registry_updates, return_exceptions=True)
+
+
+def test_task_is_registered_and_removed(registry):
+    async def run():
+        release = asyncio.Event()
+        task_id, task = await tasks.create_task(release.wait(), id="chat")
+
+        assert await registry.list_tasks() == [task_id]
+        assert await registry.list_task_ids_by_chat_id("chat") == [task_id]
+
+        release.set()
+        await task
+        await settle()
+
+        assert await registry.list_tasks() == []
+        assert await registry.exists(task_id) is False
+
+    asyncio.run(run())
+
+
+def test_task_finishing_immediately_leaves_no_entry(registry):
+    async def run():
+        async def instant():
+            return "done"
+
+        task_id, task = await tasks.create_task(instant(), id="chat")
+        assert await task == "done"
+        await settle()
+
+        assert await registry.list_tasks() == []
+        assert await registry.list_task_ids_by_chat_id("chat") == []
+
+    asyncio.run(run())
+
+
+def test_registry_failure_keeps_the_task_tracked_and_stoppable(monkeypatch):
+    monkeypatch.setattr(tasks, "task_registry", FailingRegistry())
+
+    async def run():
+        task_id, task = await tasks.create_task(asyncio.sleep(60), id="chat")
+        assert tasks.get_task(task_id) is task
+
+        result = await tasks.stop_task(task_id)
+        assert result["status"] is True
+        assert task.cancelled()
+        await settle()
+        assert task_id not in tasks.tasks
+
+    asyncio.run(run())
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from open_webui.utils import asgi
+from open_webui.utils.asgi import RequestMiddleware
+
+
+class RecordingSession:
+    """Stands in for the scoped session, recording how the request ended."""
+
+    def __init__(self, in_transaction=True):
+        self.calls = []
+        self.registry = SimpleNamespace(has=lambda: True)
+        self._in_transaction = in_transaction
+
+    def __call__(self):
+        return self
+
+    def in_transaction(self):
+        return self._in_transaction
+
+    def commit(self):
+        self.calls.append("commit")
+
+    def rollback(self):
+        self.calls.append("rollback")
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = RecordingSession()
+    monkeypatch.setattr(asgi, "Session", session)
+    return session
+
+
+@pytest.fixture
+def client(monkeypatch, session):
+    monkeypatch.setenv("XFRAME_OPTIONS", "DENY")
+    monkeypatch.setenv("XCONTENT_TYPE", "nosniff")
+
+    app = FastAPI()
+    app.state.config = SimpleNamespace(ENABLE_API_KEY=True)
+    app.add_middleware(RequestMiddleware)
+
+    @app.get("/api/state")
+    def state(request: Request):
+        token = request.state.token
+        return {
+            "token": token.credentials if token else None,
+            "enable_api_key": request.state.enable_api_key,
+        }
+
+    @app.get("/api/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]))
+
+    @app.get("/api/error")
+    def error():
+        raise RuntimeError("boom")
+
+    @app.get("/ws/socket.io/")
+    def socket_io():
+        return {"status": "ok"}
+
+    @app.get("/static/app.js")
+    def static(request: Request):
+        return {"has_token": "token" in request.scope.get("state", {})}
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_sets_the_request_state(client):
+    response = client.get("/api/state", headers={"Authorization": "Bearer sk-123"})
+    assert response.json() == {"token": "sk-123", "enable_api_key": True}
+
+    response = client.get("/api/state")
+    assert response.json() == {"token": None, "enable_api_key": True}
+
+
+def test_adds_timing_and_security_headers(client):
+    for path in ("/api/state", "/api/stream", "/static/app.js", "/watch?v=abc"):
+        response = client.get(path, follow_redirects=False)
+        assert response.headers["X-Frame-Options"] == "DENY"
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert float(response.headers["X-Process-Time"]) >= 0
+        assert response.headers["Server-Timing"].startswith("app;dur=")
+
+    # Streamed bodies are passed through
+    assert client.get("/api/stream").content == b"abc"
+
+
+def test_static_assets_skip_the_request_state(client, session):
+    assert client.get("/static/app.js").json() == {"has_token": False}
+    assert session.calls == []
+
+
+def test_redirects_youtube_links(client):
+    response = client.get("/watch?v=dQw4w9WgXcQ&t=1", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == "/?youtube=dQw4w9WgXcQ"
+
+    # Not without a video id
+    assert client.get("/watch", follow_redirects=False).status_code == 404
+
+
+def test_rejects_websocket_requests_without_upgrade_headers(client):
+    response = client.get("/ws/socket.io/?EIO=4&transport=websocket")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid WebSocket upgrade request"}
+
+    response = client.get(
+        "/ws/socket.io/?EIO=4&transport=websocket",
+        headers={"Upgrade": "WebSocket", "Connection": "Upgrade"},
+    )
+    assert response.status_code == 200
+
+    # Polling needs no upgrade
+    assert client.get("/ws/socket.io/?EIO=4&transport=polling").status_code == 200
+
+
+def test_commits_open_transactions(client, session):
+    assert client.get("/api/state").status_code == 200
+    assert session.calls == ["commit"]
+
+    session._in_transaction = False
+    client.get("/api/state")
+    assert session.calls == ["commit"]
+
+
+def test_rolls_back_on_exceptions(client, session):
+    assert client.get("/api/error").status_code == 500
+    assert session.calls == ["rollback"]
@@ -0,0 +1,204 @@
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from open_webui.models.users import UserModel
+from open_webui.utils import audit
+from open_webui.utils.audit import (
+    AuditLevel,
+    AuditLogEntry,
+    AuditLoggingMiddleware,
+    AuditLogSink,
+)
+
+
+class RecordingAuditLogger:
+    """Records written entries, optionally holding up the writer."""
+
+    def __init__(self):
+        self.entries = []
+        self.threads = []
+        self.writing = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def write(self, entry):
+        self.writing.set()
+        self.release.wait(timeout=5)
+        self.entries.append(entry)
+        self.threads.append(threading.current_thread().name)
+
+
+def make_entry(i=0, body=b""):
+    return AuditLogEntry(
+        id=str(i),
+        user={},
+        audit_level="REQUEST_RESPONSE",
+        verb="POST",
+        request_uri="http://testserver/api/v1/auths/signin",
+        request_object=body,
+        response_object=b"{}",
+    )
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def audit_logger():
+    return RecordingAuditLogger()
+
+
+def test_entries_are_redacted_by_the_writer(audit_logger):
+    sink = AuditLogSink(audit_logger)
+    entry = make_entry(body=b'{"email": "a@b.c", "password": "hunter2"}')
+
+    assert sink.put(entry)
+    sink.close()
+
+    # Queued as they are, redacted off the request path
+    assert entry.request_object == b'{"email": "a@b.c", "password": "hunter2"}'
+    assert audit_logger.entries[0].request_object == (
+        '{"email": "a@b.c", "password": "********"}'
+    )
+    assert audit_logger.entries[0].response_object == "{}"
+    assert audit_logger.threads == ["audit-log-writer"]
+    assert sink.get_stats()["written"] == 1
+
+
+def test_entries_are_dropped_when_the_queue_is_full(audit_logger):
+    sink = AuditLogSink(audit_logger, max_queue_size=2)
+    audit_logger.release.clear()
+
+    assert sink.put(make_entry(0))
+    audit_logger.writing.wait(timeout=5)
+
+    # Taken off the queue by the stuck writer, so two more fit
+    assert sink.put(make_entry(1))
+    assert sink.put(make_entry(2))
+    assert not sink.put(make_entry(3))
+    assert sink.get_stats() == {
+        "queued": 3,
+        "written": 0,
+        "dropped": 1,
+        "failed": 0,
+        "batches": 0,
+        "queue_depth": 2,
+        "max_queue_size": 2,
+    }
+
+    audit_logger.release.set()
+    sink.close()
+    assert [entry.id for entry in audit_logger.entries] == ["0", "1", "2"]
+    assert sink.get_stats()["written"] == 3
+
+
+def test_entries_are_written_in_batches(audit_logger):
+    sink = AuditLogSink(audit_logger, batch_size=2)
+    audit_logger.release.clear()
+
+    sink.put(make_entry(0))
+    audit_logger.writing.wait(timeout=5)
+    for i in range(1, 5):
+        sink.put(make_entry(i))
+    audit_logger.release.set()
+
+    # [0], then [1, 2] and [3, 4]
+    wait_for(lambda: sink.get_stats()["batches"] == 3)
+    assert sink.get_stats()["written"] == 5
+    sink.close()
+
+
+def test_failed_writes_dont_stop_the_writer(audit_logger):
+    write = audit_logger.write
+
+    def failing_write(entry):
+        if entry.id == "0":
+            raise ValueError("disk full")
+        write(entry)
+
+    audit_logger.write = failing_write
+    sink = AuditLogSink(audit_logger)
+    sink.put(make_entry(0))
+    sink.put(make_entry(1))
+    sink.close()
+
+    assert [entry.id for entry in audit_logger.entries] == ["1"]
+    assert sink.get_stats()["failed"] == 1
+
+
+@pytest.fixture
+def client(monkeypatch, audit_logger):
+    sink = AuditLogSink(audit_logger)
+    monkeypatch.setattr(audit, "AUDIT_LOG_SINK", sink)
+    monkeypatch.setattr(audit, "AUDIT_LOG_LEVEL", "REQUEST_RESPONSE")
+
+    app = FastAPI()
+    app.add_middleware(AuditLoggingMiddleware, audit_level=AuditLevel.REQUEST_RESPONSE)
+
+    @app.post("/api/v1/chats/new")
+    async def new_chat(request: Request):
+        await request.body()
+        # As get_current_user does
+        request.state.user = UserModel(
+            id="1",
+            name="Alice",
+            email="alice@example.com",
+            role="admin",
+            profile_image_url="",
+            last_active_at=0,
+            updated_at=0,
+            created_at=0,
+            api_key="sk-secret",
+        )
+        return {"id": "chat"}
+
+    @app.post("/api/v1/auths/signin")
+    async def signin(request: Request):
+        await request.body()
+        return {"token": "t"}
+
+    yield TestClient(app)
+    sink.close()
+
+
+def test_middleware_reuses_the_authenticated_user(client, audit_logger):
+    response = client.post(
+        "/api/v1/chats/new",
+        json={"chat": {}},
+        headers={"Authorization": "Bearer token"},
+    )
+    assert response.status_code == 200
+    wait_for(lambda: audit_logger.entries)
+
+    entry = audit_logger.entries[0]
+    assert entry.user == {
+        "id": "1",
+        "name": "Alice",
+        "email": "alice@example.com",
+        "role": "admin",
+    }
+    assert entry.verb == "POST"
+    assert entry.response_status_code == 200
+    assert entry.request_object == '{"chat":{}}'
+    assert entry.response_object == '{"id":"chat"}'
+
+
+def test_middleware_redacts_unauthenticated_signins(client, audit_logger):
+    client.post(
+        "/api/v1/auths/signin",
+        json={"email": "alice@example.com", "password": "hunter2"},
+    )
+    wait_for(lambda: audit_logger.entries)
+
+    entry = audit_logger.entries[0]
+    assert entry.user == {}
+    assert "hunter2" not in entry.request_object
+    assert '"password": "********"' in entry.request_object
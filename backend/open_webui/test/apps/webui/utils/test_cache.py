@@ -0,0 +1,179 @@
+import os
+import time
+
+import fakeredis
+import pytest
+
+from open_webui.utils import cache as cache_module
+from open_webui.utils.cache import DirectoryCache, FileCache, RedisCache, TTLCache
+
+
+class TestDirectoryCache:
+    def test_put_and_get(self, tmp_path):
+        cache = DirectoryCache(tmp_path, max_size=100)
+        assert cache.get("a.mp3") is None
+
+        path = cache.put("a.mp3", b"audio")
+        assert path == str(tmp_path / "a.mp3")
+        assert cache.get("a.mp3") == path
+        assert (tmp_path / "a.mp3").read_bytes() == b"audio"
+        # No temporary files are left behind
+        assert os.listdir(tmp_path) == ["a.mp3"]
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["files"], stats["size"]) == (
+            1,
+            1,
+            1,
+            5,
+        )
+
+    def test_least_recently_used_files_are_evicted(self, tmp_path):
+        cache = DirectoryCache(tmp_path, max_size=25)
+        cache.put("a", b"x" * 10)
+        cache.put("b", b"x" * 10)
+        cache.get("a")
+        cache.put("c", b"x" * 10)
+
+        assert cache.get("b") is None
+        assert not (tmp_path / "b").exists()
+        assert cache.get("a") and cache.get("c")
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_the_file_just_added_is_kept(self, tmp_path):
+        cache = DirectoryCache(tmp_path, max_size=5)
+        cache.put("a", b"x" * 3)
+        cache.put("b", b"x" * 10)
+
+        assert cache.get("b")
+        assert cache.get("a") is None
+
+    def test_existing_files_are_tracked_oldest_first(self, tmp_path):
+        for name, age in [("old", 20), ("new", 10)]:
+            path = tmp_path / name
+            path.write_bytes(b"x" * 10)
+            mtime = time.time() - age
+            os.utime(path, (mtime, mtime))
+        (tmp_path / "partial.abc.tmp").write_bytes(b"x")
+
+        cache = DirectoryCache(tmp_path, max_size=25)
+        assert cache.get_stats()["size"] == 20
+        cache.put("newest", b"x" * 10)
+
+        assert not (tmp_path / "old").exists()
+        assert cache.get("new") and cache.get("newest")
+
+    def test_delete(self, tmp_path):
+        cache = DirectoryCache(tmp_path, max_size=100)
+        cache.put("a", b"x" * 10)
+        cache.delete("a")
+        cache.delete("missing")
+
+        assert not (tmp_path / "a").exists()
+        assert cache.get_stats()["size"] == 0
+
+
+class TestFileCache:
+    def test_versions(self, tmp_path):
+        cache = FileCache(max_size=100)
+        path = str(tmp_path / "file")
+
+        def write(content):
+            def write(tmp_path):
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+
+            return write
+
+        cache.write(path, write(b"v1"), version="1")
+        assert cache.lookup(path, "1")
+        assert not cache.lookup(path, "2")
+        assert cache.lookup(path)
+
+        cache.discard(path)
+        assert not cache.lookup(path)
+        # Discarding without `delete` leaves the file
+        assert os.path.exists(path)
+
+    def test_failed_write_leaves_nothing(self, tmp_path):
+        cache = FileCache(max_size=100)
+        path = str(tmp_path / "file")
+
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(b"partial")
+            raise OSError("disk full")
+
+        try:
+            cache.write(path, write)
+        except OSError:
+            pass
+
+        assert os.listdir(tmp_path) == []
+        assert not cache.lookup(path)
+
+
+class TestTTLCache:
+    def test_entries_expire(self):
+        cache = TTLCache(maxsize=10, ttl=0.05)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+        assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+
+        time.sleep(0.1)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+    def test_zero_ttl_is_not_replaced_by_the_default(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("a", 2, ttl=0)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = TTLCache(maxsize=2)
+        cache.set_many({"a": 1, "b": 2})
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+        assert cache.get_stats()["evictions"] == 1
+
+
+class TestRedisCache:
+    @pytest.fixture
+    def redis(self, monkeypatch):
+        redis = fakeredis.FakeRedis(decode_responses=True)
+        monkeypatch.setattr(
+            cache_module, "get_redis_connection", lambda *args, **kwargs: redis
+        )
+        return redis
+
+    def test_get_and_set(self, redis):
+        cache = RedisCache("test", "redis://localhost", ttl=60)
+        cache.set_many({"a": {"score": 1.5}, "b": [1, 2]})
+
+        assert cache.get_many(["a", "b", "c"]) == {"a": {"score": 1.5}, "b": [1, 2]}
+        assert 0 < redis.pttl("open-webui:cache:test:a") <= 60_000
+        assert cache.get_stats()["hits"] == 2
+
+    def test_ttl(self, redis):
+        cache = RedisCache("test", "redis://localhost", ttl=60)
+        cache.set("a", 1, ttl=5)
+        assert 0 < redis.pttl("open-webui:cache:test:a") <= 5000
+
+        # Rather than falling back to the default TTL
+        cache.set("a", 2, ttl=0)
+        assert cache.get("a") is None
+        assert not redis.exists("open-webui:cache:test:a")
+
+    def test_outage_is_a_miss(self, redis, monkeypatch):
+        cache = RedisCache("test", "redis://localhost")
+
+        def fail(*args, **kwargs):
+            raise ConnectionError("down")
+
+        monkeypatch.setattr(redis, "mget", fail)
+        assert cache.get_many(["a"]) == {}
+        assert cache.get_stats()["errors"] == 1
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+
+from open_webui.utils import plugin
+from open_webui.utils.plugin import PluginCache
+
+
+class FakeFunctions:
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, id, content, updated_at):
+        self.rows[id] = SimpleNamespace(id=id, content=content, updated_at=updated_at)
+
+    def get_function_by_id(self, id):
+        return self.rows.get(id)
+
+    def get_function_updated_at_by_id(self, id):
+        row = self.rows.get(id)
+        return row.updated_at if row else None
+
+    def get_function_valves_by_id(self, id):
+        return {}
+
+
+@pytest.fixture
+def functions(monkeypatch):
+    functions = FakeFunctions()
+    loads = []
+
+    def load_function_module_by_id(function_id, content):
+        loads.append(content)
+        return SimpleNamespace(content=content), "filter", {}
+
+    monkeypatch.setattr(plugin, "Functions", functions)
+    monkeypatch.setattr(
+        plugin, "load_function_module_by_id", load_function_module_by_id
+    )
+    functions.loads = loads
+    return functions
+
+
+def test_changes_are_picked_up_from_the_database_without_redis(functions):
+    cache = PluginCache()
+    functions.add("f", "class Filter: pass", updated_at=1)
+
+    assert cache.get_function_entry("f").module.content == "class Filter: pass"
+    assert cache.get_function_entry("f").version == 1
+    assert len(functions.loads) == 1
+
+    # Changed on another replica
+    functions.add("f", "class Filter: x = 1", updated_at=2)
+    assert cache.get_function_entry("f").module.content == "class Filter: x = 1"
+    assert len(functions.loads) == 2
+
+    # The "stream" hook skips the check
+    functions.add("f", "class Filter: x = 2", updated_at=3)
+    entry = cache.get_function_entry("f", verify_version=False)
+    assert entry.module.content == "class Filter: x = 1"
+
+
+def test_row_change_keeps_the_module(functions):
+    cache = PluginCache()
+    functions.add("f", "class Filter: pass", updated_at=1)
+    module = cache.get_function_entry("f").module
+
+    functions.add("f", "class Filter: pass", updated_at=2)
+    entry = cache.get_function_entry("f")
+    assert entry.version == 2
+    assert entry.module is module
+    assert len(functions.loads) == 1
+
+
+def test_filter_pipelines_are_resolved_every_time_without_redis():
+    cache = PluginCache()
+    calls = []
+    resolve = lambda: calls.append(1) or ["f"]
+
+    assert cache.get_filter_pipeline(("model",), resolve) == ["f"]
+    assert cache.get_filter_pipeline(("model",), resolve) == ["f"]
+    assert len(calls) == 2
+
+
+def redis_cache(server) -> PluginCache:
+    cache = PluginCache()
+    cache.redis = fakeredis.FakeRedis(server=server)
+    cache.verify_versions = False
+    return cache
+
+
+def test_with_redis_entries_are_reused_until_invalidated(functions):
+    cache = redis_cache(fakeredis.FakeServer())
+    functions.add("f", "class Filter: pass", updated_at=1)
+    cache.get_function_entry("f")
+
+    functions.add("f", "class Filter: x = 1", updated_at=2)
+    assert cache.get_function_entry("f").version == 1
+
+    cache.invalidate("function", "f")
+    assert cache.get_function_entry("f").version == 2
+
+
+def test_invalidate_publishes_off_the_event_loop():
+    server = fakeredis.FakeServer()
+    cache = redis_cache(server)
+    subscriber = fakeredis.FakeRedis(server=server).pubsub()
+    subscriber.subscribe(PluginCache.CHANNEL)
+    subscriber.get_message(timeout=1)
+
+    published_from = []
+    publish = cache.publish
+
+    def record(message):
+        published_from.append(threading.current_thread())
+        publish(message)
+
+    cache.publish = record
+
+    async def route():
+        cache.invalidate("tool", "t")
+        # Let the executor run the publish
+        await asyncio.sleep(0.1)
+
+    asyncio.run(route())
+
+    assert published_from and published_from[0] is not threading.main_thread()
+    message = subscriber.get_message(timeout=1)
+    assert json.loads(message["data"]) == {
+        "origin": cache.origin,
+        "kind": "tool",
+        "id": "t",
+    }
+
+
+def test_is_requirement_satisfied():
+    pytest_version = plugin.metadata.version("pytest")
+
+    assert plugin.is_requirement_satisfied("pytest") is True
+    assert plugin.is_requirement_satisfied(f"PyTest=={pytest_version}") is True
+    assert plugin.is_requirement_satisfied("pytest<1") is False
+    assert plugin.is_requirement_satisfied("not-an-installed-package") is False
+    # Requirements for other environments never need installing
+    assert plugin.is_requirement_satisfied('pytest<1; python_version < "3"') is True
+    # Installed from a URL or VCS, which metadata can't tell
+    assert plugin.is_requirement_satisfied("pytest @ https://example.com/p.whl") is None
+    assert plugin.is_requirement_satisfied("git+https://example.com/p.git") is None
+
+
+@pytest.fixture
+def pip(monkeypatch, tmp_path):
+    monkeypatch.setattr(plugin, "REQUIREMENTS_MARKER_DIR", tmp_path)
+    calls = []
+
+    class Popen:
+        def __init__(self, args, **kwargs):
+            calls.append(args)
+            self.args = args
+            self.returncode = 1 if "failing-package" in args else 0
+            self.stdout = iter(["Collecting", "Successfully installed"])
+
+        def wait(self):
+            return self.returncode
+
+    monkeypatch.setattr(plugin.subprocess, "Popen", Popen)
+    return calls
+
+
+def test_markers_only_vouch_for_requirements_metadata_cant_check(pip):
+    vcs = "git+https://example.com/p.git"
+    req_list = plugin.parse_requirements(f"pytest, {vcs}, not-an-installed-package")
+
+    assert plugin.get_missing_requirements(req_list) == [
+        vcs,
+        "not-an-installed-package",
+    ]
+
+    plugin.get_requirements_marker_path(req_list).write_text(json.dumps(req_list))
+    # Still missing after its site-packages were reset
+    assert plugin.get_missing_requirements(req_list) == ["not-an-installed-package"]
+    # Markers are per requirement set
+    assert plugin.get_missing_requirements([vcs]) == [vcs]
+
+
+def test_install_frontmatter_requirements_installs_what_is_missing(pip):
+    output = []
+    plugin.install_frontmatter_requirements(
+        "pytest, not-an-installed-package, pytest", on_output=output.append
+    )
+    assert len(pip) == 1
+    assert "not-an-installed-package" in pip[0] and "pytest" not in pip[0]
+    assert output == ["Collecting", "Successfully installed"]
+    marker = plugin.get_requirements_marker_path(["not-an-installed-package", "pytest"])
+    assert marker.exists()
+
+    # Nothing to install
+    plugin.install_frontmatter_requirements("pytest")
+    assert len(pip) == 1
+    assert plugin.get_requirements_marker_path(["pytest"]).exists()
+
+
+def test_failed_installs_leave_no_marker(pip):
+    with pytest.raises(plugin.subprocess.CalledProcessError):
+        plugin.install_frontmatter_requirements("failing-package")
+    assert not plugin.get_requirements_marker_path(["failing-package"]).exists()
+
+    # Tried again the next time
+    with pytest.raises(plugin.subprocess.CalledProcessError):
+        plugin.install_frontmatter_requirements("failing-package")
+    assert len(pip) == 2
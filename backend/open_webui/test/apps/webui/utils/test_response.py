@@ -0,0 +1,150 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+
+from open_webui.utils import filter as filter_utils
+from open_webui.utils import middleware
+from open_webui.utils.response import (
+    SSE_DONE,
+    SSEStreamingResponse,
+    convert_streaming_response_ollama_to_openai,
+)
+
+OLLAMA_STREAM = [
+    {"model": "llama", "message": {"role": "assistant", "content": "Hello"}},
+    {"model": "llama", "message": {"role": "assistant", "content": " world"}},
+    {
+        "model": "llama",
+        "message": {"role": "assistant", "content": ""},
+        "done": True,
+        "prompt_eval_count": 3,
+        "eval_count": 2,
+    },
+]
+
+
+def ollama_response():
+    async def lines():
+        for line in OLLAMA_STREAM:
+            yield json.dumps(line).encode() + b"\n"
+
+    # As generate_chat_completion returns it for a streamed Ollama model
+    response = StreamingResponse(lines(), media_type="application/x-ndjson")
+    response.headers["content-type"] = "text/event-stream"
+    return SSEStreamingResponse(
+        convert_streaming_response_ollama_to_openai(response),
+        headers=dict(response.headers),
+    )
+
+
+def get_events(body: str) -> list:
+    assert body.endswith(SSE_DONE)
+    events = body[: -len(SSE_DONE)].split("\n\n")
+    assert events.pop() == ""
+    return [json.loads(event.removeprefix("data: ")) for event in events]
+
+
+def get_content(events: list) -> str:
+    return "".join(
+        event["choices"][0]["delta"].get("content") or ""
+        for event in events
+        if "choices" in event
+    )
+
+
+def send(response) -> str:
+    app = FastAPI()
+    app.get("/")(lambda: response)
+    response = TestClient(app).get("/")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return response.text
+
+
+def test_sse_streaming_response_serializes_chunks_when_sent():
+    async def items():
+        yield {"choices": [{"delta": {"content": "Ünïcode"}}]}
+        yield 'data: {"choices": [{"delta": {"content": "!"}}]}\n\n'
+        yield SSE_DONE
+
+    events = get_events(send(SSEStreamingResponse(items())))
+    assert get_content(events) == "Ünïcode!"
+
+
+def test_ollama_stream_is_converted_to_chunks():
+    async def read():
+        return [item async for item in ollama_response().body_iterator]
+
+    items = asyncio.run(read())
+    assert items[-1] == SSE_DONE
+    assert all(isinstance(item, dict) for item in items[:-1])
+    assert get_content(items[:-1]) == "Hello world"
+    assert items[-2]["usage"]["completion_tokens"] == 2
+
+    # And sent as SSE events
+    events = get_events(send(ollama_response()))
+    assert [event["choices"] for event in events] == [
+        item["choices"] for item in items[:-1]
+    ]
+    assert events[-1]["usage"] == items[-2]["usage"]
+
+
+@pytest.fixture
+def stream_filter(monkeypatch):
+    """A stream filter recording the events it gets, shouting their content."""
+    events = []
+
+    def stream(event):
+        events.append(event)
+        if isinstance(event, dict) and "choices" in event:
+            delta = event["choices"][0]["delta"]
+            delta["content"] = (delta.get("content") or "").upper()
+        return event
+
+    function = SimpleNamespace(id="shout")
+    entry = SimpleNamespace(module=SimpleNamespace(stream=stream), valves=None)
+    monkeypatch.setattr(
+        middleware, "get_sorted_filter_ids", lambda request, model, ids: ["shout"]
+    )
+    monkeypatch.setattr(
+        middleware.Functions, "get_function_by_id", lambda function_id: function
+    )
+    monkeypatch.setattr(
+        filter_utils.PLUGIN_CACHE,
+        "get_function_entry",
+        lambda function_id, verify_version=True: entry,
+    )
+    return events
+
+
+def test_ollama_stream_through_the_middleware_fallback(stream_filter):
+    user = SimpleNamespace(id="1", email="a@b.c", name="Alice", role="user")
+
+    async def process():
+        # Without a chat, as for API clients, the response is streamed as is
+        return await middleware.process_chat_response(
+            request=SimpleNamespace(),
+            response=ollama_response(),
+            form_data={"model": "llama", "stream": True},
+            user=user,
+            metadata={},
+            model={"id": "llama"},
+            events=[{"sources": []}],
+            tasks={},
+        )
+
+    response = asyncio.run(process())
+    assert isinstance(response, SSEStreamingResponse)
+
+    events = get_events(send(response))
+    assert events[0] == {"sources": []}
+    assert get_content(events) == "HELLO WORLD"
+
+    # Filters get the chunks as dicts, not SSE lines to parse
+    assert stream_filter[-1] == SSE_DONE
+    assert all(isinstance(event, dict) for event in stream_filter[:-1])
+    assert len(stream_filter) == len(OLLAMA_STREAM) + 2
@@ -0,0 +1,118 @@
+import json
+import math
+
+import numpy as np
+import pytest
+from sqlalchemy import JSON, Column, MetaData, String, Table, create_engine
+from sqlalchemy import insert, select
+
+from open_webui.internal.db import JSON_SERIALIZATION_KWARGS, JSONField
+from open_webui.utils import serializer
+from open_webui.utils.response import ORJSONResponse
+from open_webui.utils.serializer import dumps, dumps_bytes, loads
+
+DOCUMENT = {
+    "title": "Ünïcode — 🦊",
+    "messages": [{"id": "1", "parentId": None, "done": True, "score": 0.25}],
+    "timestamp": 1_735_689_600,
+}
+BIG_INTEGERS = [2**64 + 1, -(2**63) - 1, 10**30, 2**63 - 1]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_serializer(request, monkeypatch):
+    if request.param == "orjson" and not serializer.ORJSON_AVAILABLE:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(serializer, "USE_ORJSON", request.param == "orjson")
+    return request.param
+
+
+@pytest.fixture
+def table():
+    metadata = MetaData()
+    table = Table(
+        "document",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("field", JSONField),
+        Column("json", JSON),
+    )
+    engine = create_engine("sqlite://", **JSON_SERIALIZATION_KWARGS)
+    metadata.create_all(engine)
+
+    def round_trip(value):
+        with engine.begin() as connection:
+            connection.execute(table.delete())
+            connection.execute(insert(table).values(id="1", field=value, json=value))
+        with engine.connect() as connection:
+            return connection.execute(select(table.c.field, table.c.json)).one()
+
+    return round_trip
+
+
+def test_json_field_round_trip(table, json_serializer):
+    assert table(DOCUMENT) == (DOCUMENT, DOCUMENT)
+    assert table({"integers": BIG_INTEGERS}) == (
+        {"integers": BIG_INTEGERS},
+        {"integers": BIG_INTEGERS},
+    )
+
+
+def test_json_field_non_finite_floats(table, json_serializer):
+    field, column = table({"values": [float("nan"), float("inf"), None, 1.5]})
+
+    for values in (field["values"], column["values"]):
+        if json_serializer == "orjson":
+            assert values == [None, None, None, 1.5]
+        else:
+            assert math.isnan(values[0])
+            assert values[1:] == [float("inf"), None, 1.5]
+
+
+def test_loads_documents_written_by_the_json_module(json_serializer):
+    document = loads('{"distance": NaN, "score": Infinity, "id": 1e400}')
+    assert math.isnan(document["distance"])
+    assert document["score"] == document["id"] == float("inf")
+
+    # Long digit runs that aren't integers
+    document = {"id": "12345678901234567890123", "score": 0.12345678901234567890}
+    assert loads(json.dumps(document)) == document
+    assert loads(json.dumps(BIG_INTEGERS).encode()) == BIG_INTEGERS
+
+
+def test_numpy_values_are_serialized_as_lists(json_serializer):
+    assert loads(dumps({"embedding": np.array([0.5, 1.0])})) == {
+        "embedding": [0.5, 1.0]
+    }
+    assert loads(dumps({"distance": np.float32(0.5), "id": None})) == {
+        "distance": 0.5,
+        "id": None,
+    }
+
+
+def test_dumps_matches_the_json_module(json_serializer):
+    for value in (DOCUMENT, {"integers": BIG_INTEGERS}, [None, "null", 0.1]):
+        assert json.loads(dumps(value)) == value
+        assert loads(dumps_bytes(value)) == value
+
+
+def test_json_module_can_refuse_non_finite_floats(monkeypatch):
+    monkeypatch.setattr(serializer, "USE_ORJSON", False)
+    with pytest.raises(ValueError):
+        dumps_bytes({"score": float("nan"), "parentId": None}, allow_nan=False)
+    with pytest.raises(ValueError):
+        dumps_bytes([float("-inf")], allow_nan=False)
+
+
+def test_orjson_response(json_serializer):
+    response = ORJSONResponse({**DOCUMENT, "integers": BIG_INTEGERS})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {**DOCUMENT, "integers": BIG_INTEGERS}
+
+    # Never sent as invalid JSON
+    if json_serializer == "orjson":
+        response = ORJSONResponse({"score": float("nan"), "parentId": None})
+        assert json.loads(response.body) == {"score": None, "parentId": None}
+    else:
+        with pytest.raises(ValueError):
+            ORJSONResponse({"score": float("nan"), "parentId": None})
@@ -0,0 +1,166 @@
+"""
+Benchmark of the JSON serialization of chat documents, as stored in the
+database and returned by the API, with the json module and utils.serializer.
+
+    cd backend && python -m open_webui.test.benchmarks.serialization [messages]
+"""
+
+import json
+import sys
+import time
+import uuid
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    select,
+)
+from starlette.responses import JSONResponse
+
+from open_webui.utils.response import ORJSONResponse
+from open_webui.utils.serializer import USE_ORJSON, dumps, loads
+
+ROUNDS = 5
+
+PARAGRAPH = (
+    "Here's a summary of the changes, with an example below. The function "
+    "now streams the file in chunks rather than reading it into memory — "
+    "which keeps memory flat for large uploads (e.g. 1 GB videos). "
+)
+CODE = "```python\ndef read_chunks(f, size=1024 * 1024):\n    while chunk := f.read(size):\n        yield chunk\n```\n"
+
+
+def chat_document(messages: int) -> dict:
+    """A chat shaped like the ones the frontend saves, with `messages` messages."""
+    history = {}
+    parent_id = None
+    for i in range(messages):
+        message_id = str(uuid.uuid4())
+        role = "user" if i % 2 == 0 else "assistant"
+        message = {
+            "id": message_id,
+            "parentId": parent_id,
+            "childrenIds": [],
+            "role": role,
+            "content": (
+                PARAGRAPH if role == "user" else (PARAGRAPH * 6 + CODE + PARAGRAPH * 4)
+            ),
+            "timestamp": 1_735_689_600 + i,
+            "models": ["llama3.2:latest"],
+        }
+        if role == "assistant":
+            message.update(
+                {
+                    "model": "llama3.2:latest",
+                    "modelName": "llama3.2:latest",
+                    "done": True,
+                    "usage": {
+                        "prompt_tokens": 1200 + i,
+                        "completion_tokens": 480,
+                        "total_tokens": 1680 + i,
+                        "response_token/s": 42.17,
+                    },
+                    "sources": [
+                        {
+                            "source": {"name": f"doc{j}.pdf", "type": "file"},
+                            "document": [PARAGRAPH * 3],
+                            "metadata": [{"page": j, "source": f"doc{j}.pdf"}],
+                            "distances": [0.4123 + j / 100],
+                        }
+                        for j in range(3)
+                    ],
+                }
+            )
+        if parent_id:
+            history[parent_id]["childrenIds"].append(message_id)
+        history[message_id] = message
+        parent_id = message_id
+
+    return {
+        "id": "",
+        "title": "Streaming uploads",
+        "models": ["llama3.2:latest"],
+        "params": {},
+        "history": {"messages": history, "currentId": parent_id},
+        "messages": list(history.values()),
+        "tags": [],
+        "timestamp": 1_735_689_600_000,
+    }
+
+
+def measure(function) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def database_round_trip(engine, table, chat: dict):
+    def round_trip():
+        with engine.begin() as connection:
+            connection.execute(table.delete())
+            connection.execute(insert(table).values(id="chat", chat=chat))
+        with engine.connect() as connection:
+            connection.execute(select(table.c.chat)).scalar_one()
+
+    return round_trip
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    chat = chat_document(messages)
+    document = json.dumps(chat)
+    assert loads(dumps(chat)) == chat
+
+    engines = {}
+    for name, kwargs in [
+        ("json", {}),
+        ("serializer", {"json_serializer": dumps, "json_deserializer": loads}),
+    ]:
+        metadata = MetaData()
+        table = Table(
+            "chat",
+            metadata,
+            Column("id", String, primary_key=True),
+            Column("chat", JSON),
+        )
+        engine = create_engine("sqlite://", **kwargs)
+        metadata.create_all(engine)
+        engines[name] = (engine, table)
+
+    print(
+        f"Chat with {messages} messages, {len(document) / 1024 / 1024:.1f}MB, "
+        f"orjson: {USE_ORJSON}, best of {ROUNDS}"
+    )
+    for name, legacy, current in [
+        ("dumps", lambda: json.dumps(chat), lambda: dumps(chat)),
+        ("loads", lambda: json.loads(document), lambda: loads(document)),
+        (
+            "response",
+            lambda: JSONResponse(chat),
+            lambda: ORJSONResponse(chat),
+        ),
+        (
+            "database",
+            database_round_trip(*engines["json"], chat),
+            database_round_trip(*engines["serializer"], chat),
+        ),
+    ]:
+        legacy_time = measure(legacy)
+        current_time = measure(current)
+        print(
+            f"{name:>8}: json {legacy_time * 1000:7.1f}ms, "
+            f"serializer {current_time * 1000:7.1f}ms, "
+            f"{legacy_time / current_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark of an Ollama chat stream converted to OpenAI chat completion chunks,
+as read by the chat middleware and as sent to API clients.
+
+    cd backend && python -m open_webui.test.benchmarks.streaming [tokens]
+
+"legacy" reproduces the previous pipeline: every chunk is serialized to an
+SSE line by the converter and parsed again by the middleware.
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from open_webui.utils.misc import openai_chat_chunk_message_template
+from open_webui.utils.response import (
+    convert_ollama_tool_call_to_openai,
+    convert_ollama_usage_to_openai,
+    convert_streaming_response_ollama_to_openai,
+    serialize_sse_events,
+)
+from open_webui.utils.serializer import ORJSON_AVAILABLE
+
+ROUNDS = 5
+
+
+class OllamaStreamingResponse:
+    def __init__(self, lines: list[bytes]):
+        self.lines = lines
+
+    @property
+    def body_iterator(self):
+        async def iterate():
+            for line in self.lines:
+                yield line
+
+        return iterate()
+
+
+def ollama_stream(tokens: int) -> list[bytes]:
+    lines = [
+        json.dumps(
+            {
+                "model": "llama3.2:latest",
+                "created_at": "2025-01-01T00:00:00.000000Z",
+                "message": {"role": "assistant", "content": f" token{i}"},
+                "done": False,
+            }
+        ).encode()
+        + b"\n"
+        for i in range(tokens)
+    ]
+    lines.append(
+        json.dumps(
+            {
+                "model": "llama3.2:latest",
+                "created_at": "2025-01-01T00:00:00.000000Z",
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "total_duration": 5_000_000_000,
+                "prompt_eval_count": 26,
+                "prompt_eval_duration": 100_000_000,
+                "eval_count": tokens,
+                "eval_duration": 4_000_000_000,
+            }
+        ).encode()
+        + b"\n"
+    )
+    return lines
+
+
+async def legacy_convert(response):
+    async for data in response.body_iterator:
+        data = json.loads(data)
+        message_content = data.get("message", {}).get("content", None)
+        tool_calls = data.get("message", {}).get("tool_calls", None)
+        openai_tool_calls = None
+        if tool_calls:
+            openai_tool_calls = convert_ollama_tool_call_to_openai(tool_calls)
+        usage = None
+        if data.get("done", False):
+            usage = convert_ollama_usage_to_openai(data)
+        data = openai_chat_chunk_message_template(
+            data.get("model", "ollama"), message_content, openai_tool_calls, usage
+        )
+        yield f"data: {json.dumps(data)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+async def legacy_middleware(lines: list[bytes]) -> str:
+    content = ""
+    async for line in legacy_convert(OllamaStreamingResponse(lines)):
+        if not line.startswith("data:"):
+            continue
+        data = line[len("data:") :].strip()
+        try:
+            data = json.loads(data)
+        except ValueError:
+            continue
+        content += data["choices"][0]["delta"].get("content", "")
+    return content
+
+
+async def middleware(lines: list[bytes]) -> str:
+    content = ""
+    response = OllamaStreamingResponse(lines)
+    async for data in convert_streaming_response_ollama_to_openai(response):
+        if not isinstance(data, dict):
+            continue
+        content += data["choices"][0]["delta"].get("content", "")
+    return content
+
+
+async def legacy_api(lines: list[bytes]) -> int:
+    size = 0
+    async for line in legacy_convert(OllamaStreamingResponse(lines)):
+        size += len(line.encode("utf-8"))
+    return size
+
+
+async def api(lines: list[bytes]) -> int:
+    size = 0
+    response = OllamaStreamingResponse(lines)
+    async for line in serialize_sse_events(
+        convert_streaming_response_ollama_to_openai(response)
+    ):
+        size += len(line)
+    return size
+
+
+def measure(pipeline, lines: list[bytes]) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        asyncio.run(pipeline(lines))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    lines = ollama_stream(tokens)
+
+    assert asyncio.run(legacy_middleware(lines)) == asyncio.run(middleware(lines))
+
+    print(f"{tokens} token stream, orjson: {ORJSON_AVAILABLE}, best of {ROUNDS}")
+    for name, legacy, current in [
+        ("middleware", legacy_middleware, middleware),
+        ("api", legacy_api, api),
+    ]:
+        legacy_time = measure(legacy, lines)
+        current_time = measure(current, lines)
+        print(
+            f"{name:>10}: legacy {legacy_time * 1000:7.1f}ms "
+            f"({legacy_time / tokens * 1e6:5.1f}us/token), "
+            f"now {current_time * 1000:7.1f}ms "
+            f"({current_time / tokens * 1e6:5.1f}us/token), "
+            f"{legacy_time / current_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
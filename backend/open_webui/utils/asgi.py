@@ -0,0 +1,113 @@
+import time
+from typing import MutableMapping, cast
+from urllib.parse import parse_qs, urlencode
+
+from asgiref.typing import (
+    ASGI3Application,
+    ASGIReceiveCallable,
+    ASGISendCallable,
+    ASGISendEvent,
+    Scope as ASGIScope,
+)
+from fastapi import status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse, RedirectResponse
+
+from open_webui.internal.db import Session
+from open_webui.utils.auth import get_http_authorization_cred
+from open_webui.utils.security_headers import set_security_headers
+
+# Paths served by StaticFiles, which need none of the per-request work below
+STATIC_PATH_PREFIXES = ("/static/", "/cache/", "/_app/")
+
+
+class RequestMiddleware:
+    """
+    ASGI middleware doing the per-request work of the app in a single layer:
+
+    - redirects YouTube `/watch?v=` links to the chat page,
+    - rejects socket.io websocket requests without upgrade headers,
+    - sets `request.state.token` and `request.state.enable_api_key`,
+    - commits the request's database session, if it left one open,
+    - adds the security headers and `X-Process-Time`/`Server-Timing` headers
+      (time to the start of the response) to every response.
+
+    Response bodies are passed through untouched, so streaming responses aren't
+    buffered or copied, and static assets skip everything but the headers.
+    """
+
+    def __init__(self, app: ASGI3Application) -> None:
+        self.app = app
+        # Read from the environment once, rather than for every response
+        self.security_headers = set_security_headers()
+
+    async def __call__(
+        self,
+        scope: ASGIScope,
+        receive: ASGIReceiveCallable,
+        send: ASGISendCallable,
+    ) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: ASGISendEvent) -> None:
+            if message["type"] == "http.response.start":
+                process_time = time.perf_counter() - start_time
+                headers = MutableHeaders(scope=cast(MutableMapping, message))
+                for key, value in self.security_headers.items():
+                    headers[key] = value
+                headers["X-Process-Time"] = f"{process_time:.6f}"
+                headers["Server-Timing"] = f"app;dur={process_time * 1000:.3f}"
+            await send(message)
+
+        if scope["path"].startswith(STATIC_PATH_PREFIXES):
+            return await self.app(scope, receive, send_wrapper)
+
+        response = self._get_early_response(scope)
+        if response is not None:
+            return await response(scope, receive, send_wrapper)
+
+        headers = Headers(scope=scope)
+        state = scope.setdefault("state", {})
+        state["token"] = get_http_authorization_cred(headers.get("Authorization"))
+        state["enable_api_key"] = scope["app"].state.config.ENABLE_API_KEY
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            if Session.registry.has():
+                Session.rollback()
+            raise
+
+        # Most requests use their own sessions (get_db), only commit the scoped
+        # session when something left a transaction open on it
+        if Session.registry.has() and Session().in_transaction():
+            Session.commit()
+
+    @staticmethod
+    def _get_early_response(scope: ASGIScope):
+        path = scope["path"]
+        if scope["method"] == "GET" and path.endswith("/watch"):
+            query_params = parse_qs(scope["query_string"].decode("latin-1"))
+            if "v" in query_params:
+                # Extract the first 'v' parameter
+                video_id = query_params["v"][0]
+                return RedirectResponse(url=f"/?{urlencode({'youtube': video_id})}")
+
+        if "/ws/socket.io" in path:
+            query_params = parse_qs(scope["query_string"].decode("latin-1"))
+            if query_params.get("transport", [None])[-1] == "websocket":
+                headers = Headers(scope=scope)
+                upgrade = (headers.get("Upgrade") or "").lower()
+                connection = (headers.get("Connection") or "").lower().split(",")
+                # Check that there's the correct headers for an upgrade, else reject the connection
+                # This is to work around this upstream issue: https://github.com/miguelgrinberg/python-engineio/issues/367
+                if upgrade != "websocket" or "upgrade" not in connection:
+                    return JSONResponse(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        content={"detail": "Invalid WebSocket upgrade request"},
+                    )
+
+        return None
@@ -1,7 +1,10 @@
 from contextlib import asynccontextmanager
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, replace
 from enum import Enum
+import queue
 import re
+import threading
+import time
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -24,9 +27,14 @@ from asgiref.typing import (
 from loguru import logger
 from starlette.requests import Request
 
-from open_webui.env import AUDIT_LOG_LEVEL, MAX_BODY_LOG_SIZE
-from open_webui.utils.auth import get_current_user, get_http_authorization_cred
+from open_webui.env import (
+    AUDIT_LOG_BATCH_SIZE,
+    AUDIT_LOG_LEVEL,
+    AUDIT_LOG_QUEUE_SIZE,
+    MAX_BODY_LOG_SIZE,
+)
 from open_webui.models.users import UserModel
+from open_webui.utils.metrics import Counter
 
 
 if TYPE_CHECKING:
@@ -48,6 +56,8 @@ class AuditLogEntry:
     # `Request Response` level
     response_object: Any = None
     response_status_code: Optional[int] = None
+    # When the request was made, as entries are written some time later
+    timestamp: Optional[int] = None
 
 
 class AuditLevel(str, Enum):
@@ -88,6 +98,111 @@ class AuditLogger:
         )
 
 
+PASSWORD_PATTERN = re.compile(r'"password":\s*"(.*?)"')
+
+
+def redact_body(body: bytes) -> str:
+    text = body.decode("utf-8", errors="replace")
+    # Redact sensitive information
+    if "password" in text:
+        text = PASSWORD_PATTERN.sub('"password": "********"', text)
+    return text
+
+
+class AuditLogSink:
+    """
+    Writes audit log entries from a background thread, so that requests never
+    wait on redacting and writing them. Entries are queued as they are, with
+    raw request/response bodies, and the writer drains up to `batch_size` of
+    them at a time. Once `max_queue_size` entries are waiting, new entries are
+    dropped and counted rather than holding up requests.
+    """
+
+    def __init__(
+        self,
+        audit_logger: AuditLogger,
+        max_queue_size: int = AUDIT_LOG_QUEUE_SIZE,
+        batch_size: int = AUDIT_LOG_BATCH_SIZE,
+    ):
+        self.audit_logger = audit_logger
+        self.batch_size = max(batch_size, 1)
+        self.queue: queue.Queue[Optional[AuditLogEntry]] = queue.Queue(
+            maxsize=max_queue_size
+        )
+        self.stats = Counter("queued", "written", "dropped", "failed", "batches")
+
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def put(self, entry: AuditLogEntry) -> bool:
+        """Queue an entry without blocking, returns False if it was dropped."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="audit-log-writer", daemon=True
+                )
+                self._thread.start()
+
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.stats.inc("dropped")
+            dropped = self.stats.snapshot()["dropped"]
+            if dropped % 1000 == 1:
+                logger.warning(f"Audit log queue is full, {dropped} entries dropped")
+            return False
+
+        self.stats.inc("queued")
+        return True
+
+    def close(self, timeout: float = 5):
+        """Write the queued entries and stop the writer."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            try:
+                self.queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            thread.join(timeout=timeout)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats.snapshot(),
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.queue.maxsize,
+        }
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for entry in batch:
+                if entry is None:
+                    return
+                try:
+                    self.audit_logger.write(
+                        replace(
+                            entry,
+                            request_object=redact_body(entry.request_object),
+                            response_object=redact_body(entry.response_object),
+                        )
+                    )
+                    self.stats.inc("written")
+                except Exception as e:
+                    self.stats.inc("failed")
+                    logger.error(f"Failed to log audit entry: {str(e)}")
+            self.stats.inc("batches")
+
+
+AUDIT_LOG_SINK = AuditLogSink(AuditLogger(logger))
+
+
 class AuditContext:
     """
     Captures and aggregates the HTTP request and response bodies during the processing of a request. It ensures that only a configurable maximum amount of data is stored to prevent excessive memory usage.
@@ -124,6 +239,11 @@ class AuditLoggingMiddleware:
     """
 
     AUDITED_METHODS = {"PUT", "PATCH", "DELETE", "POST"}
+    ALWAYS_LOG_ENDPOINTS = (
+        "/api/v1/auths/signin",
+        "/api/v1/auths/signout",
+        "/api/v1/auths/signup",
+    )
 
     def __init__(
         self,
@@ -134,11 +254,18 @@ class AuditLoggingMiddleware:
         audit_level: AuditLevel = AuditLevel.NONE,
     ) -> None:
         self.app = app
-        self.audit_logger = AuditLogger(logger)
+        self.sink = AUDIT_LOG_SINK
         self.excluded_paths = excluded_paths or []
         self.max_body_size = max_body_size
         self.audit_level = audit_level
 
+        # match either /api/<resource>/...(for the endpoint /api/chat case) or /api/v1/<resource>/...
+        self.excluded_pattern = (
+            re.compile(r"^/api(?:/v1)?/(" + "|".join(self.excluded_paths) + r")\b")
+            if self.excluded_paths
+            else None
+        )
+
     async def __call__(
         self,
         scope: ASGIScope,
@@ -188,20 +315,7 @@ class AuditLoggingMiddleware:
         try:
             yield context
         finally:
-            await self._log_audit_entry(request, context)
-
-    async def _get_authenticated_user(self, request: Request) -> Optional[UserModel]:
-        auth_header = request.headers.get("Authorization")
-
-        try:
-            user = get_current_user(
-                request, None, get_http_authorization_cred(auth_header)
-            )
-            return user
-        except Exception as e:
-            logger.debug(f"Failed to get authenticated user: {str(e)}")
-
-        return None
+            self._queue_audit_entry(request, context)
 
     def _should_skip_auditing(self, request: Request) -> bool:
         if (
@@ -210,25 +324,14 @@ class AuditLoggingMiddleware:
         ):
             return True
 
-        ALWAYS_LOG_ENDPOINTS = {
-            "/api/v1/auths/signin",
-            "/api/v1/auths/signout",
-            "/api/v1/auths/signup",
-        }
-        path = request.url.path.lower()
-        for endpoint in ALWAYS_LOG_ENDPOINTS:
-            if path.startswith(endpoint):
-                return False  # Do NOT skip logging for auth endpoints
+        if request.url.path.lower().startswith(self.ALWAYS_LOG_ENDPOINTS):
+            return False  # Do NOT skip logging for auth endpoints
 
         # Skip logging if the request is not authenticated
         if not request.headers.get("authorization"):
             return True
 
-        # match either /api/<resource>/...(for the endpoint /api/chat case) or /api/v1/<resource>/...
-        pattern = re.compile(
-            r"^/api(?:/v1)?/(" + "|".join(self.excluded_paths) + r")\b"
-        )
-        if pattern.match(request.url.path):
+        if self.excluded_pattern and self.excluded_pattern.match(request.url.path):
             return True
 
         return False
@@ -246,38 +349,30 @@ class AuditLoggingMiddleware:
             body = message.get("body", b"")
             context.add_response_chunk(body)
 
-    async def _log_audit_entry(self, request: Request, context: AuditContext):
+    def _queue_audit_entry(self, request: Request, context: AuditContext):
         try:
-            user = await self._get_authenticated_user(request)
-
-            user = (
-                user.model_dump(include={"id", "name", "email", "role"}) if user else {}
-            )
-
-            request_body = context.request_body.decode("utf-8", errors="replace")
-            response_body = context.response_body.decode("utf-8", errors="replace")
-
-            # Redact sensitive information
-            if "password" in request_body:
-                request_body = re.sub(
-                    r'"password":\s*"(.*?)"',
-                    '"password": "********"',
-                    request_body,
-                )
+            # Set by get_current_user, if the request was authenticated
+            user: Optional[UserModel] = getattr(request.state, "user", None)
 
             entry = AuditLogEntry(
                 id=str(uuid.uuid4()),
-                user=user,
+                user=(
+                    user.model_dump(include={"id", "name", "email", "role"})
+                    if user
+                    else {}
+                ),
                 audit_level=self.audit_level.value,
                 verb=request.method,
                 request_uri=str(request.url),
                 response_status_code=context.metadata.get("response_status_code", None),
                 source_ip=request.client.host if request.client else None,
                 user_agent=request.headers.get("user-agent"),
-                request_object=request_body,
-                response_object=response_body,
+                # Decoded and redacted by the sink's writer
+                request_object=bytes(context.request_body),
+                response_object=bytes(context.response_body),
+                timestamp=int(time.time()),
             )
 
-            self.audit_logger.write(entry)
+            self.sink.put(entry)
         except Exception as e:
             logger.error(f"Failed to log audit entry: {str(e)}")
@@ -206,6 +206,8 @@ def get_current_user(
             current_span.set_attribute("client.user.role", user.role)
             current_span.set_attribute("client.auth.type", "api_key")
 
+        # Reused by the audit log
+        request.state.user = user
         return user
 
     # auth by jwt token
@@ -237,6 +239,9 @@ def get_current_user(
             # to prevent blocking the request
             if background_tasks:
                 background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+
+            # Reused by the audit log
+            request.state.user = user
         return user
     else:
         raise HTTPException(
@@ -0,0 +1,368 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS
+from open_webui.utils.metrics import Counter
+from open_webui.utils.redis import get_redis_connection
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU cache whose entries expire `ttl` seconds after
+    being set. Once `maxsize` entries are stored, the least recently used
+    entry is evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = Counter("hits", "misses", "evictions")
+
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._data[key]
+                    continue
+
+                self._data.move_to_end(key)
+                found[key] = entry[1]
+
+        self.stats.inc("hits", len(found))
+        self.stats.inc("misses", len(keys) - len(found))
+        return found
+
+    def set_many(self, mapping: dict[str, Any], ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl
+
+        with self._lock:
+            if ttl <= 0:
+                # Not worth storing, but shouldn't leave a previous value either
+                for key in mapping:
+                    self._data.pop(key, None)
+                return
+
+            for key, value in mapping.items():
+                self._data[key] = (expires_at, value)
+                self._data.move_to_end(key)
+
+            evicted = 0
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+
+        if evicted:
+            self.stats.inc("evictions", evicted)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.set_many({key: value}, ttl)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        return {**self.stats.snapshot(), "size": len(self), "maxsize": self.maxsize}
+
+
+class FileCache:
+    """
+    Files on local disk bounded to `max_size` bytes in total: once the tracked
+    files exceed it, the least recently used ones are deleted. Each entry can
+    carry a version, e.g. the ETag of the object it was downloaded from.
+
+    With `directory`, the files already in it are tracked on first use,
+    ordered by modification time.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        directory: Optional[str] = None,
+        stats: tuple[str, ...] = (),
+    ):
+        self.max_size = max_size
+        self.directory = str(directory) if directory else None
+        self.size = 0
+        self.stats = Counter("hits", "misses", "evictions", *stats)
+
+        self._lock = threading.Lock()
+        # path -> (version, size), least recently used first
+        self._entries: Optional[OrderedDict[str, tuple[Optional[str], int]]] = None
+
+    def _load(self) -> OrderedDict[str, tuple[Optional[str], int]]:
+        if self._entries is None:
+            files = []
+            if self.directory:
+                for entry in os.scandir(self.directory):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat_result = entry.stat()
+                        files.append(
+                            (stat_result.st_mtime, entry.path, stat_result.st_size)
+                        )
+
+            self._entries = OrderedDict(
+                (path, (None, size)) for _, path, size in sorted(files)
+            )
+            self.size = sum(size for _, size in self._entries.values())
+        return self._entries
+
+    def lookup(self, path: str, version: Optional[str] = None) -> bool:
+        """
+        Return whether `path` is tracked, still on disk and, if `version` is
+        given, at that version, marking it as recently used.
+        """
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(path)
+            if (
+                entry
+                and (version is None or entry[0] == version)
+                and os.path.isfile(path)
+            ):
+                entries.move_to_end(path)
+                self.stats.inc("hits")
+                return True
+
+        self.stats.inc("misses")
+        return False
+
+    def write(
+        self, path: str, write: Callable[[str], None], version: Optional[str] = None
+    ) -> str:
+        """
+        Call `write` with a temporary path to produce the file, then move it
+        to `path` and track it.
+        """
+        # Written next to the destination, so that readers never see a partial file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.track(path, version)
+        return path
+
+    def track(self, path: str, version: Optional[str] = None) -> list[str]:
+        """
+        Track a file written outside the cache, evicting others if needed.
+        Returns the paths of the evicted files.
+        """
+        size = os.path.getsize(path)
+
+        evicted = []
+        with self._lock:
+            entries = self._load()
+            previous = entries.pop(path, None)
+            if previous:
+                self.size -= previous[1]
+
+            entries[path] = (version, size)
+            self.size += size
+
+            # Never evict the entry that was just added
+            while self.size > self.max_size and len(entries) > 1:
+                evicted_path, (_, evicted_size) = entries.popitem(last=False)
+                self.size -= evicted_size
+                evicted.append(evicted_path)
+
+        for evicted_path in evicted:
+            try:
+                os.remove(evicted_path)
+            except FileNotFoundError:
+                pass
+        if evicted:
+            log.debug(f"Evicted {len(evicted)} cached files")
+            self.stats.inc("evictions", len(evicted))
+        return evicted
+
+    def discard(self, path: str, delete: bool = False):
+        """Stop tracking `path`, and with `delete`, remove the file."""
+        with self._lock:
+            entry = self._load().pop(path, None)
+            if entry:
+                self.size -= entry[1]
+
+        if delete:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Stop tracking every file, leaving them on disk."""
+        with self._lock:
+            self._entries = OrderedDict()
+            self.size = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            files = len(self._load())
+        return {
+            **self.stats.snapshot(),
+            "files": files,
+            "size": self.size,
+            "max_size": self.max_size,
+        }
+
+
+class DirectoryCache(FileCache):
+    """
+    Files cached by name in a directory, e.g. synthesized speech, bounded to
+    `max_size` bytes in total.
+    """
+
+    def __init__(self, directory: str, max_size: int):
+        super().__init__(max_size, directory=directory)
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the path of a cached file, or None."""
+        path = self.get_path(name)
+        return path if self.lookup(path) else None
+
+    def put(self, name: str, data: bytes) -> str:
+        """Write a file to the cache, returning its path."""
+
+        def write(path: str):
+            with open(path, "wb") as f:
+                f.write(data)
+
+        return self.write(self.get_path(name), write)
+
+    def delete(self, name: str):
+        self.discard(self.get_path(name), delete=True)
+
+
+class RedisCache:
+    """
+    Cache with the same interface as TTLCache, shared between workers through
+    Redis. Values are stored as JSON with a per-key TTL; size-based eviction
+    is left to the server's `maxmemory-policy`.
+    """
+
+    def __init__(
+        self, name: str, redis_url: str, redis_sentinels=[], ttl: float = 3600
+    ):
+        self.prefix = f"open-webui:cache:{name}"
+        self.ttl = ttl
+        self.redis = get_redis_connection(
+            redis_url, redis_sentinels, decode_responses=True
+        )
+        self.stats = Counter("hits", "misses", "errors")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        if not keys:
+            return {}
+
+        try:
+            values = self.redis.mget([self._key(key) for key in keys])
+        except Exception as e:
+            # A cache outage shouldn't fail the request, just make it slower
+            log.warning(f"Redis cache {self.prefix} unavailable: {e}")
+            self.stats.inc("errors")
+            self.stats.inc("misses", len(keys))
+            return {}
+
+        found = {
+            key: json.loads(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+        self.stats.inc("hits", len(found))
+        self.stats.inc("misses", len(keys) - len(found))
+        return found
+
+    def set_many(self, mapping: dict[str, Any], ttl: Optional[float] = None):
+        if not mapping:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    if ttl <= 0:
+                        pipe.delete(self._key(key))
+                    else:
+                        pipe.set(self._key(key), json.dumps(value), px=int(ttl * 1000))
+                pipe.execute()
+        except Exception as e:
+            log.warning(f"Redis cache {self.prefix} unavailable: {e}")
+            self.stats.inc("errors")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.set_many({key: value}, ttl)
+
+    def delete(self, key: str):
+        try:
+            self.redis.delete(self._key(key))
+        except Exception as e:
+            log.warning(f"Redis cache {self.prefix} unavailable: {e}")
+
+    def clear(self):
+        try:
+            keys = list(self.redis.scan_iter(f"{self.prefix}:*"))
+            if keys:
+                self.redis.delete(*keys)
+        except Exception as e:
+            log.warning(f"Redis cache {self.prefix} unavailable: {e}")
+
+    def get_stats(self) -> dict:
+        return self.stats.snapshot()
+
+
+def get_cache(
+    name: str,
+    maxsize: int = 1024,
+    ttl: float = 3600,
+    redis_url: str = "",
+    redis_sentinels=[],
+):
+    """
+    Return a RedisCache when `redis_url` is set, otherwise an in-process
+    TTLCache.
+    """
+    if redis_url:
+        return RedisCache(name, redis_url, redis_sentinels, ttl=ttl)
+    return TTLCache(maxsize=maxsize, ttl=ttl)
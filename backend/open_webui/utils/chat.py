@@ -47,6 +47,7 @@ from open_webui.utils.plugin import (
 from open_webui.utils.models import get_all_models, check_model_access
 from open_webui.utils.payload import convert_payload_openai_to_ollama
 from open_webui.utils.response import (
+    SSEStreamingResponse,
     convert_response_ollama_to_openai,
     convert_streaming_response_ollama_to_openai,
 )
@@ -229,16 +230,15 @@ async def generate_chat_completion(
             if form_data.get("stream") == True:
 
                 async def stream_wrapper(stream):
-                    yield f"data: {json.dumps({'selected_model_id': selected_model_id})}\n\n"
+                    yield {"selected_model_id": selected_model_id}
                     async for chunk in stream:
                         yield chunk
 
                 response = await generate_chat_completion(
                     request, form_data, user, bypass_filter=True
                 )
-                return StreamingResponse(
+                return SSEStreamingResponse(
                     stream_wrapper(response.body_iterator),
-                    media_type="text/event-stream",
                     background=response.background,
                 )
             else:
@@ -267,7 +267,7 @@ async def generate_chat_completion(
             )
             if form_data.get("stream"):
                 response.headers["content-type"] = "text/event-stream"
-                return StreamingResponse(
+                return SSEStreamingResponse(
                     convert_streaming_response_ollama_to_openai(response),
                     headers=dict(response.headers),
                     background=response.background,
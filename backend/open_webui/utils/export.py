@@ -0,0 +1,81 @@
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_export_chunks(
+    items: Iterable[BaseModel], format: str = "json"
+) -> Iterator[bytes]:
+    """
+    Serialize `items` one at a time and yield them in chunks of roughly
+    EXPORT_CHUNK_SIZE bytes, either as a single JSON array or as NDJSON.
+    """
+    buffer = bytearray(b"[" if format == "json" else b"")
+    first = True
+
+    for item in items:
+        if format == "json" and not first:
+            buffer += b","
+        buffer += item.model_dump_json().encode("utf-8")
+        if format == "ndjson":
+            buffer += b"\n"
+        first = False
+
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+
+    if format == "json":
+        buffer += b"]"
+    if buffer:
+        yield bytes(buffer)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    # wbits=31 produces a gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def get_export_response(
+    items: Iterable[BaseModel],
+    filename: str,
+    format: Optional[str] = "json",
+    compress: bool = False,
+) -> StreamingResponse:
+    """
+    Stream `items` as a JSON array or NDJSON download with bounded memory.
+    `items` is expected to be a lazy iterator (e.g. backed by a server-side
+    cursor); sync iterators are consumed in Starlette's threadpool.
+    """
+    format = format or "json"
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {format}")
+
+    chunks = iter_export_chunks(items, format)
+    media_type = EXPORT_FORMATS[format]
+    filename = f"{filename}.{format}"
+
+    if compress:
+        chunks = gzip_chunks(chunks)
+        media_type = "application/gzip"
+        filename = f"{filename}.gz"
+
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -4,6 +4,7 @@ import logging
 from open_webui.utils.plugin import (
     load_function_module_by_id,
     get_function_module_from_cache,
+    PLUGIN_CACHE,
 )
 from open_webui.models.functions import Functions
 from open_webui.env import SRC_LOG_LEVELS
@@ -23,16 +24,42 @@ def get_function_module(request, function_id, load_from_db=True):
 
 
 def get_sorted_filter_ids(request, model: dict, enabled_filter_ids: list = None):
+    """
+    Resolve the filters to run for `model`, memoized per model until a
+    function changes.
+    """
+    model_filter_ids = []
+    if "info" in model and "meta" in model["info"]:
+        model_filter_ids = model["info"]["meta"].get("filterIds", [])
+
+    key = (
+        model.get("id"),
+        tuple(sorted(model_filter_ids)),
+        tuple(sorted(enabled_filter_ids or [])),
+    )
+    return list(
+        PLUGIN_CACHE.get_filter_pipeline(
+            key,
+            lambda: resolve_sorted_filter_ids(
+                request, model_filter_ids, enabled_filter_ids
+            ),
+        )
+    )
+
+
+def resolve_sorted_filter_ids(
+    request, model_filter_ids: list, enabled_filter_ids: list = None
+):
     def get_priority(function_id):
-        function = Functions.get_function_by_id(function_id)
-        if function is not None:
-            valves = Functions.get_function_valves_by_id(function_id)
-            return valves.get("priority", 0) if valves else 0
-        return 0
+        try:
+            valves = PLUGIN_CACHE.get_function_entry(function_id).valves
+        except Exception:
+            return 0
+        return valves.get("priority", 0) if valves else 0
 
     filter_ids = [function.id for function in Functions.get_global_filter_functions()]
-    if "info" in model and "meta" in model["info"]:
-        filter_ids.extend(model["info"]["meta"].get("filterIds", []))
+    if model_filter_ids:
+        filter_ids.extend(model_filter_ids)
         filter_ids = list(set(filter_ids))
     active_filter_ids = [
         function.id
@@ -68,9 +95,10 @@ async def process_filter_functions(
         if not filter:
             continue
 
-        function_module = get_function_module(
-            request, filter_id, load_from_db=(filter_type != "stream")
+        entry = PLUGIN_CACHE.get_function_entry(
+            filter_id, verify_version=(filter_type != "stream")
         )
+        function_module = entry.module
         # Prepare handler function
         handler = getattr(function_module, filter_type, None)
         if not handler:
@@ -82,7 +110,7 @@ async def process_filter_functions(
 
         # Apply valves to the function
         if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
+            valves = entry.valves
             function_module.valves = function_module.Valves(
                 **(valves if valves else {})
             )
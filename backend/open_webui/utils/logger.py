@@ -9,6 +9,7 @@ from open_webui.env import (
     AUDIT_LOG_FILE_ROTATION_SIZE,
     AUDIT_LOG_LEVEL,
     AUDIT_LOGS_FILE_PATH,
+    ENABLE_AUDIT_STDOUT,
     GLOBAL_LOG_LEVEL,
 )
 
@@ -75,7 +76,8 @@ def file_format(record: "Record"):
 
     audit_data = {
         "id": record["extra"].get("id", ""),
-        "timestamp": int(record["time"].timestamp()),
+        "timestamp": record["extra"].get("timestamp")
+        or int(record["time"].timestamp()),
         "user": record["extra"].get("user", dict()),
         "audit_level": record["extra"].get("audit_level", ""),
         "verb": record["extra"].get("verb", ""),
@@ -125,6 +127,14 @@ def start_logger():
         except Exception as e:
             logger.error(f"Failed to initialize audit log file handler: {str(e)}")
 
+        if ENABLE_AUDIT_STDOUT:
+            logger.add(
+                sys.stdout,
+                level="INFO",
+                format=file_format,
+                filter=lambda record: record["extra"].get("auditable") is True,
+            )
+
     logging.basicConfig(
         handlers=[InterceptHandler()], level=GLOBAL_LOG_LEVEL, force=True
     )
@@ -0,0 +1,55 @@
+import bisect
+import threading
+
+
+# Upper bounds (in seconds) used for latency histograms
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Counter:
+    """
+    Thread-safe set of named counters, e.g. hits/misses of a cache.
+    """
+
+    def __init__(self, *names: str):
+        self._lock = threading.Lock()
+        self._values = {name: 0 for name in names}
+
+    def inc(self, name: str, value: int = 1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram with fixed bucket upper bounds, reported
+    in the same shape as a Prometheus histogram.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {}
+            total = 0
+            for bound, count in zip(self.buckets, self._counts):
+                total += count
+                buckets[str(bound)] = total
+            buckets["+Inf"] = self._count
+
+            return {"count": self._count, "sum": self._sum, "buckets": buckets}
@@ -44,6 +44,8 @@ from open_webui.routers.pipelines import (
 from open_webui.routers.memories import query_memory, QueryMemoryForm
 
 from open_webui.utils.webhook import post_webhook
+from open_webui.utils.response import SSEStreamingResponse
+from open_webui.utils.serializer import loads
 
 
 from open_webui.models.users import UserModel
@@ -425,18 +427,15 @@ async def chat_web_search_handler(
             files = form_data.get("files", [])
 
             if results.get("collection_names"):
-                for col_idx, collection_name in enumerate(
-                    results.get("collection_names")
-                ):
-                    files.append(
-                        {
-                            "collection_name": collection_name,
-                            "name": ", ".join(queries),
-                            "type": "web_search",
-                            "urls": results["filenames"],
-                            "queries": queries,
-                        }
-                    )
+                files.append(
+                    {
+                        "collection_names": results.get("collection_names"),
+                        "name": ", ".join(queries),
+                        "type": "web_search",
+                        "urls": results["filenames"],
+                        "queries": queries,
+                    }
+                )
             elif results.get("docs"):
                 # Invoked when bypass embedding and retrieval is set to True
                 docs = results["docs"]
@@ -1216,7 +1215,7 @@ async def process_chat_response(
                     )
 
                     # Send a webhook notification if the user is not active
-                    if not get_active_status_by_user_id(user.id):
+                    if not await get_active_status_by_user_id(user.id):
                         webhook_url = Users.get_user_webhook_url_by_id(user.id)
                         if webhook_url:
                             post_webhook(
@@ -1699,19 +1698,22 @@ async def process_chat_response(
                         line = line.decode("utf-8") if isinstance(line, bytes) else line
                         data = line
 
-                        # Skip empty lines
-                        if not data.strip():
-                            continue
+                        # Chunks of an SSEStreamingResponse are already parsed
+                        if not isinstance(data, dict):
+                            # Skip empty lines
+                            if not data.strip():
+                                continue
 
-                        # "data:" is the prefix for each event
-                        if not data.startswith("data:"):
-                            continue
+                            # "data:" is the prefix for each event
+                            if not data.startswith("data:"):
+                                continue
 
-                        # Remove the prefix
-                        data = data[len("data:") :].strip()
+                            # Remove the prefix
+                            data = data[len("data:") :].strip()
 
                         try:
-                            data = json.loads(data)
+                            if not isinstance(data, dict):
+                                data = loads(data)
 
                             data, _ = await process_filter_functions(
                                 request=request,
@@ -2338,7 +2340,7 @@ async def process_chat_response(
                     )
 
                 # Send a webhook notification if the user is not active
-                if not get_active_status_by_user_id(user.id):
+                if not await get_active_status_by_user_id(user.id):
                     webhook_url = Users.get_user_webhook_url_by_id(user.id)
                     if webhook_url:
                         post_webhook(
@@ -2379,7 +2381,7 @@ async def process_chat_response(
                 await response.background()
 
         # background_tasks.add_task(post_response_handler, response, events)
-        task_id, _ = create_task(
+        task_id, _ = await create_task(
             post_response_handler(response, events), id=metadata["chat_id"]
         )
         return {"status": True, "task_id": task_id}
@@ -2387,9 +2389,6 @@ async def process_chat_response(
     else:
         # Fallback to the original response
         async def stream_wrapper(original_generator, events):
-            def wrap_item(item):
-                return f"data: {item}\n\n"
-
             for event in events:
                 event, _ = await process_filter_functions(
                     request=request,
@@ -2400,7 +2399,7 @@ async def process_chat_response(
                 )
 
                 if event:
-                    yield wrap_item(json.dumps(event))
+                    yield event
 
             async for data in original_generator:
                 data, _ = await process_filter_functions(
@@ -2414,7 +2413,7 @@ async def process_chat_response(
                 if data:
                     yield data
 
-        return StreamingResponse(
+        return SSEStreamingResponse(
             stream_wrapper(response.body_iterator, events),
             headers=dict(response.headers),
             background=response.background,
@@ -0,0 +1,166 @@
+import asyncio
+import gc
+import logging
+import sys
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from open_webui.env import SRC_LOG_LEVELS, MODEL_IDLE_UNLOAD_TTL
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Seconds before a model that failed to load is tried again, doubling with
+# each further failure
+LOAD_RETRY_DELAY = 30
+LOAD_RETRY_MAX_DELAY = 600
+
+
+class ManagedModel:
+    """
+    Proxy for a locally loaded model (SentenceTransformer, CrossEncoder,
+    Whisper, ...). The model is loaded on first use, or ahead of time by
+    `ModelManager.load_pending`, and can be unloaded once idle; attribute
+    access is forwarded to the loaded model, reloading it if needed. After a
+    failed load, requests fail fast until the retry delay has passed.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.model = None
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+
+    def load(self) -> Any:
+        with self._lock:
+            if self.model is None:
+                if self.status == "failed" and time.monotonic() < self.retry_at:
+                    raise RuntimeError(
+                        f"Model {self.name} failed to load: {self.error}"
+                    )
+
+                log.info(f"Loading model {self.name}")
+                self.status = "loading"
+                try:
+                    self.model = self.loader()
+                except Exception as e:
+                    self.status = "failed"
+                    self.error = str(e)
+                    self.failures += 1
+                    delay = min(
+                        LOAD_RETRY_DELAY * 2 ** (self.failures - 1),
+                        LOAD_RETRY_MAX_DELAY,
+                    )
+                    self.retry_at = time.monotonic() + delay
+                    log.error(
+                        f"Error loading model {self.name}, retrying in {delay}s: {e}"
+                    )
+                    raise
+
+                self.status = "ready"
+                self.error = None
+                self.failures = 0
+            return self.model
+
+    def get(self) -> Any:
+        self.last_used = time.monotonic()
+        return self.model if self.model is not None else self.load()
+
+    def unload(self):
+        with self._lock:
+            if self.model is None:
+                return
+
+            log.info(f"Unloading model {self.name}")
+            self.model = None
+            self.status = "unloaded"
+
+        gc.collect()
+        # Only touch torch if a model already imported it
+        torch = sys.modules.get("torch")
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def __getattr__(self, name: str) -> Any:
+        # Don't forward lookups made before __init__ ran (e.g. copy, pickle)
+        if name.startswith("__") or name in ("model", "loader", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+
+class ModelManager:
+    def __init__(self):
+        self.models: dict[str, ManagedModel] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> ManagedModel:
+        """
+        Register a lazily loaded model, unloading any previous model with the
+        same name.
+        """
+        self.unregister(name)
+        self.models[name] = ManagedModel(name, loader)
+        return self.models[name]
+
+    def unregister(self, name: str):
+        model = self.models.pop(name, None)
+        if model:
+            model.unload()
+
+    async def load_pending(self):
+        for model in list(self.models.values()):
+            if model.status != "pending":
+                continue
+
+            try:
+                await asyncio.to_thread(model.load)
+            except Exception:
+                # Logged by load, and reported by /health until it is retried
+                pass
+
+    def unload_idle(self, ttl: float):
+        now = time.monotonic()
+        for model in list(self.models.values()):
+            if model.model is not None and now - model.last_used > ttl:
+                model.unload()
+
+    def get_status(self) -> dict:
+        now = time.monotonic()
+        return {
+            name: {
+                "status": model.status,
+                **({"error": model.error} if model.error else {}),
+                **(
+                    {
+                        "failures": model.failures,
+                        "retry_in": max(round(model.retry_at - now), 0),
+                    }
+                    if model.status == "failed"
+                    else {}
+                ),
+            }
+            for name, model in self.models.items()
+        }
+
+
+MODEL_MANAGER = ModelManager()
+
+
+async def periodic_model_lifecycle():
+    """
+    Load the models registered at startup in the background, then unload
+    models that have been idle for longer than MODEL_IDLE_UNLOAD_TTL.
+    """
+    await MODEL_MANAGER.load_pending()
+
+    if MODEL_IDLE_UNLOAD_TTL <= 0:
+        return
+
+    while True:
+        await asyncio.sleep(min(MODEL_IDLE_UNLOAD_TTL / 2, 60))
+        await asyncio.to_thread(MODEL_MANAGER.unload_idle, MODEL_IDLE_UNLOAD_TTL)
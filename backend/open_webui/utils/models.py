@@ -16,7 +16,7 @@ from open_webui.models.models import Models
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
-    get_function_module_from_cache,
+    PLUGIN_CACHE,
 )
 from open_webui.utils.access_control import has_access
 
@@ -253,10 +253,6 @@ async def get_all_models(request, user: UserModel = None):
             }
         ]
 
-    def get_function_module_by_id(function_id):
-        function_module, _, _ = get_function_module_from_cache(request, function_id)
-        return function_module
-
     for model in models:
         action_ids = [
             action_id
@@ -271,26 +267,18 @@ async def get_all_models(request, user: UserModel = None):
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
-
-            function_module = get_function_module_by_id(action_id)
+            # Cached by version, so this doesn't hit the DB for every model
+            entry = PLUGIN_CACHE.get_function_entry(action_id)
             model["actions"].extend(
-                get_action_items_from_module(action_function, function_module)
+                get_action_items_from_module(entry.function, entry.module)
             )
 
         model["filters"] = []
         for filter_id in filter_ids:
-            filter_function = Functions.get_function_by_id(filter_id)
-            if filter_function is None:
-                raise Exception(f"Filter not found: {filter_id}")
-
-            function_module = get_function_module_by_id(filter_id)
-
-            if getattr(function_module, "toggle", None):
+            entry = PLUGIN_CACHE.get_function_entry(filter_id)
+            if getattr(entry.module, "toggle", None):
                 model["filters"].extend(
-                    get_filter_items_from_module(filter_function, function_module)
+                    get_filter_items_from_module(entry.function, entry.module)
                 )
 
     log.debug(f"get_all_models() returned {len(models)} models")
@@ -2,18 +2,46 @@ import os
 import re
 import subprocess
 import sys
-from importlib import util
+from importlib import metadata, util
 import types
 import tempfile
 import logging
-
-from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
-from open_webui.models.functions import Functions
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+from packaging.requirements import InvalidRequirement, Requirement
+
+from open_webui.config import CACHE_DIR
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    PIP_OPTIONS,
+    PIP_PACKAGE_INDEX_OPTIONS,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+)
+from open_webui.models.functions import FunctionModel, Functions
 from open_webui.models.tools import Tools
+from open_webui.utils.redis import (
+    get_async_redis_connection,
+    get_redis_connection,
+    get_sentinels_from_env,
+)
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Markers for requirement sets that were installed successfully
+REQUIREMENTS_MARKER_DIR = CACHE_DIR / "requirements"
+
+# Progress of the background installation of tool and function requirements
+REQUIREMENTS_INSTALL_STATUS = {"state": "idle"}
+
 
 def extract_frontmatter(content):
     """
@@ -160,85 +188,272 @@ def load_function_module_by_id(function_id: str, content: str | None = None):
         # Cleanup by removing the module in case of error
         del sys.modules[module_name]
 
-        Functions.update_function_by_id(function_id, {"is_active": False})
+        # Missing packages may still be being installed in the background
+        if REQUIREMENTS_INSTALL_STATUS["state"] != "running":
+            Functions.update_function_by_id(function_id, {"is_active": False})
+            PLUGIN_CACHE.invalidate("function", function_id)
         raise e
     finally:
         os.unlink(temp_file.name)
 
 
-def get_function_module_from_cache(request, function_id, load_from_db=True):
-    if load_from_db:
-        # Always load from the database by default
-        # This is useful for hooks like "inlet" or "outlet" where the content might change
-        # and we want to ensure the latest content is used.
+@dataclass
+class FunctionCacheEntry:
+    version: int
+    function: FunctionModel
+    module: Any
+    type: str
+    frontmatter: dict
+    valves: Optional[dict]
+
+
+class PluginCache:
+    """
+    Worker-local cache of loaded function modules, their rows and valves keyed
+    by (id, updated_at), tool modules, and the resolved filter pipelines.
+
+    Entries are dropped whenever a function or tool is changed: locally, and
+    on the other workers through a Redis pub/sub channel when REDIS_URL is
+    set. Without Redis, other workers and replicas can't signal changes, so
+    the version stamp of a function is checked against the database before
+    its entry is reused and filter pipelines aren't cached.
+    """
+
+    CHANNEL = "open-webui:plugins:invalidate"
+
+    def __init__(self, redis_url: str = "", redis_sentinels=[]):
+        self.functions: dict[str, FunctionCacheEntry] = {}
+        self.tools: dict[str, Any] = {}
+        self.filter_pipelines: dict[tuple, list[str]] = {}
+
+        # Identifies this worker's own messages on the channel
+        self.origin = uuid4().hex
+        self.redis_url = redis_url
+        self.redis_sentinels = redis_sentinels
+        self.redis = (
+            get_redis_connection(redis_url, redis_sentinels) if redis_url else None
+        )
+        self.verify_versions = not self.redis
+
+    def get_function_entry(
+        self, function_id: str, verify_version: bool = True
+    ) -> FunctionCacheEntry:
+        entry = self.functions.get(function_id)
+        if entry and (not verify_version or not self.verify_versions):
+            return entry
+        if entry and Functions.get_function_updated_at_by_id(function_id) == (
+            entry.version
+        ):
+            return entry
 
         function = Functions.get_function_by_id(function_id)
         if not function:
+            self.functions.pop(function_id, None)
             raise Exception(f"Function not found: {function_id}")
-        content = function.content
 
-        new_content = replace_imports(content)
-        if new_content != content:
-            content = new_content
+        content = replace_imports(function.content)
+        if content != function.content:
             # Update the function content in the database
-            Functions.update_function_by_id(function_id, {"content": content})
-
-        if (
-            hasattr(request.app.state, "FUNCTION_CONTENTS")
-            and function_id in request.app.state.FUNCTION_CONTENTS
-        ) and (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
-        ):
-            if request.app.state.FUNCTION_CONTENTS[function_id] == content:
-                return request.app.state.FUNCTIONS[function_id], None, None
+            function = Functions.update_function_by_id(
+                function_id, {"content": content}
+            )
 
-        function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id, content
+        if entry and entry.function.content == content:
+            # Only the row (e.g. valves or is_active) changed
+            module, function_type, frontmatter = (
+                entry.module,
+                entry.type,
+                entry.frontmatter,
+            )
+        else:
+            module, function_type, frontmatter = load_function_module_by_id(
+                function_id, content
+            )
+
+        entry = FunctionCacheEntry(
+            version=function.updated_at,
+            function=function,
+            module=module,
+            type=function_type,
+            frontmatter=frontmatter,
+            valves=Functions.get_function_valves_by_id(function_id),
         )
-    else:
-        # Load from cache (e.g. "stream" hook)
-        # This is useful for performance reasons
+        self.functions[function_id] = entry
+        return entry
+
+    def get_filter_pipeline(self, key: tuple, resolve: Callable[[], list[str]]):
+        # Changes made elsewhere can't be noticed without Redis
+        if self.verify_versions:
+            return resolve()
+        if key not in self.filter_pipelines:
+            self.filter_pipelines[key] = resolve()
+        return self.filter_pipelines[key]
+
+    def drop(self, kind: str, id: str):
+        if kind == "function":
+            self.functions.pop(id, None)
+        elif kind == "tool":
+            self.tools.pop(id, None)
+        self.filter_pipelines.clear()
+
+    def clear(self):
+        self.functions.clear()
+        self.tools.clear()
+        self.filter_pipelines.clear()
+
+    def invalidate(self, kind: str, id: str):
+        """
+        Drop the cached `kind` ("function" or "tool") with `id` on every worker.
+        """
+        self.drop(kind, id)
+        if not self.redis:
+            return
+
+        message = json.dumps({"origin": self.origin, "kind": kind, "id": id})
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Already off the event loop, e.g. in the threadpool
+            self.publish(message)
+        else:
+            loop.run_in_executor(None, self.publish, message)
 
-        if (
-            hasattr(request.app.state, "FUNCTIONS")
-            and function_id in request.app.state.FUNCTIONS
-        ):
-            return request.app.state.FUNCTIONS[function_id], None, None
+    def publish(self, message: str):
+        try:
+            self.redis.publish(self.CHANNEL, message)
+        except Exception as e:
+            log.error(f"Failed to publish plugin invalidation: {e}")
 
-        function_module, function_type, frontmatter = load_function_module_by_id(
-            function_id
-        )
+    async def listen(self):
+        if not self.redis:
+            return
+
+        redis = get_async_redis_connection(self.redis_url, self.redis_sentinels)
+        while True:
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                # Invalidations may have been missed while not subscribed
+                self.clear()
 
-    if not hasattr(request.app.state, "FUNCTIONS"):
-        request.app.state.FUNCTIONS = {}
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
 
-    if not hasattr(request.app.state, "FUNCTION_CONTENTS"):
-        request.app.state.FUNCTION_CONTENTS = {}
+                    data = json.loads(message["data"])
+                    if data["origin"] != self.origin:
+                        self.drop(data["kind"], data["id"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Plugin invalidation listener failed: {e}")
+                await asyncio.sleep(1)
 
-    request.app.state.FUNCTIONS[function_id] = function_module
-    request.app.state.FUNCTION_CONTENTS[function_id] = content
 
-    return function_module, function_type, frontmatter
+PLUGIN_CACHE = PluginCache(
+    REDIS_URL,
+    get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT),
+)
 
 
-def install_frontmatter_requirements(requirements: str):
-    if requirements:
+def get_function_module_from_cache(request, function_id, load_from_db=True):
+    """
+    Return the (module, type, frontmatter) of a function. With `load_from_db`
+    false (e.g. the "stream" hook), a cached module is used without any
+    version check.
+    """
+    entry = PLUGIN_CACHE.get_function_entry(function_id, verify_version=load_from_db)
+    return entry.module, entry.type, entry.frontmatter
+
+
+def parse_requirements(requirements: str) -> list[str]:
+    return sorted({req.strip() for req in requirements.split(",") if req.strip()})
+
+
+def is_requirement_satisfied(requirement: str) -> Optional[bool]:
+    """
+    Check a requirement against the installed distributions. Returns None
+    when that isn't possible, e.g. for VCS or URL requirements.
+    """
+    try:
+        req = Requirement(requirement)
+    except InvalidRequirement:
+        return None
+
+    if req.marker and not req.marker.evaluate():
+        return True
+
+    try:
+        version = metadata.version(req.name)
+    except metadata.PackageNotFoundError:
+        return False
+
+    if req.url:
+        return None
+    return req.specifier.contains(version, prereleases=True)
+
+
+def get_requirements_marker_path(req_list: list[str]):
+    key = json.dumps(
+        [sys.executable, sys.version, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS, req_list]
+    )
+    return REQUIREMENTS_MARKER_DIR / hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_missing_requirements(req_list: list[str]) -> list[str]:
+    """
+    Return the requirements that need installing. Installed distributions are
+    always checked, since site-packages may have been reset (e.g. by recreating
+    the container) while the marker store persisted; the markers only vouch
+    for requirements that can't be checked that way.
+    """
+    marker_exists = get_requirements_marker_path(req_list).exists()
+
+    missing = []
+    for req in req_list:
+        satisfied = is_requirement_satisfied(req)
+        if satisfied is False or (satisfied is None and not marker_exists):
+            missing.append(req)
+    return missing
+
+
+def install_frontmatter_requirements(
+    requirements: str, on_output: Optional[Callable[[str], None]] = None
+):
+    req_list = parse_requirements(requirements)
+    if not req_list:
+        log.info("No requirements found in frontmatter.")
+        return
+
+    missing = get_missing_requirements(req_list)
+    if missing:
         try:
-            req_list = [req.strip() for req in requirements.split(",")]
-            log.info(f"Installing requirements: {' '.join(req_list)}")
-            subprocess.check_call(
+            log.info(f"Installing requirements: {' '.join(missing)}")
+            process = subprocess.Popen(
                 [sys.executable, "-m", "pip", "install"]
                 + PIP_OPTIONS
-                + req_list
-                + PIP_PACKAGE_INDEX_OPTIONS
+                + missing
+                + PIP_PACKAGE_INDEX_OPTIONS,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
             )
+            for line in process.stdout:
+                log.debug(line.rstrip())
+                if on_output:
+                    on_output(line.rstrip())
+
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args)
         except Exception as e:
-            log.error(f"Error installing packages: {' '.join(req_list)}")
+            log.error(f"Error installing packages: {' '.join(missing)}")
             raise e
-
     else:
-        log.info("No requirements found in frontmatter.")
+        log.info(f"Requirements already satisfied: {' '.join(req_list)}")
+
+    marker_path = get_requirements_marker_path(req_list)
+    marker_path.parent.mkdir(parents=True, exist_ok=True)
+    marker_path.write_text(json.dumps(req_list))
 
 
 def install_tool_and_function_dependencies():
@@ -246,9 +461,14 @@ def install_tool_and_function_dependencies():
     Install all dependencies for all admin tools and active functions.
 
     By first collecting all dependencies from the frontmatter of each tool and function,
-    and then installing them using pip. Duplicates or similar version specifications are
-    handled by pip as much as possible.
+    and then installing the ones that aren't satisfied yet using pip. Duplicates or
+    similar version specifications are handled by pip as much as possible.
+
+    Meant to run in the background; progress is kept in REQUIREMENTS_INSTALL_STATUS.
     """
+    REQUIREMENTS_INSTALL_STATUS.clear()
+    REQUIREMENTS_INSTALL_STATUS.update({"state": "running", "started_at": time.time()})
+
     function_list = Functions.get_functions(active_only=True)
     tool_list = Tools.get_tools()
 
@@ -265,6 +485,21 @@ def install_tool_and_function_dependencies():
                 if dependencies := frontmatter.get("requirements"):
                     all_dependencies += f"{dependencies}, "
 
-        install_frontmatter_requirements(all_dependencies.strip(", "))
+        req_list = parse_requirements(all_dependencies)
+        REQUIREMENTS_INSTALL_STATUS.update(
+            {
+                "requirements": req_list,
+                "missing": get_missing_requirements(req_list),
+            }
+        )
+
+        install_frontmatter_requirements(
+            all_dependencies,
+            on_output=lambda line: REQUIREMENTS_INSTALL_STATUS.update({"output": line}),
+        )
+        REQUIREMENTS_INSTALL_STATUS["state"] = "done"
     except Exception as e:
         log.error(f"Error installing requirements: {e}")
+        REQUIREMENTS_INSTALL_STATUS.update({"state": "failed", "error": str(e)})
+    finally:
+        REQUIREMENTS_INSTALL_STATUS["finished_at"] = time.time()
@@ -37,6 +37,25 @@ def get_redis_connection(redis_url, redis_sentinels, decode_responses=True):
         return redis.Redis.from_url(redis_url, decode_responses=decode_responses)
 
 
+def get_async_redis_connection(redis_url, redis_sentinels, decode_responses=True):
+    if redis_sentinels:
+        redis_config = parse_redis_service_url(redis_url)
+        sentinel = aioredis.sentinel.Sentinel(
+            redis_sentinels,
+            port=redis_config["port"],
+            db=redis_config["db"],
+            username=redis_config["username"],
+            password=redis_config["password"],
+            decode_responses=decode_responses,
+        )
+
+        # Get a master connection from Sentinel
+        return sentinel.master_for(redis_config["service"])
+    else:
+        # Standard Redis connection
+        return aioredis.from_url(redis_url, decode_responses=decode_responses)
+
+
 def get_sentinels_from_env(sentinel_hosts_env, sentinel_port_env):
     if sentinel_hosts_env:
         sentinel_hosts = sentinel_hosts_env.split(",")
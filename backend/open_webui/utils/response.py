@@ -1,9 +1,62 @@
 import json
+from typing import Any, AsyncIterator, Union
 from uuid import uuid4
+
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Send
+
 from open_webui.utils.misc import (
     openai_chat_chunk_message_template,
     openai_chat_completion_message_template,
 )
+from open_webui.utils.serializer import dumps_bytes, loads
+
+SSE_DONE = "data: [DONE]\n\n"
+
+# Items of an SSEStreamingResponse: chat completion chunks, kept parsed for as
+# long as they stay in the process, or already serialized events
+SSEItem = Union[dict, str, bytes]
+
+
+def serialize_sse_event(item: SSEItem) -> Union[str, bytes]:
+    if isinstance(item, dict):
+        return b"data: " + dumps_bytes(item) + b"\n\n"
+    return item
+
+
+async def serialize_sse_events(
+    items: AsyncIterator[SSEItem],
+) -> AsyncIterator[Union[str, bytes]]:
+    async for item in items:
+        yield serialize_sse_event(item)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse serialized by utils.serializer, with orjson unless
+    JSON_SERIALIZER is "json". For endpoints returning large documents or
+    lists, e.g. chats.
+    """
+
+    def render(self, content: Any) -> bytes:
+        # NaN is sent as null by orjson, and refused like JSONResponse does by
+        # the json module, rather than sent as invalid JSON
+        return dumps_bytes(content, allow_nan=False)
+
+
+class SSEStreamingResponse(StreamingResponse):
+    """
+    Event stream of chat completion chunks, whose body iterator yields chunks
+    as dicts (or already serialized events). Middleware reading the body gets
+    the chunks without parsing them again, and they are only serialized as
+    `data:` events when the response is sent.
+    """
+
+    media_type = "text/event-stream"
+
+    async def stream_response(self, send: Send) -> None:
+        self.body_iterator = serialize_sse_events(self.body_iterator)
+        await super().stream_response(send)
 
 
 def convert_ollama_tool_call_to_openai(tool_calls: dict) -> dict:
@@ -100,28 +153,21 @@ def convert_response_ollama_to_openai(ollama_response: dict) -> dict:
 
 
 async def convert_streaming_response_ollama_to_openai(ollama_streaming_response):
+    """
+    Convert an Ollama chat stream (NDJSON) to chat completion chunks, yielded
+    as dicts for an SSEStreamingResponse.
+    """
     async for data in ollama_streaming_response.body_iterator:
-        data = json.loads(data)
+        data = loads(data)
 
-        model = data.get("model", "ollama")
-        message_content = data.get("message", {}).get("content", None)
-        tool_calls = data.get("message", {}).get("tool_calls", None)
-        openai_tool_calls = None
+        message = data.get("message", {})
+        tool_calls = message.get("tool_calls", None)
 
-        if tool_calls:
-            openai_tool_calls = convert_ollama_tool_call_to_openai(tool_calls)
-
-        done = data.get("done", False)
-
-        usage = None
-        if done:
-            usage = convert_ollama_usage_to_openai(data)
-
-        data = openai_chat_chunk_message_template(
-            model, message_content, openai_tool_calls, usage
+        yield openai_chat_chunk_message_template(
+            data.get("model", "ollama"),
+            message.get("content", None),
+            convert_ollama_tool_call_to_openai(tool_calls) if tool_calls else None,
+            convert_ollama_usage_to_openai(data) if data.get("done", False) else None,
         )
 
-        line = f"data: {json.dumps(data)}\n\n"
-        yield line
-
-    yield "data: [DONE]\n\n"
+    yield SSE_DONE
@@ -0,0 +1,85 @@
+import json
+import logging
+from typing import Any, Union
+
+from open_webui.env import JSON_SERIALIZER, SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Optional orjson import, falls back to the json module
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if JSON_SERIALIZER == "orjson" and not ORJSON_AVAILABLE:
+    log.info("orjson is not installed, serializing JSON with the json module")
+
+USE_ORJSON = ORJSON_AVAILABLE and JSON_SERIALIZER == "orjson"
+
+
+# Maps every digit to "0", to find runs of digits with bytes.find
+DIGITS_TABLE = bytes(0x30 if 0x30 <= i <= 0x39 else 0x20 for i in range(256))
+# orjson reads integers that don't fit in 64 bits, i.e. of 20 or more digits,
+# as floats
+LONG_NUMBER = b"0" * 20
+
+
+def has_long_number(data: bytes) -> bool:
+    """Whether `data` has a run of 20 or more digits."""
+    # Such a run has digits at ten consecutive even offsets, so only every
+    # other byte is looked at. Shorter runs, like the 17 digits of a float,
+    # never span ten of them.
+    sample = data[::2].translate(DIGITS_TABLE)
+    i = sample.find(b"0" * 10)
+    while i != -1:
+        start = i * 2
+        window = data[max(start - 19, 0) : start + 38]
+        if LONG_NUMBER in window.translate(DIGITS_TABLE):
+            return True
+        i = sample.find(b"0" * 10, i + 1)
+    return False
+
+
+def _default(obj: Any) -> Any:
+    # numpy arrays and scalars, which orjson serializes natively
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any, allow_nan: bool = True) -> bytes:
+    """
+    Serialize `obj` with orjson, falling back to the json module for integers
+    over 64 bits. orjson writes NaN and infinity as null; with the json module
+    they are written as NaN/Infinity, or refused unless `allow_nan`.
+    """
+    if USE_ORJSON:
+        try:
+            return orjson.dumps(
+                obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+        except TypeError:
+            pass
+    return json.dumps(obj, allow_nan=allow_nan, default=_default).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if USE_ORJSON:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not has_long_number(data):
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # e.g. NaN and Infinity, as stored by the json module
+                pass
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to JSON, with orjson unless JSON_SERIALIZER is "json"."""
+    return dumps_bytes(obj).decode("utf-8")
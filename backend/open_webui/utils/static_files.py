@@ -0,0 +1,250 @@
+import gzip
+import logging
+import mimetypes
+import os
+import stat
+import threading
+import uuid
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+import brotli
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+# Build output with content hashes in the file names, which never changes
+IMMUTABLE_PATH_PREFIXES = (os.path.join("_app", "immutable") + os.sep,)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Everything else may change with an upgrade, so is revalidated with its ETag
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+COMPRESSIBLE_MEDIA_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/wasm",
+    "application/xml",
+    "image/svg+xml",
+    "image/x-icon",
+    "image/vnd.microsoft.icon",
+    "font/otf",
+    "font/ttf",
+}
+MIN_COMPRESS_SIZE = 1024
+
+# Content-Encoding and file extension of the precompressed siblings, preferred
+# encoding first
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class StaticFile:
+    path: str
+    stat_result: os.stat_result
+    media_type: str
+    etag: str
+    cache_control: str
+    compressible: bool
+    # Content-Encoding -> (path, stat) of an up to date precompressed sibling
+    variants: dict[str, tuple[str, os.stat_result]] = field(default_factory=dict)
+
+
+@lru_cache(maxsize=128)
+def parse_accept_encoding(accept_encoding: str) -> frozenset[str]:
+    encodings = set()
+    for part in accept_encoding.lower().split(","):
+        encoding, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(encoding.strip())
+    return frozenset(encodings)
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles for a directory that doesn't change while the app runs, e.g.
+    the frontend build.
+
+    The directory is indexed once on startup, so requests are served without
+    probing the filesystem. Compressible files are served from `.br`/`.gz`
+    siblings when the client accepts them. Missing siblings are generated in
+    the background, and CompressMiddleware leaves these responses alone. Files
+    get strong ETags, and hashed build assets are cached as immutable.
+
+    With `spa`, unknown paths (other than scripts) are served index.html.
+    """
+
+    def __init__(self, *args, spa: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spa = spa
+        self.index: dict[str, StaticFile] = {}
+
+        if self.directory is not None and os.path.isdir(self.directory):
+            self.index = self._build_index(str(self.directory))
+            threading.Thread(
+                target=self._precompress, name="static-precompress", daemon=True
+            ).start()
+
+    def _build_index(self, directory: str) -> dict[str, StaticFile]:
+        index = {}
+        for root, _, filenames in os.walk(directory, followlinks=self.follow_symlink):
+            for filename in filenames:
+                full_path = os.path.join(root, filename)
+                extension = os.path.splitext(filename)[1]
+                if extension in ENCODINGS.values() and os.path.isfile(
+                    full_path.removesuffix(extension)
+                ):
+                    # Precompressed sibling, indexed along with its original
+                    continue
+
+                stat_result = os.stat(full_path)
+                if not stat.S_ISREG(stat_result.st_mode):
+                    continue
+
+                path = os.path.relpath(full_path, directory)
+                media_type = mimetypes.guess_type(filename)[0] or "text/plain"
+                static_file = StaticFile(
+                    path=full_path,
+                    stat_result=stat_result,
+                    media_type=media_type,
+                    # Strong, as any change to the file changes its size or mtime
+                    etag=f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"',
+                    cache_control=(
+                        IMMUTABLE_CACHE_CONTROL
+                        if path.startswith(IMMUTABLE_PATH_PREFIXES)
+                        else REVALIDATE_CACHE_CONTROL
+                    ),
+                    compressible=stat_result.st_size >= MIN_COMPRESS_SIZE
+                    and (
+                        media_type.startswith("text/")
+                        or media_type in COMPRESSIBLE_MEDIA_TYPES
+                    ),
+                )
+
+                if static_file.compressible:
+                    for encoding, extension in ENCODINGS.items():
+                        try:
+                            variant_stat = os.stat(full_path + extension)
+                        except FileNotFoundError:
+                            continue
+                        # Ignore siblings left over from a previous build
+                        if variant_stat.st_mtime_ns >= stat_result.st_mtime_ns:
+                            static_file.variants[encoding] = (
+                                full_path + extension,
+                                variant_stat,
+                            )
+
+                index[path] = static_file
+
+        log.debug(f"Indexed {len(index)} static files in {directory}")
+        return index
+
+    def _precompress(self):
+        compressed = 0
+        for static_file in list(self.index.values()):
+            if not static_file.compressible:
+                continue
+
+            for encoding, extension in ENCODINGS.items():
+                if encoding in static_file.variants:
+                    continue
+
+                variant_path = static_file.path + extension
+                tmp_path = f"{variant_path}.{uuid.uuid4().hex}.tmp"
+                try:
+                    with open(static_file.path, "rb") as f:
+                        data = compress(encoding, f.read())
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, variant_path)
+                    static_file.variants[encoding] = (
+                        variant_path,
+                        os.stat(variant_path),
+                    )
+                    compressed += 1
+                except OSError as e:
+                    # e.g. a read-only directory, the middleware compresses instead
+                    log.warning(f"Could not precompress {static_file.path}: {e}")
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    return
+
+        if compressed:
+            log.info(f"Precompressed {compressed} static files")
+
+    def _lookup(self, path: str) -> Optional[StaticFile]:
+        static_file = self.index.get(path)
+        if static_file is None and self.html:
+            static_file = self.index.get(
+                os.path.normpath(os.path.join(path, "index.html"))
+            )
+        if static_file is None and self.spa and not path.endswith(".js"):
+            static_file = self.index.get("index.html")
+        return static_file
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        static_file = self._lookup(path)
+        if static_file is not None:
+            return self.static_file_response(static_file, scope)
+
+        if self.html and (static_file := self.index.get("404.html")):
+            return self.static_file_response(static_file, scope, status_code=404)
+        raise HTTPException(status_code=404)
+
+    def static_file_response(
+        self, static_file: StaticFile, scope: Scope, status_code: int = 200
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path, stat_result = static_file.path, static_file.stat_result
+        headers = {
+            "ETag": static_file.etag,
+            "Cache-Control": static_file.cache_control,
+        }
+
+        if static_file.compressible:
+            headers["Vary"] = "Accept-Encoding"
+            # Ranges refer to the uncompressed file
+            if static_file.variants and "range" not in request_headers:
+                accepted = parse_accept_encoding(
+                    request_headers.get("accept-encoding", "")
+                )
+                for encoding in ENCODINGS:
+                    if encoding in accepted and encoding in static_file.variants:
+                        path, stat_result = static_file.variants[encoding]
+                        headers["Content-Encoding"] = encoding
+                        headers["ETag"] = f'{static_file.etag[:-1]}-{encoding}"'
+                        break
+
+        response = FileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=static_file.media_type,
+            stat_result=stat_result,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response